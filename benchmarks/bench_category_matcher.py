@@ -0,0 +1,114 @@
+"""
+Category Matcher Benchmark
+==========================
+Compares the per-row keyword loop that auto_categorize used to run with
+the compiled CategoryMatcher used by categorize_transactions, on
+synthetic statement rows and user keyword rules.
+
+Run with:
+    python benchmarks/bench_category_matcher.py                 # 100k rows x 500 keywords
+    python benchmarks/bench_category_matcher.py --rows 10000 --keywords 2000
+"""
+
+import argparse
+import os
+import random
+import string
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from momo_import import CategoryMatcher, DEFAULT_CATEGORY_RULES, categorize_transactions
+
+PAYMENT_TYPES = ['MOMO USER', 'CASH OUT', 'MERCHANT PAYMENT', 'AIRTIME', 'BANKPUSH', 'TRANSFER']
+
+
+class Category:
+    def __init__(self, name, keywords):
+        self.name = name
+        self.keywords = keywords
+
+
+def loop_categorize(transaction, user_categories):
+    """The previous auto_categorize: every category, every keyword, per row."""
+    search_text = ' '.join([
+        str(transaction.get('payment_type', '')),
+        str(transaction.get('reference', '')),
+        str(transaction.get('counterparty', '')),
+    ]).lower()
+
+    for category in user_categories:
+        if hasattr(category, 'keywords') and category.keywords:
+            keywords = category.keywords if isinstance(category.keywords, list) else []
+            for keyword in keywords:
+                if keyword.lower() in search_text:
+                    return category.name
+
+    for category_name, keywords in DEFAULT_CATEGORY_RULES.items():
+        for keyword in keywords:
+            if keyword in search_text:
+                return category_name
+    return 'Other'
+
+
+def random_word(rng, low=4, high=9):
+    return ''.join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(low, high)))
+
+
+def build_data(rows, keywords, per_category, seed=42):
+    rng = random.Random(seed)
+    words = [random_word(rng) for _ in range(keywords)]
+    categories = [
+        Category(f'Category {i // per_category}', words[i:i + per_category])
+        for i in range(0, keywords, per_category)
+    ]
+
+    transactions = []
+    for i in range(rows):
+        reference = ' '.join(random_word(rng) for _ in range(2))
+        if i % 3 == 0:
+            # A third of the rows hit a user keyword
+            reference += ' ' + rng.choice(words)
+        transactions.append({
+            'payment_type': rng.choice(PAYMENT_TYPES),
+            'reference': reference,
+            'counterparty': f'{random_word(rng).upper()} {random_word(rng).upper()}',
+            'type': 'expense',
+        })
+    return categories, transactions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--keywords', type=int, default=500, help='user keywords in total')
+    parser.add_argument('--per-category', type=int, default=5, help='keywords per user category')
+    args = parser.parse_args()
+
+    categories, transactions = build_data(args.rows, args.keywords, args.per_category)
+    print(f"{args.rows:,} rows, {args.keywords} user keywords in {len(categories)} categories "
+          f"+ {sum(len(k) for k in DEFAULT_CATEGORY_RULES.values())} default keywords\n")
+
+    started = time.perf_counter()
+    expected = [loop_categorize(trans, categories) for trans in transactions]
+    loop_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    matcher = CategoryMatcher.from_categories(categories)
+    compile_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    result = categorize_transactions(transactions, matcher=matcher)
+    matcher_seconds = time.perf_counter() - started
+
+    assert [trans['suggested_category'] for trans in result] == expected, 'results differ'
+
+    print(f"  keyword loop:     {loop_seconds:7.2f}s  {args.rows / loop_seconds:12,.0f} rows/s")
+    print(f"  CategoryMatcher:  {matcher_seconds:7.2f}s  {args.rows / matcher_seconds:12,.0f} rows/s "
+          f"(compile {compile_seconds * 1000:.1f} ms)")
+    print(f"  speedup:          {loop_seconds / matcher_seconds:7.1f}x  (identical categories)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+"""
+Import Summary Benchmark
+========================
+Compares the loop summary (generate_import_summary / ImportSummary) with a
+NumPy columnar version of it on synthetic parsed statement rows, and
+checks both return the same dict. The columnar version only lives here:
+it needs every row in memory at once, while imports summarize inside the
+single streaming pass (summarize_stream), so the app keeps the loop and
+doesn't depend on NumPy. Rerun this if rows ever arrive in columns.
+
+Needs NumPy, which is not an app dependency (pip install numpy).
+
+Run with:
+    python benchmarks/bench_import_summary.py                    # 10k, 100k, 1M rows
+    python benchmarks/bench_import_summary.py --sizes 50000 --repeat 5
+"""
+
+import argparse
+import math
+import os
+import random
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from momo_import import ImportSummary, generate_import_summary
+
+CATEGORIES = ['Transport', 'Food', 'Shopping', 'Utilities', 'Bank Transfer', 'Healthcare', 'Other']
+TYPE_CODES = {'income': 1, 'expense': 2}
+
+
+def columnar_import_summary(transactions):
+    """generate_import_summary() computed column-wise with NumPy masks and bincount."""
+    if not transactions:
+        return ImportSummary().to_dict()
+
+    # Categories are coded in first-appearance order (the loop version's dict order)
+    category_codes = {}
+    code_for = category_codes.setdefault
+    type_code = TYPE_CODES.get
+
+    columns = np.fromiter(
+        ((type_code(trans.get('type'), 0), trans['amount'], trans.get('fees', 0), trans.get('tax', 0),
+          bool(trans.get('is_duplicate', False)), code_for(trans.get('suggested_category', 'Other'), len(category_codes)))
+         for trans in transactions),
+        dtype=[('type', 'i1'), ('amount', 'f8'), ('fees', 'f8'), ('tax', 'f8'), ('duplicate', '?'), ('category', 'intp')],
+        count=len(transactions)
+    )
+
+    total = len(columns)
+    duplicates = int(np.count_nonzero(columns['duplicate']))
+    amounts = columns['amount']
+    category_counts = np.bincount(columns['category'], minlength=len(category_codes))
+    category_amounts = np.bincount(columns['category'], weights=amounts, minlength=len(category_codes))
+
+    return {
+        'total': total,
+        'new_transactions': total - duplicates,
+        'duplicates': duplicates,
+        'total_income': float(amounts[columns['type'] == 1].sum()),
+        'total_expense': float(amounts[columns['type'] == 2].sum()),
+        'total_fees': float(columns['fees'].sum()),
+        'total_tax': float(columns['tax'].sum()),
+        'final_balance': transactions[-1].get('balance_after', 0),
+        'categories': {
+            category: {'count': int(category_counts[code]), 'amount': float(category_amounts[code])}
+            for category, code in category_codes.items()
+        }
+    }
+
+
+def same_summary(expected, result):
+    """Equal counts and categories; totals equal to within float rounding (ImportSummary compensates)."""
+    totals = ('total_income', 'total_expense', 'total_fees', 'total_tax')
+    return (
+        all(math.isclose(expected[key], result[key], rel_tol=1e-9) for key in totals)
+        and {key: value for key, value in expected.items() if key not in totals + ('categories',)}
+        == {key: value for key, value in result.items() if key not in totals + ('categories',)}
+        and list(expected['categories']) == list(result['categories'])
+        and all(expected['categories'][name]['count'] == result['categories'][name]['count']
+                and math.isclose(expected['categories'][name]['amount'], result['categories'][name]['amount'],
+                                 rel_tol=1e-9)
+                for name in expected['categories'])
+    )
+
+
+def build_rows(count, seed=42):
+    rng = random.Random(seed)
+    return [{
+        'type': rng.choice(('income', 'expense', 'expense', 'transfer')),
+        'amount': round(rng.uniform(0.5, 5000), 2),
+        'fees': rng.choice((0.0, 0.5, 0.75, 1.25)),
+        'tax': rng.choice((0.0, 0.0, 0.15)),
+        'balance_after': round(rng.uniform(0, 20000), 2),
+        'suggested_category': rng.choice(CATEGORIES),
+        'is_duplicate': rng.random() < 0.05,
+    } for _ in range(count)]
+
+
+def best_of(fn, rows, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn(rows)
+        timings.append(time.perf_counter() - started)
+    return result, statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per size (median is reported)')
+    args = parser.parse_args()
+
+    # Warm up NumPy before timing
+    columnar_import_summary(build_rows(10))
+
+    print(f"{'rows':>10}  {'loop':>9}  {'columnar':>9}  {'speedup':>7}  same")
+    for size in args.sizes:
+        rows = build_rows(size)
+        expected, loop_seconds = best_of(generate_import_summary, rows, args.repeat)
+        result, columnar_seconds = best_of(columnar_import_summary, rows, args.repeat)
+        print(f"{size:>10,}  {loop_seconds * 1000:7.1f}ms  {columnar_seconds * 1000:7.1f}ms  "
+              f"{loop_seconds / columnar_seconds:6.2f}x  {same_summary(expected, result)}")
+
+
+if __name__ == '__main__':
+    main()
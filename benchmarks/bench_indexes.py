@@ -0,0 +1,197 @@
+"""
+Composite Index Benchmark
+=========================
+Seeds the transaction tables with synthetic rows and compares query plans
+and latency for the per-user/date queries used by the dashboard,
+transactions, MoMo and report routes, before and after the composite
+indexes from migration a1f09c3b5d47.
+
+Run with:
+    python benchmarks/bench_indexes.py                    # 1M rows in a temp SQLite file
+    python benchmarks/bench_indexes.py --rows 100000
+    python benchmarks/bench_indexes.py --database-url postgresql://.../bench_db
+
+Use a throwaway database: the tables are dropped and recreated.
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import (
+    create_engine, MetaData, Table, Column, Integer, String, Float, Date, DateTime, text
+)
+
+metadata = MetaData()
+
+# Only the columns the benchmarked queries touch
+momo_transaction = Table(
+    'mo_mo_transaction', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('user_id', Integer, nullable=False),
+    Column('type', String(10), nullable=False),
+    Column('amount', Float, nullable=False),
+    Column('date', DateTime, nullable=False),
+    Column('counterparty', String(200)),
+    Column('fees', Float),
+    Column('tax', Float),
+    Column('category', String(100)),
+)
+
+transaction = Table(
+    'transaction', metadata,
+    Column('id', Integer, primary_key=True),
+    Column('user_id', Integer, nullable=False),
+    Column('type', String(10), nullable=False),
+    Column('amount', Float, nullable=False),
+    Column('date', Date),
+    Column('category_id', Integer, nullable=False),
+)
+
+# Same definitions as the models / migration a1f09c3b5d47
+INDEX_DDL = [
+    'CREATE INDEX ix_momo_transaction_user_date ON mo_mo_transaction (user_id, date DESC)',
+    'CREATE INDEX ix_momo_transaction_user_type_date ON mo_mo_transaction (user_id, type, date)',
+    'CREATE INDEX ix_momo_transaction_user_category ON mo_mo_transaction (user_id, category)',
+    'CREATE INDEX ix_transaction_user_date ON "transaction" (user_id, date DESC)',
+    'CREATE INDEX ix_transaction_user_type_date ON "transaction" (user_id, type, date)',
+    'CREATE INDEX ix_transaction_user_category ON "transaction" (user_id, category_id)',
+]
+
+CATEGORIES = ['Food', 'Transport', 'Shopping', 'Utilities', 'Bank Transfer', 'Healthcare', 'Other']
+
+# (label, SQL) pairs mirroring the route queries
+QUERIES = [
+    ('momo_dashboard: recent 10',
+     'SELECT * FROM mo_mo_transaction WHERE user_id = :user_id ORDER BY date DESC LIMIT 10'),
+    ('momo_insights: last 90 days',
+     'SELECT * FROM mo_mo_transaction WHERE user_id = :user_id AND date >= :since ORDER BY date DESC'),
+    ('momo totals by type since',
+     "SELECT sum(amount) FROM mo_mo_transaction WHERE user_id = :user_id AND type = 'expense' AND date >= :since"),
+    ('momo_transactions: category filter',
+     'SELECT * FROM mo_mo_transaction WHERE user_id = :user_id AND category = :category '
+     'ORDER BY date DESC LIMIT 20'),
+    ('dashboard: recent 5',
+     'SELECT * FROM "transaction" WHERE user_id = :user_id ORDER BY date DESC LIMIT 5'),
+    ('get_financial_insights: expenses 90 days',
+     'SELECT * FROM "transaction" WHERE user_id = :user_id AND type = \'expense\' AND date >= :since '
+     'ORDER BY date DESC'),
+    ('dashboard: expense by category',
+     'SELECT category_id, sum(amount) FROM "transaction" WHERE user_id = :user_id AND type = \'expense\' '
+     'GROUP BY category_id'),
+]
+
+
+def seed(engine, rows, users, batch_size=50000):
+    """Drop/recreate the tables (without indexes) and insert synthetic rows."""
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+
+    rng = random.Random(42)
+    start = datetime(2022, 1, 1)
+    span = int(timedelta(days=3 * 365).total_seconds())
+
+    with engine.begin() as conn:
+        for offset in range(0, rows, batch_size):
+            n = min(batch_size, rows - offset)
+            momo_rows = []
+            plain_rows = []
+            for _ in range(n):
+                user_id = rng.randint(1, users)
+                when = start + timedelta(seconds=rng.randint(0, span))
+                trans_type = rng.choice(('income', 'expense', 'expense', 'transfer'))
+                amount = round(rng.uniform(1, 500), 2)
+                momo_rows.append({
+                    'user_id': user_id, 'type': trans_type, 'amount': amount, 'date': when,
+                    'counterparty': f'PARTY {rng.randint(1, 200)}', 'fees': 0.5, 'tax': 0.1,
+                    'category': rng.choice(CATEGORIES),
+                })
+                plain_rows.append({
+                    'user_id': user_id, 'type': 'income' if trans_type == 'income' else 'expense',
+                    'amount': amount, 'date': when.date(), 'category_id': rng.randint(1, 14),
+                })
+            conn.execute(momo_transaction.insert(), momo_rows)
+            conn.execute(transaction.insert(), plain_rows)
+
+    with engine.begin() as conn:
+        conn.execute(text('ANALYZE'))
+
+
+def explain(conn, sql, params):
+    if conn.dialect.name == 'postgresql':
+        rows = conn.execute(text(f'EXPLAIN {sql}'), params).fetchall()
+        return '\n'.join(f'    {row[0]}' for row in rows)
+    rows = conn.execute(text(f'EXPLAIN QUERY PLAN {sql}'), params).fetchall()
+    return '\n'.join(f'    {row[-1]}' for row in rows)
+
+
+def time_query(conn, sql, params, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        conn.execute(text(sql), params).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def run_queries(engine, users, repeat):
+    params = {'user_id': users // 2, 'since': datetime(2024, 10, 1), 'category': 'Food'}
+    results = {}
+    with engine.connect() as conn:
+        for label, sql in QUERIES:
+            results[label] = (explain(conn, sql, params), time_query(conn, sql, params, repeat))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000, help='rows per table (default: 1M)')
+    parser.add_argument('--users', type=int, default=500, help='distinct users in the data set')
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per query (median is reported)')
+    parser.add_argument('--database-url', default=None, help='defaults to a temporary SQLite file')
+    args = parser.parse_args()
+
+    tmpdir = None
+    url = args.database_url
+    if not url:
+        tmpdir = tempfile.mkdtemp()
+        url = f"sqlite:///{os.path.join(tmpdir, 'bench_indexes.db')}"
+
+    engine = create_engine(url)
+    print(f"Seeding {args.rows:,} rows per table for {args.users} users ({engine.dialect.name})...")
+    started = time.perf_counter()
+    seed(engine, args.rows, args.users)
+    print(f"Seeded in {time.perf_counter() - started:.1f}s\n")
+
+    before = run_queries(engine, args.users, args.repeat)
+
+    with engine.begin() as conn:
+        for ddl in INDEX_DDL:
+            conn.execute(text(ddl))
+        conn.execute(text('ANALYZE'))
+
+    after = run_queries(engine, args.users, args.repeat)
+
+    for label, _ in QUERIES:
+        plan_before, ms_before = before[label]
+        plan_after, ms_after = after[label]
+        speedup = ms_before / ms_after if ms_after else float('inf')
+        print(f"== {label}")
+        print(f"  before: {ms_before:9.2f} ms")
+        print(plan_before)
+        print(f"  after:  {ms_after:9.2f} ms  ({speedup:.1f}x)")
+        print(plan_after)
+        print()
+
+    engine.dispose()
+    if tmpdir:
+        os.remove(os.path.join(tmpdir, 'bench_indexes.db'))
+        os.rmdir(tmpdir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Parsed Row Memory Benchmark
+===========================
+Measures the memory held by parsed statement rows as 15-key dicts (the
+old representation) versus MoMoRow __slots__ records, after the
+categorize and dedup stages have filled in their fields.
+
+Run with:
+    python benchmarks/bench_row_memory.py               # 100k rows
+    python benchmarks/bench_row_memory.py --rows 1000000
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from momo_import import MoMoRow, categorize_stream, dedup_stream
+
+PAYMENT_TYPES = ['MOMO USER', 'CASH OUT', 'MERCHANT PAYMENT', 'AIRTIME', 'TRANSFER']
+
+
+def row_values(count, seed=42):
+    """Field values for `count` rows (shared strings, like a real parse)."""
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    for i in range(count):
+        yield {
+            'date': start + timedelta(minutes=i),
+            'payment_type': rng.choice(PAYMENT_TYPES),
+            'counterparty': f'PERSON {rng.randint(1, 500)}',
+            'counterparty_phone': f'+233 {rng.randint(200000000, 599999999)}',
+            'amount': round(rng.uniform(1, 5000), 2),
+            'transaction_id': str(60000000000 + i),
+            'fees': 0.5,
+            'tax': 0.0,
+            'balance_after': round(rng.uniform(0, 20000), 2),
+            'reference': rng.choice(['', 'Uber ride', 'rent', 'NationalId--']),
+            'type': rng.choice(['income', 'expense', 'transfer']),
+            'page': i // 20 + 1,
+            'row': i % 20 + 1,
+        }
+
+
+def measure(build, count):
+    """Build `count` rows, run them through the stages and report memory held."""
+    gc.collect()
+    tracemalloc.start()
+    started = time.perf_counter()
+
+    rows = [build(values) for values in row_values(count)]
+    rows = list(dedup_stream(categorize_stream(rows), set()))
+
+    seconds = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, peak, seconds, rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    dict_current, dict_peak, dict_seconds, dict_rows = measure(dict, args.rows)
+    del dict_rows
+    row_current, row_peak, row_seconds, row_rows = measure(lambda values: MoMoRow(**values), args.rows)
+    del row_rows
+
+    mib = 1024 * 1024
+    print(f"{args.rows:,} rows after parse -> categorize -> dedup\n")
+    print(f"  {'':10} {'retained':>10} {'peak':>10} {'per row':>9} {'time':>7}")
+    print(f"  {'dict':10} {dict_current / mib:8.1f}MB {dict_peak / mib:8.1f}MB "
+          f"{dict_current / args.rows:7.0f} B {dict_seconds:6.2f}s")
+    print(f"  {'MoMoRow':10} {row_current / mib:8.1f}MB {row_peak / mib:8.1f}MB "
+          f"{row_current / args.rows:7.0f} B {row_seconds:6.2f}s")
+    print(f"\n  MoMoRow retains {1 - row_current / dict_current:.0%} less memory")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""
+Row Parsing Benchmark
+=====================
+Times parse_table_row on synthetic statement rows, with the old cell
+parsers (strptime fallback chain, re.sub amount cleaning) against the
+current ones (hand-written date fast path, per-statement format memo,
+bytes.translate amount cleaning). Checks both produce identical rows.
+
+Run with:
+    python benchmarks/bench_row_parsing.py               # 100k rows
+    python benchmarks/bench_row_parsing.py --rows 20000
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from datetime import datetime, timedelta
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import momo_import
+from momo_import import parse_table_row, ParseContext
+
+LAYOUTS = {
+    'standard': '%d %b %Y %H:%M',
+    'full-month': '%d %B %Y %H:%M',
+}
+
+
+# --- Previous implementations -------------------------------------------------
+
+def old_parse_momo_date(date_str):
+    try:
+        date_str = date_str.strip()
+        return datetime.strptime(date_str, "%d %b %Y %H:%M")
+    except ValueError:
+        formats = ["%d %B %Y %H:%M", "%d/%m/%Y %H:%M", "%Y-%m-%d %H:%M:%S", "%d %b %Y"]
+        for fmt in formats:
+            try:
+                return datetime.strptime(date_str, fmt)
+            except ValueError:
+                continue
+        return None
+
+
+def old_parse_amount(amount_str):
+    if not amount_str:
+        return 0.0, False
+    cleaned = re.sub(r'[GHS\s,]', '', str(amount_str))
+    is_expense = cleaned.startswith('-')
+    cleaned = cleaned.lstrip('+-')
+    try:
+        return float(cleaned), is_expense
+    except ValueError:
+        return 0.0, False
+
+
+def old_parse_fee_or_tax(value_str):
+    if not value_str:
+        return 0.0
+    cleaned = re.sub(r'[GHS\s,]', '', str(value_str))
+    try:
+        return float(cleaned)
+    except ValueError:
+        return 0.0
+
+
+# --- Data ---------------------------------------------------------------------
+
+def build_rows(count, layout, seed=42):
+    rng = random.Random(seed)
+    start = datetime(2025, 1, 1)
+    rows = []
+    for i in range(count):
+        when = start + timedelta(minutes=37 * i)
+        rows.append([
+            when.strftime(LAYOUTS[layout]),
+            rng.choice(['CASH OUT', 'MOMO USER', 'TRANSFER', 'DEBIT']),
+            f'+233 54 {rng.randint(100, 999)} {rng.randint(1000, 9999)}, PERSON {rng.randint(1, 300)}',
+            f'{rng.choice("-+")}{rng.uniform(1, 5000):,.2f}',
+            str(60000000000 + i),
+            f'GHS {rng.choice([0, 0.5, 1.25]):.2f}',
+            'GHS 0.00',
+            f'GHS {rng.uniform(0, 20000):,.2f}',
+            rng.choice(['', 'Uber ride', 'rent']),
+        ])
+    return rows
+
+
+def time_parse(rows, old):
+    started = time.perf_counter()
+    if old:
+        with mock.patch.multiple(momo_import, parse_momo_date=old_parse_momo_date,
+                                 parse_amount=old_parse_amount, parse_fee_or_tax=old_parse_fee_or_tax):
+            parsed = [parse_table_row(row, 1, i) for i, row in enumerate(rows)]
+    else:
+        context = ParseContext()
+        parsed = [parse_table_row(row, 1, i, context) for i, row in enumerate(rows)]
+    return parsed, time.perf_counter() - started
+
+
+def time_cells(rows, old):
+    """Only the date/amount/fee cell parsers, without the rest of the row."""
+    if old:
+        parse_date, parse_amount, parse_fee = old_parse_momo_date, old_parse_amount, old_parse_fee_or_tax
+    else:
+        parse_date = ParseContext().parse_date
+        parse_amount, parse_fee = momo_import.parse_amount, momo_import.parse_fee_or_tax
+    started = time.perf_counter()
+    parsed = [(parse_date(row[0]), parse_amount(row[3]), parse_fee(row[5]), parse_fee(row[6]), parse_fee(row[7]))
+              for row in rows]
+    return parsed, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    print(f"{args.rows:,} rows per layout, time per row\n")
+    print(f"  {'layout':11} {'stage':12} {'old':>10} {'new':>10} {'speedup':>8}  identical")
+    for layout in LAYOUTS:
+        rows = build_rows(args.rows, layout)
+        for stage, timer in (('cell parsers', time_cells), ('whole row', time_parse)):
+            expected, old_seconds = timer(rows, old=True)
+            result, new_seconds = timer(rows, old=False)
+            print(f"  {layout:11} {stage:12} {old_seconds / args.rows * 1e6:7.2f} us "
+                  f"{new_seconds / args.rows * 1e6:7.2f} us {old_seconds / new_seconds:7.1f}x  {result == expected}")
+
+
+if __name__ == '__main__':
+    main()
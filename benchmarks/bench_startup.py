@@ -0,0 +1,111 @@
+"""
+Startup Import Benchmark
+========================
+Imports app.py and builds the app with create_app() in fresh interpreters
+under `python -X importtime` and reports the cumulative import time (median over runs) plus the slowest
+modules app.py pulls in directly. Fails when the median exceeds the
+threshold or when a library that only some routes need (pandas,
+pdfplumber, langchain, ...) is loaded at import time, so every gunicorn
+worker boot and CLI command (`flask db upgrade`) would pay for it.
+
+Run with:
+    python benchmarks/bench_startup.py                  # 5 runs, 1000 ms threshold
+    python benchmarks/bench_startup.py --repeat 10 --max-ms 800
+
+Exits with status 1 on a regression.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+# Only loaded by the code paths that use them
+DEFERRED_MODULES = [
+    'pandas', 'numpy', 'pdfplumber',
+    'langchain_core', 'langchain_google_genai', 'langchain_groq',
+]
+
+PROBE = (
+    "import sys, json, app; app.create_app(); "
+    f"print(json.dumps([m for m in {DEFERRED_MODULES!r} if m in sys.modules]))"
+)
+
+
+def parse_importtime(stderr):
+    """
+    Parse `-X importtime` output.
+
+    Returns:
+        List of (depth, cumulative_us, module) in output order
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip(' '))) // 2
+        entries.append((depth, int(cumulative), name.strip()))
+    return entries
+
+
+def run_once(env):
+    """Import and build app in a new interpreter; return (app ms, direct imports, deferred modules loaded)."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        sys.exit(f"Importing app failed:\n{result.stderr[-2000:]}")
+
+    entries = parse_importtime(result.stderr)
+    # The app line comes after its children; depth 1 are app.py's own imports
+    app_us = next(us for depth, us, name in entries if depth == 0 and name == 'app')
+    direct = [(us, name) for depth, us, name in entries if depth == 1]
+    loaded = json.loads(result.stdout.strip().splitlines()[-1])
+    return app_us / 1000, direct, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='interpreter runs (median is reported)')
+    parser.add_argument('--max-ms', type=float, default=1000, help='fail above this median import time')
+    parser.add_argument('--top', type=int, default=10, help='slowest direct imports to list')
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    # A throwaway SQLite URL keeps the database driver out of the measurement
+    env.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.gettempdir(), 'bench_startup.db'))
+    env.setdefault('SECRET_KEY', 'bench')
+
+    timings = []
+    for _ in range(args.repeat):
+        app_ms, direct, loaded = run_once(env)
+        timings.append(app_ms)
+
+    median = statistics.median(timings)
+    print(f"import app: median {median:.1f} ms, min {min(timings):.1f} ms over {args.repeat} runs\n")
+    print("Slowest direct imports (last run):")
+    for us, name in sorted(direct, reverse=True)[:args.top]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+    print()
+
+    failed = False
+    if loaded:
+        print(f"FAIL: loaded at import time: {', '.join(loaded)}")
+        failed = True
+    if median > args.max_ms:
+        print(f"FAIL: median {median:.1f} ms exceeds {args.max_ms:.0f} ms")
+        failed = True
+    if not failed:
+        print(f"OK: under {args.max_ms:.0f} ms, no deferred modules loaded")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+CLI Commands
+============
+Registered on the app by create_app(). Schema changes are explicit steps
+here (or `flask db upgrade`), never a side effect of importing the app.
+"""
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from extensions import db
+from models import ImportLog, MoMoMonthlyRollup, rebuild_momo_rollup
+from statement_storage import (
+    compact_statements, statement_folder, DEFAULT_FINISHED_DAYS, DEFAULT_MAX_AGE_DAYS
+)
+
+@click.command('init-db')
+@with_appcontext
+def init_db_command():
+    """Create any missing tables (fresh databases; use `flask db upgrade` otherwise)."""
+    db.create_all()
+    print("Database tables created.")
+
+@click.command('rebuild-momo-rollup')
+@with_appcontext
+def rebuild_momo_rollup_command():
+    """Rebuild the MoMo monthly rollup table from all MoMo transactions."""
+    rebuild_momo_rollup()
+    print(f"Rebuilt {MoMoMonthlyRollup.query.count()} rollup rows.")
+
+@click.command('compact-statements')
+@click.option('--finished-days', default=DEFAULT_FINISHED_DAYS, show_default=True,
+              help='Delete PDFs of committed/failed imports older than this.')
+@click.option('--max-age-days', default=DEFAULT_MAX_AGE_DAYS, show_default=True,
+              help='Delete any other PDF older than this (running imports excepted).')
+@click.option('--dry-run', is_flag=True, help='Only report what would be done.')
+@click.option('--verbose', '-v', is_flag=True, help='List every file affected.')
+@with_appcontext
+def compact_statements_command(finished_days, max_age_days, dry_run, verbose):
+    """Apply the upload retention policy and hardlink duplicate statements."""
+    import_logs = ImportLog.query.filter(ImportLog.file_path.isnot(None)).all()
+    report = compact_statements(
+        import_logs, statement_folder(current_app), current_app.root_path,
+        finished_days=finished_days, max_age_days=max_age_days, dry_run=dry_run
+    )
+
+    if dry_run:
+        db.session.rollback()
+    else:
+        db.session.commit()
+        removed, reclaimed = current_app.extensions['parse_cache'].evict()
+        print(f"Parse cache: evicted {removed} entries ({reclaimed} bytes).")
+
+    if verbose:
+        for path, reason in report.deleted:
+            print(f"  delete ({reason}): {path}")
+        for path, original in report.linked:
+            print(f"  link: {path} -> {original}")
+    for path, message in report.errors:
+        print(f"  error: {path}: {message}")
+    print(report.summary())
+
+def register_commands(app):
+    for command in (init_db_command, rebuild_momo_rollup_command, compact_statements_command):
+        app.cli.add_command(command)
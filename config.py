@@ -10,15 +10,11 @@ load_dotenv()
 
 class Config:
     """Base configuration class"""
-    # Security
+    # Security (required, checked in init_app)
     SECRET_KEY = os.getenv('SECRET_KEY')
-    if not SECRET_KEY:
-        raise ValueError("SECRET_KEY environment variable is required")
     
-    # Database configuration
+    # Database configuration (required, checked in init_app)
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL')
-    if not SQLALCHEMY_DATABASE_URI:
-        raise ValueError("DATABASE_URL environment variable is required")
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
@@ -59,9 +55,37 @@ class Config:
     GROQ_API_KEY = os.getenv('GROQ_API_KEY')
     
     # File upload security
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
-    UPLOAD_FOLDER = 'uploads'
+    MAX_STATEMENT_SIZE = 10 * 1024 * 1024  # 10MB per statement PDF
+    MAX_CONTENT_LENGTH = MAX_STATEMENT_SIZE + 64 * 1024  # Statement plus multipart headers and form fields
+    UPLOAD_FOLDER = os.getenv('UPLOAD_FOLDER', 'uploads')  # Statements go in <folder>/statements
     ALLOWED_EXTENSIONS = {'pdf'}
+
+    # Background statement import workers ('thread', 'process' or 'inline')
+    IMPORT_JOB_BACKEND = os.getenv('IMPORT_JOB_BACKEND', 'thread')
+    IMPORT_JOB_WORKERS = int(os.getenv('IMPORT_JOB_WORKERS', 2))
+    # Queued/processing imports untouched for this long are marked failed (lost on a worker restart)
+    IMPORT_JOB_TIMEOUT_MINUTES = int(os.getenv('IMPORT_JOB_TIMEOUT_MINUTES', 15))
+
+    # Worker processes for the pages of large statements (1 = serial)
+    PARSE_WORKERS = int(os.getenv('PARSE_WORKERS', os.cpu_count() or 1))
+
+    # Parsed statements cached by file hash so a repeat upload skips pdfplumber
+    PARSE_CACHE_FOLDER = os.getenv('PARSE_CACHE_FOLDER', 'uploads/parse_cache')
+    PARSE_CACHE_MAX_MB = int(os.getenv('PARSE_CACHE_MAX_MB', 256))
+    PARSE_CACHE_MAX_AGE_DAYS = int(os.getenv('PARSE_CACHE_MAX_AGE_DAYS', 30))
+
+    # Generated LLM insights reused while the underlying numbers are unchanged
+    INSIGHT_CACHE_TTL_HOURS = int(os.getenv('INSIGHT_CACHE_TTL_HOURS', 24))
+    INSIGHT_CACHE_MAX_ENTRIES = int(os.getenv('INSIGHT_CACHE_MAX_ENTRIES', 5000))
+
+    # Insights are generated off the request thread ('thread' or 'inline');
+    # the worker count caps concurrent LLM calls
+    INSIGHT_JOB_BACKEND = os.getenv('INSIGHT_JOB_BACKEND', 'thread')
+    INSIGHT_JOB_WORKERS = int(os.getenv('INSIGHT_JOB_WORKERS', 2))
+    INSIGHT_LLM_TIMEOUT = int(os.getenv('INSIGHT_LLM_TIMEOUT', 30))  # Seconds per LLM call
+    # 'gemini', 'groq', or 'stub' for canned responses without network access (tests, offline development)
+    INSIGHTS_LLM = os.getenv('INSIGHTS_LLM', 'gemini')
+    INSIGHTS_LLM_MODEL = os.getenv('INSIGHTS_LLM_MODEL')  # None: the provider's default
     
     # Logging
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -69,6 +93,13 @@ class Config:
     @staticmethod
     def init_app(app):
         """Initialize application with configuration"""
+        # Checked here rather than at import so every config class can be
+        # imported, e.g. by tests that only use TestingConfig
+        if not app.config['SECRET_KEY']:
+            raise ValueError("SECRET_KEY environment variable is required")
+        if not app.config['SQLALCHEMY_DATABASE_URI']:
+            raise ValueError("DATABASE_URL environment variable is required")
+
         # Set security headers
         @app.after_request
         def set_security_headers(response):
@@ -117,8 +148,11 @@ class TestingConfig(Config):
     DEBUG = False
     TESTING = True
     
+    SECRET_KEY = 'testing'
+
     # Use in-memory database for testing
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    SQLALCHEMY_ENGINE_OPTIONS = {}  # No pool sizing for SQLite
     
     # Disable secure cookies for testing
     SESSION_COOKIE_SECURE = False
@@ -127,6 +161,11 @@ class TestingConfig(Config):
     # Disable rate limiting for tests
     RATELIMIT_ENABLED = False
 
+    # Run statement imports and insight generation synchronously
+    IMPORT_JOB_BACKEND = 'inline'
+    INSIGHT_JOB_BACKEND = 'inline'
+    INSIGHTS_LLM = 'stub'
+
 
 # Configuration mapping
 config = {
@@ -0,0 +1,721 @@
+"""
+Core Routes
+===========
+Authentication, dashboard, manual transactions, accounts, categories and
+the user profile.
+"""
+
+import json
+from datetime import datetime
+
+from flask import Blueprint, render_template, request, redirect, url_for, flash, session, jsonify
+from flask_login import login_user, login_required, logout_user, current_user
+from sqlalchemy import func
+from werkzeug.security import generate_password_hash, check_password_hash
+
+from extensions import db
+from models import User, Account, Category, Transaction, bump_category_rules, category_matchers
+from momo_import import parse_keywords
+from pagination import keyset_paginate
+
+core = Blueprint('core', __name__)
+
+# Rows per page on the transaction lists (keyset paginated)
+TRANSACTIONS_PER_PAGE = 20
+
+# Currency configuration
+CURRENCIES = {
+    'GHS': {'name': 'Ghanaian Cedi', 'symbol': 'GH₵'},
+    'USD': {'name': 'US Dollar', 'symbol': '$'},
+    'EUR': {'name': 'Euro', 'symbol': '€'},
+    'GBP': {'name': 'British Pound', 'symbol': '£'},
+    'NGN': {'name': 'Nigerian Naira', 'symbol': '₦'},
+    'KES': {'name': 'Kenyan Shilling', 'symbol': 'KSh'},
+    'ZAR': {'name': 'South African Rand', 'symbol': 'R'},
+}
+
+# Custom Jinja filters
+@core.app_template_filter('nl2br')
+def nl2br(value):
+    """Convert newlines to HTML line breaks."""
+    if value:
+        value = value.replace('\n', '<br>')
+    return value
+
+@core.app_template_filter('currency')
+def format_currency(value, currency_code='GHS'):
+    """Format a value with currency symbol."""
+    if value is None:
+        value = 0
+    symbol = CURRENCIES.get(currency_code, CURRENCIES['GHS'])['symbol']
+    return f"{symbol}{value:,.2f}"
+
+# Make currencies available to all templates
+@core.app_context_processor
+def inject_currencies():
+    return {'CURRENCIES': CURRENCIES}
+
+# Create default categories for a new user
+def create_default_categories(user_id):
+    default_expense_categories = ['Food', 'Transport', 'Housing', 'Utilities', 'Entertainment', 'Shopping', 'Healthcare', 'Education', 'Other']
+    default_income_categories = ['Salary', 'Gift', 'Investment', 'Freelance', 'Other']
+    
+    for category_name in default_expense_categories:
+        category = Category(name=category_name, type='expense', user_id=user_id)
+        db.session.add(category)
+    
+    for category_name in default_income_categories:
+        category = Category(name=category_name, type='income', user_id=user_id)
+        db.session.add(category)
+    
+    db.session.commit()
+
+# Routes
+@core.route('/')
+def index():
+    if current_user.is_authenticated:
+        return redirect(url_for('core.dashboard'))
+    return render_template('landing.html')
+
+# @core.route('/register', methods=['GET', 'POST'])
+# def register():
+#     if request.method == 'POST':
+#         username = request.form.get('username')
+#         name = request.form.get('name')
+#         email = request.form.get('email')
+#         password = request.form.get('password')
+#         confirm_password = request.form.get('confirm_password')
+        
+#         # Validation
+#         if User.query.filter_by(username=username).first():
+#             flash('Username already exists', 'danger')
+#             return redirect(url_for('core.register'))
+            
+#         if User.query.filter_by(email=email).first():
+#             flash('Email already registered', 'danger')
+#             return redirect(url_for('core.register'))
+            
+#         if password != confirm_password:
+#             flash('Passwords do not match', 'danger')
+#             return redirect(url_for('core.register'))
+        
+#         # Create new user
+#         hashed_password = generate_password_hash(password, method='sha256')
+#         new_user = User(username=username, name=name, email=email, password=hashed_password)
+#         db.session.add(new_user)
+#         db.session.commit()
+        
+#         # Create default categories for new user
+#         create_default_categories(new_user.id)
+        
+#         # Create a default cash account
+#         cash_account = Account(name='Cash', balance=0.0, user_id=new_user.id)
+#         db.session.add(cash_account)
+#         db.session.commit()
+        
+#         flash('Registration successful! You can now login.', 'success')
+#         return redirect(url_for('core.login'))
+        
+#     return render_template('register.html')
+
+# @core.route('/register', methods=['GET', 'POST'])
+# def register():
+#     if request.method == 'POST':
+#         username = request.form.get('username')
+#         name = request.form.get('name')
+#         email = request.form.get('email')
+#         password = request.form.get('password')
+#         confirm_password = request.form.get('confirm_password')
+        
+#         # Validation
+#         if User.query.filter_by(username=username).first():
+#             flash('Username already exists', 'danger')
+#             return redirect(url_for('core.register'))
+            
+#         if User.query.filter_by(email=email).first():
+#             flash('Email already registered', 'danger')
+#             return redirect(url_for('core.register'))
+            
+#         if password != confirm_password:
+#             flash('Passwords do not match', 'danger')
+#             return redirect(url_for('core.register'))
+        
+#         # Create new user with the updated method parameter
+#         # Use 'pbkdf2:sha256' instead of 'sha256'
+#         hashed_password = generate_password_hash(password, method='pbkdf2:sha256')
+#         new_user = User(username=username, name=name, email=email, password=hashed_password)
+#         db.session.add(new_user)
+#         db.session.commit()
+        
+#         # Create default categories for new user
+#         create_default_categories(new_user.id)
+        
+#         # Create a default cash account
+#         cash_account = Account(name='Cash', balance=0.0, user_id=new_user.id)
+#         db.session.add(cash_account)
+#         db.session.commit()
+        
+#         flash('Registration successful! You can now login.', 'success')
+#         return redirect(url_for('core.login'))
+        
+#     return render_template('register.html')
+
+@core.route('/register', methods=['GET', 'POST'])
+def register():
+    # If user is already logged in, redirect to dashboard
+    if current_user.is_authenticated:
+        return redirect(url_for('core.dashboard'))
+        
+    if request.method == 'POST':
+        username = request.form.get('username')
+        name = request.form.get('name')
+        email = request.form.get('email')
+        password = request.form.get('password')
+        confirm_password = request.form.get('confirm_password')
+        currency = request.form.get('currency', 'GHS')
+
+        # Validation
+        if User.query.filter_by(username=username).first():
+            flash('Username already exists', 'danger')
+            return redirect(url_for('core.register'))
+
+        if User.query.filter_by(email=email).first():
+            flash('Email already registered', 'danger')
+            return redirect(url_for('core.register'))
+
+        if password != confirm_password:
+            flash('Passwords do not match', 'danger')
+            return redirect(url_for('core.register'))
+
+        # Validate currency
+        if currency not in CURRENCIES:
+            currency = 'GHS'
+
+        # Create new user with the updated method parameter
+        hashed_password = generate_password_hash(password, method='pbkdf2:sha256')
+        new_user = User(username=username, name=name, email=email, password=hashed_password, currency=currency)
+        db.session.add(new_user)
+        db.session.commit()
+        
+        # Create default categories for new user
+        create_default_categories(new_user.id)
+        
+        # Create a default cash account
+        cash_account = Account(name='Cash', balance=0.0, user_id=new_user.id)
+        db.session.add(cash_account)
+        db.session.commit()
+        
+        flash('Registration successful! You can now login.', 'success')
+        # Redirect to login page instead of letting it proceed to the next page
+        return redirect(url_for('core.login'))
+        
+    return render_template('register.html')
+
+@core.route('/login', methods=['GET', 'POST'])
+def login():
+    # If user is already logged in, redirect to dashboard
+    if current_user.is_authenticated:
+        return redirect(url_for('core.dashboard'))
+
+    if request.method == 'POST':
+        username = request.form.get('username', '').strip()
+        password = request.form.get('password', '')
+        remember = True if request.form.get('remember') else False
+
+        # Input validation
+        if not username or not password:
+            flash('Username and password are required.', 'danger')
+            return redirect(url_for('core.login'))
+
+        # Query user by username
+        user = User.query.filter_by(username=username).first()
+
+        # Validate credentials
+        if not user or not check_password_hash(user.password, password):
+            flash('Invalid username or password. Please try again.', 'danger')
+            return redirect(url_for('core.login'))
+
+        # Log the user in
+        login_user(user, remember=remember)
+
+        # Make session permanent if remember me is checked
+        if remember:
+            session.permanent = True
+
+        # Flash success message
+        flash(f'Welcome back, {user.name}!', 'success')
+
+        # Handle next parameter for redirect
+        next_page = request.args.get('next')
+        if next_page:
+            return redirect(next_page)
+        return redirect(url_for('core.dashboard'))
+
+    return render_template('login.html')
+
+# @core.route('/login', methods=['GET', 'POST'])
+# def login():
+#     if request.method == 'POST':
+#         username = request.form.get('username')
+#         password = request.form.get('password')
+#         remember = True if request.form.get('remember') else False
+        
+#         user = User.query.filter_by(username=username).first()
+        
+#         if not user or not check_password_hash(user.password, password):
+#             flash('Please check your login details and try again.', 'danger')
+#             return redirect(url_for('core.login'))
+            
+#         login_user(user, remember=remember)
+#         return redirect(url_for('core.dashboard'))
+        
+    return render_template('login.html')
+
+@core.route('/logout')
+@login_required
+def logout():
+    # Store user name before logout for personalized message
+    user_name = current_user.name
+
+    # Clear the session
+    session.clear()
+
+    # Log out the user
+    logout_user()
+
+    # Flash a goodbye message
+    flash(f'Goodbye, {user_name}! You have been successfully logged out.', 'info')
+
+    return redirect(url_for('core.index'))
+
+@core.route('/dashboard')
+@login_required
+def dashboard():
+    # Get user's accounts
+    accounts = Account.query.filter_by(user_id=current_user.id).all()
+    total_balance = sum(account.balance for account in accounts)
+    
+    # Get recent transactions (last 5)
+    recent_transactions = Transaction.query.filter_by(user_id=current_user.id).order_by(Transaction.date.desc()).limit(5).all()
+    
+    # Get expense summary by category
+    expense_summary = db.session.query(Category.name, func.sum(Transaction.amount)) \
+        .join(Transaction, Category.id == Transaction.category_id) \
+        .filter(Transaction.user_id == current_user.id) \
+        .filter(Transaction.type == 'expense') \
+        .group_by(Category.name) \
+        .all()
+    
+    # Prepare data for charts
+    expense_labels = [item[0] for item in expense_summary]
+    expense_values = [float(item[1]) for item in expense_summary]
+    
+    # Account balance for pie chart
+    account_labels = [account.name for account in accounts]
+    account_values = [account.balance for account in accounts]
+    
+    return render_template('dashboard.html', 
+                          accounts=accounts,
+                          total_balance=total_balance,
+                          recent_transactions=recent_transactions,
+                          expense_labels=json.dumps(expense_labels),
+                          expense_values=json.dumps(expense_values),
+                          account_labels=json.dumps(account_labels),
+                          account_values=json.dumps(account_values))
+
+def parse_date_arg(value):
+    """'YYYY-MM-DD' query string value as a date, or None if missing or invalid."""
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+    except ValueError:
+        return None
+
+def transaction_filters(args):
+    """
+    Read the transaction list filters from the query string.
+
+    Type, account and category come from checkbox lists, which send only
+    the ticked values. They apply once the filter form was submitted
+    (`filtered` is set); without it every value is shown.
+
+    Returns:
+        dict with 'types', 'accounts', 'categories' (set, or None for
+        all) and 'date_from', 'date_to' (date or None)
+    """
+    filtered = 'filtered' in args
+    return {
+        'types': set(args.getlist('type')) if filtered else None,
+        'accounts': set(args.getlist('account', type=int)) if filtered else None,
+        'categories': set(args.getlist('category', type=int)) if filtered else None,
+        'date_from': parse_date_arg(args.get('date_from')),
+        'date_to': parse_date_arg(args.get('date_to')),
+    }
+
+@core.route('/transactions')
+@login_required
+def transactions():
+    # Filters are part of the keyset query, so every page is filtered
+    filters = transaction_filters(request.args)
+    query = Transaction.query.filter_by(user_id=current_user.id)
+    if filters['types'] is not None:
+        query = query.filter(Transaction.type.in_(filters['types']))
+    if filters['accounts'] is not None:
+        query = query.filter(Transaction.account_id.in_(filters['accounts']))
+    if filters['categories'] is not None:
+        query = query.filter(Transaction.category_id.in_(filters['categories']))
+    if filters['date_from']:
+        query = query.filter(Transaction.date >= filters['date_from'])
+    if filters['date_to']:
+        query = query.filter(Transaction.date <= filters['date_to'])
+
+    # Get one page of user transactions, newest first
+    cursor = request.args.get('cursor')
+    transactions = keyset_paginate(
+        query, Transaction.date, Transaction.id,
+        token=cursor, per_page=TRANSACTIONS_PER_PAGE, count='approximate'
+    )
+    accounts = Account.query.filter_by(user_id=current_user.id).all()
+    categories = Category.query.filter_by(user_id=current_user.id).all()
+
+    # Query string without the cursor, carried through the Newer/Older links
+    filter_args = {key: request.args.getlist(key) for key in request.args if key != 'cursor'}
+
+    return render_template('transactions.html', 
+                          transactions=transactions, 
+                          accounts=accounts, 
+                          categories=categories,
+                          filters=filters,
+                          filter_args=filter_args)
+
+@core.route('/add_transaction', methods=['GET', 'POST'])
+@login_required
+def add_transaction():
+    if request.method == 'POST':
+        transaction_type = request.form.get('type')
+        amount = float(request.form.get('amount'))
+        account_id = int(request.form.get('account_id'))
+        category_id = int(request.form.get('category_id'))
+        description = request.form.get('description')
+        date_str = request.form.get('date')
+        date = datetime.strptime(date_str, '%Y-%m-%d').date()
+        
+        # Validate transaction
+        account = Account.query.get(account_id)
+        if not account or account.user_id != current_user.id:
+            flash('Invalid account', 'danger')
+            return redirect(url_for('core.add_transaction'))
+            
+        category = Category.query.get(category_id)
+        if not category or category.user_id != current_user.id:
+            flash('Invalid category', 'danger')
+            return redirect(url_for('core.add_transaction'))
+            
+        if transaction_type == 'expense' and amount > account.balance:
+            flash('Insufficient funds in this account', 'danger')
+            return redirect(url_for('core.add_transaction'))
+        
+        # Create new transaction
+        new_transaction = Transaction(
+            type=transaction_type,
+            amount=amount,
+            account_id=account_id,
+            category_id=category_id,
+            description=description,
+            date=date,
+            user_id=current_user.id
+        )
+        db.session.add(new_transaction)
+        
+        # Update account balance
+        if transaction_type == 'expense':
+            account.balance -= amount
+        else:  # income
+            account.balance += amount
+            
+        db.session.commit()
+        flash('Transaction added successfully', 'success')
+        return redirect(url_for('core.transactions'))
+    
+    # GET request - show form
+    accounts = Account.query.filter_by(user_id=current_user.id).all()
+    expense_categories = Category.query.filter_by(user_id=current_user.id, type='expense').all()
+    income_categories = Category.query.filter_by(user_id=current_user.id, type='income').all()
+    
+    return render_template('add_transaction.html', 
+                          accounts=accounts, 
+                          expense_categories=expense_categories,
+                          income_categories=income_categories,
+                          today=datetime.now().strftime('%Y-%m-%d'))
+
+@core.route('/accounts')
+@login_required
+def accounts():
+    accounts = Account.query.filter_by(user_id=current_user.id).all()
+    
+    # Calculate total balance
+    total_balance = sum(account.balance for account in accounts)
+    
+    return render_template('accounts.html', 
+                          accounts=accounts,
+                          total_balance=total_balance)
+
+@core.route('/add_account', methods=['GET', 'POST'])
+@login_required
+def add_account():
+    if request.method == 'POST':
+        account_name = request.form.get('name')
+        initial_balance = float(request.form.get('balance') or 0)
+        
+        # Check if account name already exists for this user
+        existing_account = Account.query.filter_by(user_id=current_user.id, name=account_name).first()
+        if existing_account:
+            flash('An account with this name already exists', 'danger')
+            return redirect(url_for('core.add_account'))
+        
+        # Create new account
+        new_account = Account(name=account_name, balance=initial_balance, user_id=current_user.id)
+        db.session.add(new_account)
+        db.session.commit()
+        
+        flash('Account added successfully', 'success')
+        return redirect(url_for('core.accounts'))
+        
+    return render_template('add_account.html')
+
+@core.route('/update_account/<int:account_id>', methods=['GET', 'POST'])
+@login_required
+def update_account(account_id):
+    account = Account.query.get_or_404(account_id)
+    
+    # Check if account belongs to current user
+    if account.user_id != current_user.id:
+        flash('Access denied', 'danger')
+        return redirect(url_for('core.accounts'))
+    
+    if request.method == 'POST':
+        account.name = request.form.get('name')
+        account.balance = float(request.form.get('balance'))
+        
+        db.session.commit()
+        flash('Account updated successfully', 'success')
+        return redirect(url_for('core.accounts'))
+        
+    return render_template('update_account.html', account=account)
+
+@core.route('/delete_account/<int:account_id>', methods=['POST'])
+@login_required
+def delete_account(account_id):
+    account = Account.query.get_or_404(account_id)
+    
+    # Check if account belongs to current user
+    if account.user_id != current_user.id:
+        flash('Access denied', 'danger')
+        return redirect(url_for('core.accounts'))
+    
+    # Check if account has transactions
+    if Transaction.query.filter_by(account_id=account_id).first():
+        flash('Cannot delete account with transactions', 'danger')
+        return redirect(url_for('core.accounts'))
+    
+    db.session.delete(account)
+    db.session.commit()
+    flash('Account deleted successfully', 'success')
+    return redirect(url_for('core.accounts'))
+
+@core.route('/categories')
+@login_required
+def categories():
+    expense_categories = Category.query.filter_by(user_id=current_user.id, type='expense').all()
+    income_categories = Category.query.filter_by(user_id=current_user.id, type='income').all()
+    return render_template('categories.html', 
+                          expense_categories=expense_categories,
+                          income_categories=income_categories)
+
+@core.route('/add_category', methods=['GET', 'POST'])
+@login_required
+def add_category():
+    if request.method == 'POST':
+        category_name = request.form.get('name')
+        category_type = request.form.get('type')
+        
+        # Check if category name already exists for this user and type
+        existing_category = Category.query.filter_by(
+            user_id=current_user.id, 
+            name=category_name,
+            type=category_type
+        ).first()
+        
+        if existing_category:
+            flash(f'A {category_type} category with this name already exists', 'danger')
+            return redirect(url_for('core.add_category'))
+        
+        # Create new category
+        new_category = Category(name=category_name, type=category_type, user_id=current_user.id,
+                                keywords=parse_keywords(request.form.get('keywords')))
+        db.session.add(new_category)
+        bump_category_rules(current_user)
+        db.session.commit()
+        category_matchers.invalidate(current_user.id)
+        
+        flash('Category added successfully', 'success')
+        return redirect(url_for('core.categories'))
+        
+    return render_template('add_category.html')
+
+@core.route('/update_category/<int:category_id>', methods=['GET', 'POST'])
+@login_required
+def update_category(category_id):
+    category = Category.query.get_or_404(category_id)
+    
+    # Check if category belongs to current user
+    if category.user_id != current_user.id:
+        flash('Access denied', 'danger')
+        return redirect(url_for('core.categories'))
+    
+    if request.method == 'POST':
+        category.name = request.form.get('name')
+        category.keywords = parse_keywords(request.form.get('keywords'))
+
+        bump_category_rules(current_user)
+        db.session.commit()
+        category_matchers.invalidate(current_user.id)
+        flash('Category updated successfully', 'success')
+        return redirect(url_for('core.categories'))
+        
+    return render_template('update_category.html', category=category)
+
+@core.route('/delete_category/<int:category_id>', methods=['POST'])
+@login_required
+def delete_category(category_id):
+    category = Category.query.get_or_404(category_id)
+    
+    # Check if category belongs to current user
+    if category.user_id != current_user.id:
+        flash('Access denied', 'danger')
+        return redirect(url_for('core.categories'))
+    
+    # Check if category has transactions
+    if Transaction.query.filter_by(category_id=category_id).first():
+        flash('Cannot delete category with transactions', 'danger')
+        return redirect(url_for('core.categories'))
+    
+    db.session.delete(category)
+    bump_category_rules(current_user)
+    db.session.commit()
+    category_matchers.invalidate(current_user.id)
+    flash('Category deleted successfully', 'success')
+    return redirect(url_for('core.categories'))
+
+# @core.route('/profile', methods=['GET', 'POST'])
+# @login_required
+# def profile():
+#     if request.method == 'POST':
+#         # Update user profile
+#         current_user.name = request.form.get('name')
+#         current_user.email = request.form.get('email')
+        
+#         # Check if password change was requested
+#         current_password = request.form.get('current_password')
+#         new_password = request.form.get('new_password')
+#         confirm_password = request.form.get('confirm_password')
+        
+#         if current_password and new_password:
+#             # Verify current password
+#             if not check_password_hash(current_user.password, current_password):
+#                 flash('Current password is incorrect', 'danger')
+#                 return redirect(url_for('core.profile'))
+                
+#             if new_password != confirm_password:
+#                 flash('New passwords do not match', 'danger')
+#                 return redirect(url_for('core.profile'))
+                
+#             # Update password
+#             current_user.password = generate_password_hash(new_password, method='sha256')
+            
+#         db.session.commit()
+#         flash('Profile updated successfully', 'success')
+#         return redirect(url_for('core.profile'))
+        
+#     return render_template('profile.html', user=current_user)
+
+@core.route('/profile', methods=['GET', 'POST'])
+@login_required
+def profile():
+    if request.method == 'POST':
+        form_type = request.form.get('form_type')
+        
+        if form_type == 'profile':
+            # Update user profile info
+            current_user.name = request.form.get('name')
+            current_user.email = request.form.get('email')
+            currency = request.form.get('currency', current_user.currency)
+            if currency in CURRENCIES:
+                current_user.currency = currency
+            flash('Profile updated successfully', 'success')
+            
+        elif form_type == 'password':
+            # Handle password change
+            current_password = request.form.get('current_password')
+            new_password = request.form.get('new_password')
+            confirm_password = request.form.get('confirm_password')
+            
+            # Verify current password
+            if not check_password_hash(current_user.password, current_password):
+                flash('Current password is incorrect', 'danger')
+                return redirect(url_for('core.profile'))
+                
+            if new_password != confirm_password:
+                flash('New passwords do not match', 'danger')
+                return redirect(url_for('core.profile'))
+                
+            # Update password using the correct method
+            current_user.password = generate_password_hash(new_password, method='pbkdf2:sha256')
+            flash('Password updated successfully', 'success')
+        
+        # Save changes to database
+        db.session.commit()
+        return redirect(url_for('core.profile'))
+        
+    return render_template('profile.html', user=current_user)
+# API routes for AJAX
+@core.route('/api/categories/<transaction_type>')
+@login_required
+def get_categories_by_type(transaction_type):
+    categories = Category.query.filter_by(user_id=current_user.id, type=transaction_type).all()
+    return jsonify([{'id': category.id, 'name': category.name} for category in categories])
+
+@core.route('/delete_user_account', methods=['POST'])
+@login_required
+def delete_user_account():
+    """Delete the user account and all associated data."""
+    password = request.form.get('delete_password')
+    
+    # Verify password
+    if not check_password_hash(current_user.password, password):
+        flash('Incorrect password. Account deletion cancelled.', 'danger')
+        return redirect(url_for('core.profile'))
+    
+    # Store user ID before logout
+    user_id = current_user.id
+    
+    # Log out the user first
+    logout_user()
+    
+    # Get the user object
+    user = User.query.get(user_id)
+    
+    # Delete all user's transactions
+    Transaction.query.filter_by(user_id=user_id).delete()
+    
+    # Delete all user's accounts
+    Account.query.filter_by(user_id=user_id).delete()
+    
+    # Delete all user's categories
+    Category.query.filter_by(user_id=user_id).delete()
+    
+    # Delete the user
+    db.session.delete(user)
+    db.session.commit()
+    
+    flash('Your account and all associated data have been permanently deleted.', 'info')
+    return redirect(url_for('core.index'))
@@ -0,0 +1,15 @@
+"""
+Flask Extensions
+================
+Created unbound here and attached to an app in create_app(), so models
+and blueprints can import them without importing (or creating) the app.
+"""
+
+from flask_login import LoginManager
+from flask_migrate import Migrate
+from flask_sqlalchemy import SQLAlchemy
+
+db = SQLAlchemy()
+migrate = Migrate()
+login_manager = LoginManager()
+login_manager.login_view = 'core.login'
@@ -0,0 +1,278 @@
+"""
+LLM Insight Cache
+=================
+Stores generated insight text in the insight_cache table, keyed by a
+SHA-256 of the model name, the prompt version and the prompt variables
+(the financial context sent to the model). As long as the numbers behind
+a page don't change, the page is served from the cache instead of paying
+for another LLM round-trip.
+
+Entries expire after a TTL; when the table grows past `max_entries` the
+least recently used ones are dropped. Hits and misses are counted per
+process (InsightCache.stats()) and hits per entry in the table.
+
+InsightJobs runs cache misses on a background job queue so pages can
+render straight away and poll for the text.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, delete, update, func, insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+from models import InsightCacheEntry
+
+DEFAULT_TTL = timedelta(hours=24)
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_PENDING = 20  # Generations queued or running at once
+DEFAULT_JOB_TIMEOUT = 60  # Seconds before a pending generation is reported as failed
+
+insight_cache = InsightCacheEntry.__table__
+
+def insight_cache_key(model, prompt_version, variables):
+    """
+    Fingerprint of one LLM request.
+
+    Args:
+        model: Model name, e.g. 'gemini-1.5-flash'
+        prompt_version: Bumped whenever the prompt template changes
+        variables: Prompt variables (dict) or the rendered context string
+
+    Returns:
+        64 character hex digest
+    """
+    payload = json.dumps(
+        {'model': model, 'prompt_version': prompt_version, 'variables': variables},
+        sort_keys=True, default=str, separators=(',', ':')
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+class InsightCache:
+    """
+    Database-backed cache of LLM responses.
+
+    Cache reads and writes run in their own short transactions on the
+    engine, so they never commit or roll back the caller's session.
+
+    Args:
+        ttl: How long an entry stays valid (timedelta)
+        max_entries: Table size above which least recently used entries go
+    """
+
+    def __init__(self, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+    def _count(self, hit):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def lookup(self, engine, key):
+        """get() that also updates the hit/miss counters."""
+        content = self.get(engine, key)
+        self._count(content is not None)
+        return content
+
+    def get(self, engine, key, now=None):
+        """Return the cached text for `key`, or None if missing or expired."""
+        now = now or datetime.now()
+        with engine.begin() as conn:
+            row = conn.execute(
+                select(insight_cache.c.id, insight_cache.c.content, insight_cache.c.expires_at)
+                .where(insight_cache.c.cache_key == key)
+            ).first()
+            if row is None:
+                return None
+            if row.expires_at <= now:
+                conn.execute(delete(insight_cache).where(insight_cache.c.id == row.id))
+                return None
+            conn.execute(
+                update(insight_cache)
+                .where(insight_cache.c.id == row.id)
+                .values(last_used_at=now, hit_count=insight_cache.c.hit_count + 1)
+            )
+            return row.content
+
+    def put(self, engine, key, model, prompt_version, content, now=None):
+        """Store (or replace) an entry, then evict expired and LRU entries."""
+        now = now or datetime.now()
+        values = {
+            'cache_key': key, 'model': model, 'prompt_version': str(prompt_version),
+            'content': content, 'created_at': now, 'last_used_at': now,
+            'expires_at': now + self.ttl, 'hit_count': 0,
+        }
+        with engine.begin() as conn:
+            _upsert(conn, values)
+            self.evict(conn, now)
+
+    def evict(self, conn, now=None):
+        """
+        Delete expired entries and trim the table to max_entries.
+
+        Returns:
+            Number of entries removed
+        """
+        now = now or datetime.now()
+        removed = conn.execute(delete(insight_cache).where(insight_cache.c.expires_at <= now)).rowcount
+
+        excess = conn.execute(select(func.count()).select_from(insight_cache)).scalar() - self.max_entries
+        if excess > 0:
+            oldest = select(insight_cache.c.id)\
+                .order_by(insight_cache.c.last_used_at.asc(), insight_cache.c.id.asc())\
+                .limit(excess)\
+                .scalar_subquery()
+            removed += conn.execute(delete(insight_cache).where(insight_cache.c.id.in_(oldest))).rowcount
+        return removed
+
+    def get_or_generate(self, engine, model, prompt_version, variables, generate):
+        """
+        Return cached insight text, calling `generate()` only on a miss.
+
+        Exceptions from `generate` propagate and nothing is cached, so a
+        failed LLM call is retried on the next request.
+
+        Returns:
+            (text, cache_hit)
+        """
+        key = insight_cache_key(model, prompt_version, variables)
+        content = self.lookup(engine, key)
+        if content is not None:
+            return content, True
+
+        content = generate()
+        self.put(engine, key, model, prompt_version, content)
+        return content, False
+
+def _upsert(conn, values):
+    """INSERT, replacing an existing row with the same cache_key."""
+    dialect = conn.dialect.name
+    if dialect in ('postgresql', 'sqlite'):
+        stmt = (postgresql.insert if dialect == 'postgresql' else sqlite.insert)(insight_cache).values(**values)
+        updates = {name: value for name, value in values.items() if name != 'cache_key'}
+        conn.execute(stmt.on_conflict_do_update(index_elements=['cache_key'], set_=updates))
+        return
+
+    conn.execute(delete(insight_cache).where(insight_cache.c.cache_key == values['cache_key']))
+    conn.execute(insert(insight_cache).values(**values))
+
+# =============================================================================
+# BACKGROUND GENERATION
+# =============================================================================
+
+class InsightJobs:
+    """
+    Generates cache misses on a job queue instead of the request thread.
+
+    Each cache key has at most one generation in flight, however many
+    page loads ask for it. The queue's worker count limits concurrent LLM
+    calls and `max_pending` bounds the backlog.
+
+    Args:
+        cache: InsightCache the results are stored in
+        job_queue: momo_jobs.JobQueue running the LLM calls
+        max_pending: Generations queued or running before submit() refuses
+        timeout: Seconds after which a still-pending job is reported failed
+    """
+
+    def __init__(self, cache, job_queue, max_pending=DEFAULT_MAX_PENDING, timeout=DEFAULT_JOB_TIMEOUT):
+        self.cache = cache
+        self.job_queue = job_queue
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._jobs = {}  # cache key -> (future, started, owner ids)
+        self._lock = threading.Lock()
+
+    def submit(self, engine, key, model, prompt_version, generate, owner):
+        """
+        Start generating `key` unless it is already in flight.
+
+        Returns:
+            True if the result can be polled, False if the backlog is full
+        """
+        with self._lock:
+            self._prune()
+            job = self._jobs.get(key)
+            if job is not None and not (job[0].done() and job[0].exception()):
+                job[2].add(owner)
+                return True
+            if sum(not future.done() for future, _, _ in self._jobs.values()) >= self.max_pending:
+                return False
+            # Registered before submitting: an inline queue finishes inside enqueue()
+            placeholder = (_PendingFuture(), time.monotonic(), {owner})
+            self._jobs[key] = placeholder
+
+        future = self.job_queue.enqueue(self._generate, engine, key, model, prompt_version, generate)
+        with self._lock:
+            if self._jobs.get(key) is placeholder:
+                self._jobs[key] = (future, placeholder[1], placeholder[2])
+        return True
+
+    def _generate(self, engine, key, model, prompt_version, generate):
+        content = generate()
+        self.cache.put(engine, key, model, prompt_version, content)
+        return content
+
+    def poll(self, engine, key, owner):
+        """
+        Status of a generation for the polling endpoint.
+
+        Returns:
+            dict with 'status' ('pending', 'ready', 'error' or 'missing')
+            and 'insights' or 'error' where applicable
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+        if job is not None and owner in job[2]:
+            future, started, _ = job
+            if not future.done():
+                if time.monotonic() - started > self.timeout:
+                    return {'status': 'error', 'error': 'Timed out waiting for the AI service.'}
+                return {'status': 'pending'}
+            if future.exception() is not None:
+                return {'status': 'error', 'error': str(future.exception())}
+            return {'status': 'ready', 'insights': future.result()}
+
+        # Finished earlier (or by another process): the text is in the cache
+        content = self.cache.get(engine, key)
+        if content is not None:
+            return {'status': 'ready', 'insights': content}
+        return {'status': 'missing'}
+
+    def _prune(self):
+        """Forget finished jobs once their results are old enough to be cached anyway."""
+        cutoff = time.monotonic() - self.timeout
+        for key, (future, started, _) in list(self._jobs.items()):
+            if future.done() and started < cutoff:
+                del self._jobs[key]
+
+class _PendingFuture:
+    """Stand-in for the job's future until enqueue() returns."""
+
+    def done(self):
+        return False
+
+    def exception(self):
+        return None
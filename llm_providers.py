@@ -0,0 +1,136 @@
+"""
+LLM Providers
+=============
+Chat models and prompt chains for the insight pages, built once per
+process on first use and then shared by every request, so the HTTP client
+(and its connection pool) and the parsed prompt templates are reused.
+
+The backend is chosen by name: 'gemini' (GEMINI_API_KEY), 'groq'
+(GROQ_API_KEY) or 'stub', which returns canned text without network
+access for tests and offline development. Provider packages are only
+imported when their backend is selected, and langchain itself only on
+the first insight generation, so startup and CLI commands don't load it.
+
+A forked child (e.g. a preloaded gunicorn worker) must not share the
+parent's HTTP connections, so every live registry is reset after fork.
+"""
+
+import importlib
+import os
+import threading
+import weakref
+
+STUB_RESPONSE = "Insights are generated by the stub LLM (INSIGHTS_LLM=stub)."
+
+# Chat model class per backend and the keyword arguments it takes
+PROVIDERS = {
+    'gemini': {
+        'module': 'langchain_google_genai', 'class': 'ChatGoogleGenerativeAI',
+        'model': 'gemini-1.5-flash', 'api_key_env': 'GEMINI_API_KEY',
+        'kwargs': ('model', 'google_api_key', 'timeout'),
+    },
+    'groq': {
+        'module': 'langchain_groq', 'class': 'ChatGroq',
+        'model': 'llama3-70b-8192', 'api_key_env': 'GROQ_API_KEY',
+        'kwargs': ('model_name', 'groq_api_key', 'request_timeout'),
+    },
+    'stub': {
+        'module': 'langchain_core.language_models.fake_chat_models', 'class': 'FakeListChatModel',
+        'model': 'stub', 'api_key_env': None, 'kwargs': None,
+    },
+}
+
+# Registries still referenced (e.g. by an app); dropped apps fall out on their own
+_live_registries = weakref.WeakSet()
+
+def _reset_after_fork():
+    """Reset every live registry in a forked child (one hook per process)."""
+    for registry in list(_live_registries):
+        registry._reset_in_child()
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+class LLMRegistry:
+    """
+    Lazily built chat model and named prompt chains for one provider.
+
+    Args:
+        provider: Key of PROVIDERS
+        api_key: Key for the provider's API, read from its environment
+                 variable when not given (ignored by 'stub')
+        model: Model name, defaults to the provider's default
+        timeout: Seconds per LLM call
+        max_retries: Retries after a failed or timed out call
+    """
+
+    def __init__(self, provider='gemini', api_key=None, model=None, timeout=30, max_retries=1):
+        if provider not in PROVIDERS:
+            raise ValueError(f"Unknown LLM provider: {provider}")
+        spec = PROVIDERS[provider]
+        self.provider = provider
+        self.api_key = api_key or (spec['api_key_env'] and os.getenv(spec['api_key_env']))
+        self.model_name = model or spec['model']
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self._llm = None
+        self._chains = {}
+        self._lock = threading.Lock()
+        _live_registries.add(self)
+
+    def llm(self):
+        """The chat model, created on first use."""
+        if self._llm is None:
+            with self._lock:
+                if self._llm is None:
+                    self._llm = self._build()
+        return self._llm
+
+    def _build(self):
+        spec = PROVIDERS[self.provider]
+        model_class = getattr(importlib.import_module(spec['module']), spec['class'])
+        if spec['kwargs'] is None:
+            return model_class(responses=[STUB_RESPONSE])
+
+        model_kwarg, key_kwarg, timeout_kwarg = spec['kwargs']
+        return model_class(**{
+            model_kwarg: self.model_name,
+            key_kwarg: self.api_key,
+            timeout_kwarg: self.timeout,
+            'max_retries': self.max_retries,
+        })
+
+    def chain(self, name, messages):
+        """
+        `ChatPromptTemplate.from_messages(messages) | llm`, built once per name.
+
+        Args:
+            name: Cache key for the chain, e.g. 'momo_insights'
+            messages: Prompt messages, only parsed the first time
+        """
+        chain = self._chains.get(name)
+        if chain is None:
+            from langchain_core.prompts import ChatPromptTemplate
+
+            llm = self.llm()
+            with self._lock:
+                chain = self._chains.get(name)
+                if chain is None:
+                    chain = ChatPromptTemplate.from_messages(messages) | llm
+                    self._chains[name] = chain
+        return chain
+
+    def reset(self):
+        """Drop the client and chains, e.g. in a forked worker that inherited them."""
+        with self._lock:
+            self._llm = None
+            self._chains = {}
+
+    def _reset_in_child(self):
+        """
+        reset() for the at-fork hook. Another thread may have held the lock
+        when the parent forked; it never releases it in the child, so the
+        lock is replaced instead of acquired.
+        """
+        self._lock = threading.Lock()
+        self._llm = None
+        self._chains = {}
@@ -0,0 +1,73 @@
+"""Add MoMo transaction search index
+
+Revision ID: e4b81d6f2a93
+Revises: c7e2b94d1a08
+Create Date: 2026-10-18 13:02:47.115820
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e4b81d6f2a93'
+down_revision = 'c7e2b94d1a08'
+branch_labels = None
+depends_on = None
+
+SEARCH_COLUMNS = ('counterparty', 'payment_type', 'reference')
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        # Trigram GIN indexes let ILIKE '%term%' use an index
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        for name in SEARCH_COLUMNS:
+            op.execute(f'CREATE INDEX IF NOT EXISTS ix_momo_transaction_{name}_trgm '
+                       f'ON mo_mo_transaction USING gin ({name} gin_trgm_ops)')
+
+    elif dialect == 'sqlite':
+        # FTS5 shadow table kept in sync by triggers
+        op.execute("""
+            CREATE VIRTUAL TABLE IF NOT EXISTS mo_mo_transaction_fts USING fts5(
+                counterparty, payment_type, reference,
+                content='mo_mo_transaction', content_rowid='id', tokenize='trigram'
+            )
+        """)
+        op.execute("""
+            CREATE TRIGGER IF NOT EXISTS mo_mo_transaction_fts_insert AFTER INSERT ON mo_mo_transaction BEGIN
+                INSERT INTO mo_mo_transaction_fts (rowid, counterparty, payment_type, reference)
+                VALUES (new.id, new.counterparty, new.payment_type, new.reference);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER IF NOT EXISTS mo_mo_transaction_fts_delete AFTER DELETE ON mo_mo_transaction BEGIN
+                INSERT INTO mo_mo_transaction_fts (mo_mo_transaction_fts, rowid, counterparty, payment_type, reference)
+                VALUES ('delete', old.id, old.counterparty, old.payment_type, old.reference);
+            END
+        """)
+        op.execute("""
+            CREATE TRIGGER IF NOT EXISTS mo_mo_transaction_fts_update AFTER UPDATE ON mo_mo_transaction BEGIN
+                INSERT INTO mo_mo_transaction_fts (mo_mo_transaction_fts, rowid, counterparty, payment_type, reference)
+                VALUES ('delete', old.id, old.counterparty, old.payment_type, old.reference);
+                INSERT INTO mo_mo_transaction_fts (rowid, counterparty, payment_type, reference)
+                VALUES (new.id, new.counterparty, new.payment_type, new.reference);
+            END
+        """)
+        # Index existing rows
+        op.execute("INSERT INTO mo_mo_transaction_fts (mo_mo_transaction_fts) VALUES ('rebuild')")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        for name in SEARCH_COLUMNS:
+            op.execute(f'DROP INDEX IF EXISTS ix_momo_transaction_{name}_trgm')
+
+    elif dialect == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS mo_mo_transaction_fts_update')
+        op.execute('DROP TRIGGER IF EXISTS mo_mo_transaction_fts_delete')
+        op.execute('DROP TRIGGER IF EXISTS mo_mo_transaction_fts_insert')
+        op.execute('DROP TABLE IF EXISTS mo_mo_transaction_fts')
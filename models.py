@@ -0,0 +1,301 @@
+"""
+Database Models
+===============
+SQLAlchemy models plus the helpers that maintain derived data: the MoMo
+monthly rollup and the per-user compiled categorization rules.
+"""
+
+from datetime import datetime
+
+from flask_login import UserMixin
+from sqlalchemy import func, insert, literal, select, event
+
+from extensions import db, login_manager
+from momo_bulk import upsert_from_select_add
+from momo_import import CategoryMatcherCache, EXACT_DUPLICATE_CONFIDENCE
+from momo_search import install_search_index
+
+# Define database models
+class User(UserMixin, db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(100), unique=True, nullable=False)
+    email = db.Column(db.String(100), unique=True, nullable=False)
+    password = db.Column(db.String(200), nullable=False)
+    name = db.Column(db.String(100), nullable=False)
+    date_registered = db.Column(db.DateTime, default=datetime.utcnow)
+    currency = db.Column(db.String(10), default='GHS')  # Default to Ghanaian Cedi
+    category_rules_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')  # Bumped on category changes
+
+    # Relationships
+    accounts = db.relationship('Account', backref='owner', lazy=True)
+    categories = db.relationship('Category', backref='owner', lazy=True)
+    transactions = db.relationship('Transaction', backref='user', lazy=True)
+
+class Account(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    balance = db.Column(db.Float, default=0.0)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    
+    # Relationship with transactions
+    transactions = db.relationship('Transaction', backref='account', lazy=True)
+
+class Category(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)
+    type = db.Column(db.String(10), nullable=False)  # 'income' or 'expense'
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    keywords = db.Column(db.JSON)  # Auto-categorization keywords for imports
+
+    # Relationship with transactions
+    transactions = db.relationship('Transaction', backref='category', lazy=True)
+
+class Transaction(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    type = db.Column(db.String(10), nullable=False)  # 'income' or 'expense'
+    amount = db.Column(db.Float, nullable=False)
+    description = db.Column(db.String(200))
+    date = db.Column(db.Date, default=datetime.utcnow)
+
+    # Foreign keys
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    account_id = db.Column(db.Integer, db.ForeignKey('account.id'), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False)
+
+    # Extended fields for MoMo imports
+    counterparty = db.Column(db.String(200))  # Name/phone of other party
+    payment_method = db.Column(db.String(50))  # CASH OUT, MOMO USER, etc.
+    balance_after = db.Column(db.Float)  # Balance after transaction
+    transaction_id = db.Column(db.String(50), unique=True, nullable=True)  # MoMo transaction ID
+    fees = db.Column(db.Float, default=0.0)
+    tax = db.Column(db.Float, default=0.0)
+    reference = db.Column(db.String(200))  # Additional reference info
+    notes = db.Column(db.Text)
+
+    # Routes filter by user and then order/range by date
+    __table_args__ = (
+        db.Index('ix_transaction_user_date', user_id, date.desc()),
+        db.Index('ix_transaction_user_type_date', user_id, type, date),
+        db.Index('ix_transaction_user_category', user_id, category_id),
+    )
+
+class ImportLog(db.Model):
+    """Track PDF import history"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    filename = db.Column(db.String(255), nullable=False)
+    import_date = db.Column(db.DateTime, default=datetime.utcnow)
+    total_transactions = db.Column(db.Integer, default=0)
+    successful_imports = db.Column(db.Integer, default=0)
+    failed_imports = db.Column(db.Integer, default=0)
+    skipped_imports = db.Column(db.Integer, default=0)  # Selected rows that already existed
+    status = db.Column(db.String(20), default='pending')  # queued, processing, staged (preview ready), completed, failed
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Stale job detection
+    file_path = db.Column(db.String(500))
+    file_hash = db.Column(db.String(64), index=True)  # SHA-256 of the upload, keys the parse cache
+    error_message = db.Column(db.Text)  # Why parsing failed, shown on the preview page
+    preview_data = db.Column(db.Text)  # JSON summary/errors for the preview page, cleared on commit
+
+    # Relationship
+    user = db.relationship('User', backref=db.backref('import_logs', lazy=True))
+
+class MoMoTransaction(db.Model):
+    """Separate table for MoMo transactions"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+
+    # Transaction details
+    type = db.Column(db.String(10), nullable=False)  # 'income', 'expense', 'transfer'
+    amount = db.Column(db.Float, nullable=False)
+    date = db.Column(db.DateTime, nullable=False)
+
+    # MoMo-specific fields
+    payment_type = db.Column(db.String(100))  # CASH OUT, MOMO PAY, etc.
+    counterparty = db.Column(db.String(200))  # Name of other party
+    counterparty_phone = db.Column(db.String(50))  # Phone number
+    transaction_id = db.Column(db.String(50), unique=True, nullable=True)
+    fees = db.Column(db.Float, default=0.0)
+    tax = db.Column(db.Float, default=0.0)
+    balance_after = db.Column(db.Float)
+    reference = db.Column(db.String(200))
+
+    # Categorization
+    category = db.Column(db.String(100))  # Auto-categorized category name
+
+    # Import tracking
+    import_log_id = db.Column(db.Integer, db.ForeignKey('import_log.id'))
+
+    # Relationships
+    user = db.relationship('User', backref=db.backref('momo_transactions', lazy=True))
+    import_log = db.relationship('ImportLog', backref=db.backref('momo_transactions', lazy=True))
+
+    # Routes filter by user and then order/range by date
+    __table_args__ = (
+        db.Index('ix_momo_transaction_user_date', user_id, date.desc()),
+        db.Index('ix_momo_transaction_user_type_date', user_id, type, date),
+        db.Index('ix_momo_transaction_user_category', user_id, category),
+        # Covers the duplicate lookup for rows without a transaction_id
+        db.Index('ix_momo_transaction_fingerprint', user_id, date, amount, counterparty_phone, balance_after),
+    )
+
+# Full-text/trigram search index, created alongside the table
+install_search_index(MoMoTransaction.__table__)
+
+class InsightCacheEntry(db.Model):
+    """Cached LLM insight text (see insight_cache.py)"""
+    __tablename__ = 'insight_cache'
+
+    id = db.Column(db.Integer, primary_key=True)
+    cache_key = db.Column(db.String(64), unique=True, nullable=False)  # Hash of model, prompt version, context
+    model = db.Column(db.String(100), nullable=False)
+    prompt_version = db.Column(db.String(20), nullable=False)
+    content = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, nullable=False)
+    last_used_at = db.Column(db.DateTime, nullable=False, index=True)  # LRU eviction order
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    hit_count = db.Column(db.Integer, nullable=False, default=0)
+
+class MoMoMonthlyRollup(db.Model):
+    """Per-user monthly MoMo totals, maintained on import commit and on delete"""
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    month = db.Column(db.String(7), nullable=False)  # 'YYYY-MM'
+    type = db.Column(db.String(10), nullable=False)  # 'income', 'expense', 'transfer'
+    category = db.Column(db.String(100), nullable=False)  # 'Other' when uncategorized
+
+    count = db.Column(db.Integer, nullable=False, default=0)
+    amount = db.Column(db.Float, nullable=False, default=0.0)
+    fees = db.Column(db.Float, nullable=False, default=0.0)
+    tax = db.Column(db.Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'month', 'type', 'category', name='uq_momo_monthly_rollup_key'),
+    )
+
+class ImportStagingRow(db.Model):
+    """Parsed statement rows awaiting review on the import preview page"""
+    id = db.Column(db.Integer, primary_key=True)
+    import_log_id = db.Column(db.Integer, db.ForeignKey('import_log.id'), nullable=False)
+    position = db.Column(db.Integer, nullable=False)  # Row order within the statement
+
+    # Parsed transaction details (mirrors MoMoTransaction)
+    type = db.Column(db.String(10), nullable=False)
+    amount = db.Column(db.Float, nullable=False)
+    date = db.Column(db.DateTime, nullable=False)
+    payment_type = db.Column(db.String(100))
+    counterparty = db.Column(db.String(200))
+    counterparty_phone = db.Column(db.String(50))
+    transaction_id = db.Column(db.String(50))
+    fees = db.Column(db.Float, default=0.0)
+    tax = db.Column(db.Float, default=0.0)
+    balance_after = db.Column(db.Float)
+    reference = db.Column(db.String(200))
+
+    # Review state
+    suggested_category = db.Column(db.String(100))
+    category = db.Column(db.String(100))  # Category chosen on the preview page
+    is_duplicate = db.Column(db.Boolean, default=False)
+    duplicate_confidence = db.Column(db.Float)  # 1.0 = same transaction_id, lower = fingerprint match
+    selected = db.Column(db.Boolean, default=True)
+
+    @property
+    def is_exact_duplicate(self):
+        """Same transaction ID as a stored or earlier row: never imported."""
+        return self.duplicate_confidence == EXACT_DUPLICATE_CONFIDENCE
+
+    __table_args__ = (
+        db.UniqueConstraint('import_log_id', 'position', name='uq_import_staging_row_position'),
+    )
+
+def month_key(column):
+    """SQL expression for the 'YYYY-MM' month of a date column."""
+    if db.engine.dialect.name == 'postgresql':
+        return func.to_char(column, 'YYYY-MM')
+    return func.strftime('%Y-%m', column)
+
+def momo_rollup_groups():
+    """Columns that aggregate MoMoTransaction rows into rollup groups."""
+    return (
+        month_key(MoMoTransaction.date),
+        MoMoTransaction.type,
+        func.coalesce(MoMoTransaction.category, 'Other'),
+    )
+
+def add_import_to_rollup(import_log_id, user_id):
+    """Add the MoMo transactions committed by an import to the monthly rollup."""
+    groups = momo_rollup_groups()
+    # One upsert that adds in SQL, so concurrent imports into the same month can't lose updates
+    upsert_from_select_add(
+        db.session.connection(), MoMoMonthlyRollup.__table__,
+        ['user_id', 'month', 'type', 'category', 'count', 'amount', 'fees', 'tax'],
+        select(
+            literal(user_id),
+            *groups,
+            func.count(MoMoTransaction.id),
+            func.sum(MoMoTransaction.amount),
+            func.sum(func.coalesce(MoMoTransaction.fees, 0)),
+            func.sum(func.coalesce(MoMoTransaction.tax, 0))
+        ).where(MoMoTransaction.import_log_id == import_log_id).group_by(*groups),
+        conflict_columns=['user_id', 'month', 'type', 'category']
+    )
+
+def rebuild_momo_rollup():
+    """Recompute the whole monthly rollup table from MoMoTransaction."""
+    groups = momo_rollup_groups()
+    MoMoMonthlyRollup.query.delete()
+    db.session.execute(
+        insert(MoMoMonthlyRollup).from_select(
+            ['user_id', 'month', 'type', 'category', 'count', 'amount', 'fees', 'tax'],
+            select(
+                MoMoTransaction.user_id,
+                *groups,
+                func.count(MoMoTransaction.id),
+                func.sum(MoMoTransaction.amount),
+                func.sum(func.coalesce(MoMoTransaction.fees, 0)),
+                func.sum(func.coalesce(MoMoTransaction.tax, 0))
+            ).group_by(MoMoTransaction.user_id, *groups)
+        )
+    )
+    db.session.commit()
+
+@event.listens_for(MoMoTransaction, 'after_delete')
+def remove_from_rollup(mapper, connection, target):
+    """
+    Subtract a deleted MoMo transaction from the monthly rollup.
+
+    Only fires for ORM deletes; bulk Query.delete() skips it, so run
+    `flask rebuild-momo-rollup` after bulk deletes.
+    """
+    rollup = MoMoMonthlyRollup.__table__
+    key = (
+        (rollup.c.user_id == target.user_id) &
+        (rollup.c.month == target.date.strftime('%Y-%m')) &
+        (rollup.c.type == target.type) &
+        (rollup.c.category == (target.category or 'Other'))
+    )
+    connection.execute(rollup.update().where(key).values(
+        count=rollup.c.count - 1,
+        amount=rollup.c.amount - target.amount,
+        fees=rollup.c.fees - (target.fees or 0),
+        tax=rollup.c.tax - (target.tax or 0)
+    ))
+    connection.execute(rollup.delete().where(key & (rollup.c.count <= 0)))
+
+@login_manager.user_loader
+def load_user(user_id):
+    return User.query.get(int(user_id))
+
+# Compiled auto-categorization rules, per user
+category_matchers = CategoryMatcherCache()
+
+def get_category_matcher(user_id):
+    """Return the user's compiled CategoryMatcher, querying categories only on a cache miss."""
+    version = db.session.query(User.category_rules_version).filter_by(id=user_id).scalar() or 0
+    return category_matchers.get(
+        user_id, version,
+        lambda: Category.query.filter_by(user_id=user_id).order_by(Category.id).all()
+    )
+
+def bump_category_rules(user):
+    """Mark the user's categorization rules as changed (commit to apply)."""
+    user.category_rules_version = (user.category_rules_version or 0) + 1
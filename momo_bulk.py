@@ -0,0 +1,134 @@
+"""
+Bulk Write Helpers for MoMo Imports
+===================================
+Dialect-aware helpers for writing many rows in a few statements:
+COPY on PostgreSQL, executemany elsewhere, INSERT ... SELECT that skips
+rows whose unique key already exists, and INSERT ... SELECT that adds
+onto existing rows (counters) in the database.
+"""
+
+import csv
+import io
+from sqlalchemy import and_, insert
+from sqlalchemy.dialects import postgresql, sqlite
+
+# =============================================================================
+# ROW INSERTS
+# =============================================================================
+
+def bulk_insert(connection, table, rows):
+    """
+    Insert a list of row dicts into `table`.
+
+    Uses COPY FROM STDIN on PostgreSQL and a single executemany INSERT on
+    other databases. All rows must have the same keys.
+
+    Args:
+        connection: SQLAlchemy Connection (e.g. db.session.connection())
+        table: Table to insert into
+        rows: List of dicts keyed by column name
+
+    Returns:
+        Number of rows written
+    """
+    if not rows:
+        return 0
+
+    if connection.dialect.name == 'postgresql':
+        _copy_rows(connection, table, rows)
+    else:
+        connection.execute(insert(table), rows)
+    return len(rows)
+
+def _copy_rows(connection, table, rows):
+    """Stream rows to PostgreSQL with COPY ... FROM STDIN (CSV)."""
+    columns = list(rows[0].keys())
+
+    buffer = io.StringIO()
+    # Quote everything except None so empty strings stay distinct from NULL
+    writer = csv.writer(buffer, quoting=csv.QUOTE_NOTNULL)
+    for row in rows:
+        writer.writerow([row[column] for column in columns])
+    buffer.seek(0)
+
+    column_list = ', '.join(f'"{column}"' for column in columns)
+    sql = f'COPY "{table.name}" ({column_list}) FROM STDIN WITH (FORMAT csv)'
+
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        if hasattr(cursor, 'copy_expert'):
+            # psycopg2
+            cursor.copy_expert(sql, buffer)
+        else:
+            # psycopg 3
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+# =============================================================================
+# INSERT ... SELECT
+# =============================================================================
+
+def insert_from_select_skip_conflicts(connection, table, columns, select_stmt, conflict_columns):
+    """
+    Run INSERT INTO table (columns) SELECT ... ON CONFLICT DO NOTHING.
+
+    Rows that would violate the unique index on `conflict_columns` are
+    skipped instead of aborting the statement.
+
+    Returns:
+        Number of rows actually inserted
+    """
+    stmt = _conflict_insert(connection, table)
+    stmt = stmt.from_select(columns, select_stmt)
+    if connection.dialect.name in ('postgresql', 'sqlite'):
+        stmt = stmt.on_conflict_do_nothing(index_elements=conflict_columns)
+
+    result = connection.execute(stmt)
+    return result.rowcount
+
+def upsert_from_select_add(connection, table, columns, select_stmt, conflict_columns):
+    """
+    Run INSERT INTO table (columns) SELECT ... ON CONFLICT (conflict_columns)
+    DO UPDATE SET col = col + excluded.col for every other column.
+
+    The addition happens in the database, so concurrent callers adding to
+    the same key can't overwrite each other's totals (as a read, add in
+    Python, write back would).
+
+    Args:
+        connection: SQLAlchemy Connection (e.g. db.session.connection())
+        table: Table to upsert into
+        columns: Target column names, in select order
+        select_stmt: Select producing one row per key
+        conflict_columns: Columns of the unique constraint
+    """
+    add_columns = [column for column in columns if column not in conflict_columns]
+
+    if connection.dialect.name in ('postgresql', 'sqlite'):
+        stmt = _conflict_insert(connection, table).from_select(columns, select_stmt)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=conflict_columns,
+            set_={column: table.c[column] + stmt.excluded[column] for column in add_columns}
+        )
+        connection.execute(stmt)
+        return
+
+    # No upsert: UPDATE ... SET col = col + :value, inserting keys not yet present
+    for row in connection.execute(select_stmt).all():
+        values = dict(zip(columns, row))
+        key = and_(*(table.c[column] == values[column] for column in conflict_columns))
+        updated = connection.execute(table.update().where(key).values(
+            {column: table.c[column] + values[column] for column in add_columns}
+        ))
+        if updated.rowcount == 0:
+            connection.execute(insert(table).values(values))
+
+def _conflict_insert(connection, table):
+    """Return an INSERT construct that supports ON CONFLICT for this dialect."""
+    if connection.dialect.name == 'postgresql':
+        return postgresql.insert(table)
+    if connection.dialect.name == 'sqlite':
+        return sqlite.insert(table)
+    return insert(table)
@@ -4,19 +4,101 @@ MTN Mobile Money PDF Statement Import Module
 This module handles parsing and importing MoMo PDF statements into FinInsight.
 """
 
-import os
+import math
+import multiprocessing
 import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, fields, MISSING
 from datetime import datetime
+from itertools import batched
 from werkzeug.utils import secure_filename
-import pdfplumber
+
+from config import Config
 
 # =============================================================================
 # CONFIGURATION
 # =============================================================================
 
-UPLOAD_FOLDER = 'uploads/statements'
 ALLOWED_EXTENSIONS = {'pdf'}
-MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB
+MAX_FILE_SIZE = Config.MAX_STATEMENT_SIZE
+
+# Bump whenever parser output changes, so cached parses are not reused
+PARSER_VERSION = 2
+
+# Parallel PDF extraction (worker count comes from Config.PARSE_WORKERS)
+PARALLEL_PAGE_THRESHOLD = 20  # Statements with fewer pages are parsed serially
+# Parsing runs inside the import job threads; forking a multithreaded process is unsafe
+PARSE_POOL_CONTEXT = multiprocessing.get_context('spawn')
+
+# =============================================================================
+# PARSED ROW RECORD
+# =============================================================================
+
+class _Unset:
+    """Marker for pipeline fields a stage hasn't filled in yet."""
+    __slots__ = ()
+
+    def __repr__(self):
+        return '<unset>'
+
+    def __reduce__(self):
+        # Unpickle to the module singleton (rows cross process boundaries)
+        return '_UNSET'
+
+_UNSET = _Unset()
+
+@dataclass(slots=True)
+class MoMoRow:
+    """
+    One parsed statement row.
+
+    A __slots__ record instead of a dict: no per-row key table, so large
+    statements use far less memory. It also supports the read/write
+    mapping calls the pipeline stages use (row['amount'], row.get(...),
+    row['is_duplicate'] = ...), so stages accept plain dicts as well.
+    """
+    date: datetime
+    payment_type: str
+    counterparty: str
+    counterparty_phone: str
+    amount: float
+    transaction_id: str
+    fees: float
+    tax: float
+    balance_after: float
+    reference: str
+    type: str
+    page: int
+    row: int
+
+    # Filled in by categorize_stream / dedup_stream
+    suggested_category: str = _UNSET
+    is_duplicate: bool = _UNSET
+    duplicate_confidence: float = _UNSET
+
+    def get(self, key, default=None):
+        value = getattr(self, key, _UNSET)
+        return default if value is _UNSET else value
+
+    def __getitem__(self, key):
+        value = getattr(self, key, _UNSET)
+        if value is _UNSET:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key not in ROW_FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return getattr(self, key, _UNSET) is not _UNSET
+
+ROW_FIELDS = tuple(field.name for field in fields(MoMoRow))
+# Fields produced by the PDF parser itself (the rest are filled in by later stages)
+PARSED_FIELDS = tuple(field.name for field in fields(MoMoRow) if field.default is MISSING)
 
 # =============================================================================
 # HELPER FUNCTIONS
@@ -26,30 +108,81 @@ def allowed_file(filename):
     """Check if file has allowed extension."""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def parse_momo_date(date_str):
+# Date layouts seen in MoMo statements, most common first. They never
+# produce different datetimes for the same string, so the order only
+# affects speed (which is what lets ParseContext try its last hit first).
+DATE_FORMATS = [
+    "%d %b %Y %H:%M",      # Standard: "20 Nov 2025 18:18"
+    "%d %B %Y %H:%M",      # Full month name
+    "%d/%m/%Y %H:%M",      # Numeric format
+    "%Y-%m-%d %H:%M:%S",   # ISO format
+    "%d %b %Y",            # Without time
+]
+
+_MONTH_ABBREVIATIONS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+
+# Currency letters, thousands separators and whitespace stripped from amounts
+_AMOUNT_CLEAN_RE = re.compile(r'[GHS\s,]')
+_ASCII_AMOUNT_DELETE = b'GHS,' + bytes(code for code in range(128) if chr(code).isspace())
+
+_DATE_CELL_RE = re.compile(r'\d{1,2}\s+\w+\s+\d{4}')
+_PHONE_CHAR_RE = re.compile(r'[\d+]')
+
+def _clean_amount(text):
+    """Strip amount noise; bytes.translate for the usual ASCII cell, regex otherwise."""
+    if text.isascii():
+        return text.encode('ascii').translate(None, _ASCII_AMOUNT_DELETE).decode('ascii')
+    return _AMOUNT_CLEAN_RE.sub('', text)
+
+def _is_ascii_number(text, min_len, max_len):
+    return min_len <= len(text) <= max_len and text.isascii() and text.isdigit()
+
+def _fast_parse_standard_date(date_str):
     """
-    Parse MoMo date format to Python datetime.
-    Format: "20 Nov 2025 18:18"
+    Hand-rolled parser for "%d %b %Y %H:%M" (e.g. "20 Nov 2025 18:18").
+
+    Returns None whenever the string isn't in exactly that shape, so the
+    caller can fall back to strptime for anything unusual.
     """
+    parts = date_str.split()
+    if len(parts) != 4:
+        return None
+    day, month, year, clock = parts
+    month_num = _MONTH_ABBREVIATIONS.get(month.lower())
+    if month_num is None:
+        return None
+    hour, sep, minute = clock.partition(':')
+    if not (sep and _is_ascii_number(day, 1, 2) and _is_ascii_number(year, 4, 4)
+            and _is_ascii_number(hour, 1, 2) and _is_ascii_number(minute, 1, 2)):
+        return None
     try:
-        # Clean the date string
-        date_str = date_str.strip()
-        return datetime.strptime(date_str, "%d %b %Y %H:%M")
+        return datetime(int(year), month_num, int(day), int(hour), int(minute))
     except ValueError:
-        # Try alternative formats
-        formats = [
-            "%d %B %Y %H:%M",      # Full month name
-            "%d/%m/%Y %H:%M",      # Numeric format
-            "%Y-%m-%d %H:%M:%S",   # ISO format
-            "%d %b %Y",            # Without time
-        ]
-        for fmt in formats:
-            try:
-                return datetime.strptime(date_str, fmt)
-            except ValueError:
-                continue
         return None
 
+def _parse_date_formats(date_str, formats):
+    """Try each strptime format in turn; returns (datetime, format) or (None, None)."""
+    for fmt in formats:
+        try:
+            return datetime.strptime(date_str, fmt), fmt
+        except ValueError:
+            continue
+    return None, None
+
+def parse_momo_date(date_str):
+    """
+    Parse MoMo date format to Python datetime.
+    Format: "20 Nov 2025 18:18"
+    """
+    date_str = date_str.strip()
+    parsed = _fast_parse_standard_date(date_str)
+    if parsed is not None:
+        return parsed
+    return _parse_date_formats(date_str, DATE_FORMATS)[0]
+
 def parse_amount(amount_str):
     """
     Parse amount string to float.
@@ -60,7 +193,7 @@ def parse_amount(amount_str):
         return 0.0, False
 
     # Remove currency symbols and whitespace
-    cleaned = re.sub(r'[GHS\s,]', '', str(amount_str))
+    cleaned = _clean_amount(str(amount_str))
 
     # Check if expense (negative)
     is_expense = cleaned.startswith('-')
@@ -79,12 +212,40 @@ def parse_fee_or_tax(value_str):
     if not value_str:
         return 0.0
 
-    cleaned = re.sub(r'[GHS\s,]', '', str(value_str))
+    cleaned = _clean_amount(str(value_str))
     try:
         return float(cleaned)
     except ValueError:
         return 0.0
 
+class ParseContext:
+    """
+    Per-statement parsing state.
+
+    Remembers which date format last succeeded and tries it first, since a
+    statement almost always uses a single layout throughout.
+    """
+
+    def __init__(self):
+        self.date_format = DATE_FORMATS[0]
+
+    def parse_date(self, date_str):
+        """Same result as parse_momo_date(), trying the remembered format first."""
+        date_str = date_str.strip()
+        if self.date_format == DATE_FORMATS[0]:
+            parsed = _fast_parse_standard_date(date_str)
+            if parsed is not None:
+                return parsed
+
+        parsed, fmt = _parse_date_formats(date_str, [self.date_format])
+        if parsed is None:
+            parsed, fmt = _parse_date_formats(
+                date_str, [f for f in DATE_FORMATS if f != self.date_format]
+            )
+        if fmt is not None:
+            self.date_format = fmt
+        return parsed
+
 def extract_counterparty(to_from_str):
     """
     Extract phone number and name from To/From field.
@@ -100,7 +261,7 @@ def extract_counterparty(to_from_str):
     name = parts[1].strip() if len(parts) > 1 else None
 
     # If first part doesn't look like a phone, it might be the name
-    if phone and not re.search(r'[\d+]', phone):
+    if phone and not _PHONE_CHAR_RE.search(phone):
         name = phone
         phone = None
 
@@ -125,56 +286,82 @@ def determine_transaction_type(payment_type, amount_is_expense):
 # PDF PARSING
 # =============================================================================
 
-def parse_momo_pdf(file_path):
+def parse_momo_pdf(file_path, workers=1, parallel_threshold=PARALLEL_PAGE_THRESHOLD):
     """
     Parse MTN MoMo PDF statement and extract transactions.
 
+    Thin wrapper that collects iter_momo_pdf() into a list.
+
     Args:
         file_path: Path to the PDF file
+        workers: Number of worker processes (1 parses serially)
+        parallel_threshold: Minimum page count before the pool is used
 
     Returns:
-        dict with 'transactions' list and 'errors' list
+        dict with 'transactions' list (MoMoRow records) and 'errors' list
     """
-    transactions = []
     errors = []
+    transactions = list(iter_momo_pdf(file_path, errors, workers, parallel_threshold))
+
+    return {
+        'transactions': transactions,
+        'errors': errors,
+        'total_parsed': len(transactions),
+        'total_errors': len(errors)
+    }
+
+def iter_momo_pdf(file_path, errors=None, workers=1, parallel_threshold=PARALLEL_PAGE_THRESHOLD):
+    """
+    Yield parsed transactions from a MoMo PDF statement page by page.
+
+    Large statements are split into page ranges and extracted in a process
+    pool; rows are still yielded in page/row order, identical to the serial
+    path.
+
+    Args:
+        file_path: Path to the PDF file
+        errors: Optional list that row and file errors are appended to
+        workers: Number of worker processes (1 parses serially)
+        parallel_threshold: Minimum page count before the pool is used
+
+    Yields:
+        MoMoRow records
+    """
+    if errors is None:
+        errors = []
+
+    page_count = count_pdf_pages(file_path) if workers > 1 else 0
+
+    if workers > 1 and page_count >= parallel_threshold:
+        yield from _iter_pages_parallel(file_path, page_count, workers, errors)
+    else:
+        yield from iter_page_range(file_path, errors)
+
+def count_pdf_pages(file_path):
+    """Return the number of pages in a PDF, or 0 if it cannot be opened."""
+    import pdfplumber
 
     try:
         with pdfplumber.open(file_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                # Extract tables from page
-                tables = page.extract_tables()
-
-                for table in tables:
-                    if not table:
-                        continue
-
-                    # Find header row to determine column positions
-                    header_row = None
-                    data_start = 0
-
-                    for i, row in enumerate(table):
-                        if row and any('Date' in str(cell) for cell in row if cell):
-                            header_row = row
-                            data_start = i + 1
-                            break
-
-                    # If no header found, try to parse as data rows
-                    if not header_row:
-                        data_start = 0
-
-                    # Process data rows
-                    for row_num, row in enumerate(table[data_start:], data_start + 1):
-                        try:
-                            transaction = parse_table_row(row, page_num, row_num)
-                            if transaction:
-                                transactions.append(transaction)
-                        except Exception as e:
-                            errors.append({
-                                'page': page_num,
-                                'row': row_num,
-                                'error': str(e),
-                                'data': row
-                            })
+            return len(pdf.pages)
+    except Exception:
+        return 0
+
+def iter_page_range(file_path, errors, start=0, stop=None):
+    """
+    Open the PDF and yield transactions from pages[start:stop].
+
+    Stops early and records a page 0 error if the PDF cannot be read.
+    """
+    import pdfplumber
+
+    context = ParseContext()
+    try:
+        with pdfplumber.open(file_path) as pdf:
+            for page_num, page in enumerate(pdf.pages[start:stop], start + 1):
+                page_transactions = []
+                parse_page(page, page_num, page_transactions, errors, context)
+                yield from page_transactions
 
     except Exception as e:
         errors.append({
@@ -184,16 +371,77 @@ def parse_momo_pdf(file_path):
             'data': None
         })
 
-    return {
-        'transactions': transactions,
-        'errors': errors,
-        'total_parsed': len(transactions),
-        'total_errors': len(errors)
-    }
+def parse_page_range(file_path, start=0, stop=None):
+    """
+    Parse pages[start:stop] of the PDF into lists.
+
+    Runs in worker processes, so it only takes picklable arguments.
 
-def parse_table_row(row, page_num, row_num):
+    Returns:
+        (transactions, errors, aborted) - aborted is True when the PDF could
+        not be read and parsing stopped early
+    """
+    errors = []
+    transactions = list(iter_page_range(file_path, errors, start, stop))
+    aborted = bool(errors) and errors[-1]['page'] == 0
+    return transactions, errors, aborted
+
+def _iter_pages_parallel(file_path, page_count, workers, errors):
+    """Extract page ranges in a process pool and yield them in page order."""
+    chunk_size = -(-page_count // workers)  # ceil division
+    starts = list(range(0, page_count, chunk_size))
+    stops = [start + chunk_size for start in starts]
+
+    with ProcessPoolExecutor(max_workers=len(starts), mp_context=PARSE_POOL_CONTEXT) as executor:
+        chunks = executor.map(parse_page_range, [file_path] * len(starts), starts, stops)
+
+        for chunk_transactions, chunk_errors, aborted in chunks:
+            errors.extend(chunk_errors)
+            yield from chunk_transactions
+            # The serial path stops at the first unreadable page
+            if aborted:
+                break
+
+def parse_page(page, page_num, transactions, errors, context=None):
+    """Extract transaction rows from a single PDF page."""
+    # Extract tables from page
+    tables = page.extract_tables()
+
+    for table in tables:
+        if not table:
+            continue
+
+        # Find header row to determine column positions
+        header_row = None
+        data_start = 0
+
+        for i, row in enumerate(table):
+            if row and any('Date' in str(cell) for cell in row if cell):
+                header_row = row
+                data_start = i + 1
+                break
+
+        # If no header found, try to parse as data rows
+        if not header_row:
+            data_start = 0
+
+        # Process data rows
+        for row_num, row in enumerate(table[data_start:], data_start + 1):
+            try:
+                transaction = parse_table_row(row, page_num, row_num, context)
+                if transaction:
+                    transactions.append(transaction)
+            except Exception as e:
+                errors.append({
+                    'page': page_num,
+                    'row': row_num,
+                    'error': str(e),
+                    'data': row
+                })
+
+def parse_table_row(row, page_num, row_num, context=None):
     """
-    Parse a single table row into a transaction dict.
+    Parse a single table row into a MoMoRow.
 
     Expected columns (may vary):
     0: Date & Time
@@ -205,6 +453,8 @@ def parse_table_row(row, page_num, row_num):
     6: Tax
     7: Balance
     8: Reference
+
+    Pass the statement's ParseContext as `context` to reuse its date format.
     """
     if not row or len(row) < 4:
         return None
@@ -215,7 +465,7 @@ def parse_table_row(row, page_num, row_num):
 
     # Check if this looks like a data row (has a date)
     first_cell = str(row[0]) if row[0] else ''
-    if not re.search(r'\d{1,2}\s+\w+\s+\d{4}', first_cell):
+    if not _DATE_CELL_RE.search(first_cell):
         return None
 
     # Extract fields with safe indexing
@@ -233,7 +483,7 @@ def parse_table_row(row, page_num, row_num):
     reference = get_cell(8) if len(row) > 8 else ''
 
     # Parse date
-    parsed_date = parse_momo_date(date_str)
+    parsed_date = context.parse_date(date_str) if context else parse_momo_date(date_str)
     if not parsed_date:
         return None
 
@@ -254,21 +504,21 @@ def parse_table_row(row, page_num, row_num):
     # Determine transaction type
     trans_type = determine_transaction_type(payment_type, is_expense)
 
-    return {
-        'date': parsed_date,
-        'payment_type': payment_type,
-        'counterparty': counterparty,
-        'counterparty_phone': phone,
-        'amount': amount,
-        'transaction_id': str(transaction_id).strip() if transaction_id else None,
-        'fees': fees,
-        'tax': tax,
-        'balance_after': balance_after,
-        'reference': reference,
-        'type': trans_type,
-        'page': page_num,
-        'row': row_num
-    }
+    return MoMoRow(
+        date=parsed_date,
+        payment_type=payment_type,
+        counterparty=counterparty,
+        counterparty_phone=phone,
+        amount=amount,
+        transaction_id=str(transaction_id).strip() if transaction_id else None,
+        fees=fees,
+        tax=tax,
+        balance_after=balance_after,
+        reference=reference,
+        type=trans_type,
+        page=page_num,
+        row=row_num
+    )
 
 # =============================================================================
 # AUTO-CATEGORIZATION
@@ -289,74 +539,353 @@ def auto_categorize(transaction, user_categories=None):
     """
     Auto-categorize a transaction based on keywords.
 
+    Compiles a CategoryMatcher on every call; use categorize_transactions()
+    or a CategoryMatcher directly for more than a handful of rows.
+
     Args:
-        transaction: Transaction dict with payment_type, reference, counterparty
+        transaction: MoMoRow (or dict) with payment_type, reference, counterparty
         user_categories: List of user's Category objects with keywords
 
     Returns:
         Category name or 'Other'
     """
-    # Build search text from transaction fields
-    search_text = ' '.join([
-        str(transaction.get('payment_type', '')),
-        str(transaction.get('reference', '')),
-        str(transaction.get('counterparty', '')),
-    ]).lower()
-
-    # Check user's custom categories first
-    if user_categories:
-        for category in user_categories:
-            if hasattr(category, 'keywords') and category.keywords:
-                keywords = category.keywords if isinstance(category.keywords, list) else []
-                for keyword in keywords:
-                    if keyword.lower() in search_text:
-                        return category.name
-
-    # Fall back to default rules
-    for category_name, keywords in DEFAULT_CATEGORY_RULES.items():
-        for keyword in keywords:
-            if keyword in search_text:
-                return category_name
+    return CategoryMatcher.from_categories(user_categories).categorize(transaction)
 
-    # Default category based on transaction type
-    if transaction.get('type') == 'income':
-        return 'Other'  # Income Other
-    return 'Other'  # Expense Other
-
-def categorize_transactions(transactions, user_categories=None):
+def categorize_transactions(transactions, user_categories=None, matcher=None):
     """
     Add category suggestions to all transactions.
 
     Args:
-        transactions: List of transaction dicts
+        transactions: List of MoMoRow records (or dicts)
         user_categories: User's Category objects
+        matcher: Precompiled CategoryMatcher (used instead of user_categories)
 
     Returns:
         List of transactions with 'suggested_category' field added
     """
+    return list(categorize_stream(transactions, user_categories, matcher))
+
+def categorize_stream(transactions, user_categories=None, matcher=None):
+    """Streaming stage: add 'suggested_category' to each transaction as it passes."""
+    if matcher is None:
+        matcher = CategoryMatcher.from_categories(user_categories)
     for trans in transactions:
-        trans['suggested_category'] = auto_categorize(trans, user_categories)
-    return transactions
+        trans['suggested_category'] = matcher.categorize(trans)
+        yield trans
+
+def categorization_text(transaction):
+    """Lowercase text the category keywords are matched against."""
+    return ' '.join([
+        str(transaction.get('payment_type', '')),
+        str(transaction.get('reference', '')),
+        str(transaction.get('counterparty', '')),
+    ]).lower()
+
+class CategoryMatcher:
+    """
+    Keyword rules compiled into an Aho-Corasick automaton.
+
+    Rules are (category name, keywords) pairs in priority order. A text
+    is scanned once and the highest-priority category with any keyword
+    in it wins, which gives the same answer as checking each category's
+    keywords in turn, in O(len(text)) instead of O(number of keywords).
+    """
+
+    def __init__(self, rules):
+        self.names = []
+        # Automaton: goto transitions, failure links, best (lowest) rule index per state
+        self._goto = [{}]
+        self._fail = [0]
+        self._best = [None]
+        # An empty keyword matches every text
+        self._always = None
+
+        for priority, (name, keywords) in enumerate(rules):
+            self.names.append(name)
+            for keyword in keywords:
+                self._add(keyword, priority)
+        self._link()
+
+    @classmethod
+    def from_categories(cls, user_categories=None, default_rules=None):
+        """
+        Build a matcher from the user's categories followed by the defaults.
+
+        Args:
+            user_categories: Category objects with a `keywords` list (checked first)
+            default_rules: {name: [keywords]}, defaults to DEFAULT_CATEGORY_RULES
+
+        Returns:
+            CategoryMatcher
+        """
+        rules = []
+        for category in user_categories or []:
+            keywords = getattr(category, 'keywords', None)
+            if keywords and isinstance(keywords, list):
+                rules.append((category.name, [keyword.lower() for keyword in keywords]))
+        if default_rules is None:
+            default_rules = DEFAULT_CATEGORY_RULES
+        rules.extend(default_rules.items())
+        return cls(rules)
+
+    def _add(self, keyword, priority):
+        if not keyword:
+            if self._always is None:
+                self._always = priority
+            return
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._best.append(None)
+                self._goto[state][char] = next_state
+            state = next_state
+        if self._best[state] is None or priority < self._best[state]:
+            self._best[state] = priority
+
+    def _link(self):
+        """Breadth-first pass setting failure links and inheriting matches."""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+
+                inherited = self._best[self._fail[next_state]]
+                if inherited is not None and (self._best[next_state] is None or inherited < self._best[next_state]):
+                    self._best[next_state] = inherited
+
+    def match(self, text):
+        """
+        Return the highest-priority category with a keyword in `text`.
+
+        Args:
+            text: Lowercase text (see categorization_text)
+
+        Returns:
+            Category name, or None when nothing matches
+        """
+        goto, fail, best_at = self._goto, self._fail, self._best
+        best = self._always
+        if best == 0:
+            return self.names[0]
+
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            found = best_at[state]
+            if found is not None and (best is None or found < best):
+                best = found
+                if best == 0:
+                    break
+
+        return self.names[best] if best is not None else None
+
+    def categorize(self, transaction):
+        """Category name for a MoMoRow or transaction dict, or 'Other'."""
+        return self.match(categorization_text(transaction)) or 'Other'
+
+def parse_keywords(text):
+    """
+    Split a comma separated keyword field into a clean list.
+
+    Blank entries and repeats (ignoring case) are dropped; order is kept.
+    """
+    keywords = []
+    seen = set()
+    for keyword in (text or '').split(','):
+        keyword = keyword.strip()
+        if keyword and keyword.lower() not in seen:
+            seen.add(keyword.lower())
+            keywords.append(keyword)
+    return keywords
+
+class CategoryMatcherCache:
+    """
+    Process-local LRU cache of compiled CategoryMatchers per user.
+
+    Entries are tagged with the user's rules version, so a matcher
+    compiled before a category change is recompiled on the next lookup
+    even if this process missed the invalidate() call.
+    """
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # user_id -> (version, matcher)
+        self._lock = threading.Lock()
+
+    def get(self, user_id, version, load_categories):
+        """
+        Return the user's matcher, compiling it on a miss.
+
+        Args:
+            user_id: Owner of the rules
+            version: Current rules version for the user
+            load_categories: Callable returning the user's Category objects
+
+        Returns:
+            CategoryMatcher
+        """
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] == version:
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        matcher = CategoryMatcher.from_categories(load_categories())
+
+        with self._lock:
+            self._entries[user_id] = (version, matcher)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return matcher
+
+    def invalidate(self, user_id):
+        """Drop the user's compiled matcher."""
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
 
 # =============================================================================
 # DUPLICATE DETECTION
 # =============================================================================
 
-def find_duplicates(transactions, existing_transaction_ids):
+DEDUP_BATCH_SIZE = 500  # Transaction IDs looked up per query
+
+# Rows without a transaction ID are matched on date, amount, phone and
+# balance. Same minute and amount alone is weak evidence; the running
+# balance almost never repeats, so a match including it is near certain.
+# A blank balance parses as 0.0 and counts as missing.
+FINGERPRINT_BASE_CONFIDENCE = 0.6
+FINGERPRINT_BALANCE_CONFIDENCE = 0.3
+FINGERPRINT_PHONE_CONFIDENCE = 0.09
+DUPLICATE_THRESHOLD = 0.9  # Matches this sure are flagged (unticked by default, still selectable)
+EXACT_DUPLICATE_CONFIDENCE = 1.0  # Same transaction ID: the only matches blocked from import
+
+def transaction_fingerprint(trans):
     """
-    Mark transactions that already exist in database.
+    Secondary dedup key for a row without a transaction ID.
+
+    Returns:
+        (date, amount, counterparty_phone, balance_after), or None if the
+        row lacks a date or amount. A missing phone or balance (including
+        the 0.0 a blank balance parses to) is None.
+    """
+    date, amount = trans.get('date'), trans.get('amount')
+    if date is None or amount is None:
+        return None
+    return (date, amount, trans.get('counterparty_phone') or None, trans.get('balance_after') or None)
+
+def fingerprint_confidence(fingerprint):
+    """How likely a fingerprint match is the same transaction (0-1)."""
+    confidence = FINGERPRINT_BASE_CONFIDENCE
+    if fingerprint[3] is not None:
+        confidence += FINGERPRINT_BALANCE_CONFIDENCE
+    if fingerprint[2]:
+        confidence += FINGERPRINT_PHONE_CONFIDENCE
+    return round(confidence, 2)
+
+def find_duplicates(transactions, existing_transaction_ids, existing_fingerprints=None):
+    """
+    Mark transactions that already exist in database, or that repeat an
+    earlier row of the same statement.
 
     Args:
         transactions: List of parsed transactions
-        existing_transaction_ids: Set of existing transaction IDs
+        existing_transaction_ids: Set of existing transaction IDs, or a
+            lookup callable (see dedup_stream)
+        existing_fingerprints: Set of stored fingerprints, a lookup
+            callable, or None
 
     Returns:
-        transactions with 'is_duplicate' field added
+        transactions with 'is_duplicate' and 'duplicate_confidence' added
     """
-    for trans in transactions:
-        trans_id = trans.get('transaction_id')
-        trans['is_duplicate'] = trans_id in existing_transaction_ids if trans_id else False
-    return transactions
+    return list(dedup_stream(transactions, existing_transaction_ids,
+                             existing_fingerprints=existing_fingerprints))
+
+def dedup_stream(transactions, existing_transaction_ids, batch_size=DEDUP_BATCH_SIZE,
+                 existing_fingerprints=None):
+    """
+    Streaming stage: add 'is_duplicate' and 'duplicate_confidence' to each
+    transaction as it passes.
+
+    Rows with a transaction ID match on it (EXACT_DUPLICATE_CONFIDENCE).
+    Rows without one match on transaction_fingerprint(), scored by
+    fingerprint_confidence(); only matches of at least DUPLICATE_THRESHOLD
+    are flagged as duplicates, weaker ones just carry the confidence.
+    Rows without a match have a confidence of None. Only exact matches
+    are certain; the import preview lets users keep flagged fingerprint
+    matches.
+
+    Args:
+        transactions: Iterable of parsed transactions
+        existing_transaction_ids: Set of existing transaction IDs, or a
+            callable taking a list of IDs and returning those already
+            stored. The callable is called once per `batch_size` rows with
+            only the new IDs of that batch, so the cost follows the
+            statement size rather than the user's history.
+        batch_size: Rows buffered per lookup
+        existing_fingerprints: Like existing_transaction_ids, for the
+            fingerprints of rows without an ID (None to skip)
+    """
+    id_lookup = existing_transaction_ids if callable(existing_transaction_ids) else None
+    fingerprint_lookup = existing_fingerprints if callable(existing_fingerprints) else None
+    seen_ids = set()
+    seen_fingerprints = set()
+
+    buffered = id_lookup or fingerprint_lookup
+    for batch in batched(transactions, batch_size if buffered else 1):
+        existing_ids = existing_transaction_ids
+        if id_lookup:
+            new_ids = {trans.get('transaction_id') for trans in batch} - seen_ids - {None, ''}
+            existing_ids = set(id_lookup(sorted(new_ids))) if new_ids else set()
+
+        existing_prints = existing_fingerprints or ()
+        if fingerprint_lookup:
+            new_prints = {
+                transaction_fingerprint(trans) for trans in batch if not trans.get('transaction_id')
+            } - seen_fingerprints - {None}
+            existing_prints = set(fingerprint_lookup(list(new_prints))) if new_prints else set()
+
+        for trans in batch:
+            trans_id = trans.get('transaction_id')
+            confidence = None
+            if trans_id:
+                if trans_id in seen_ids or trans_id in existing_ids:
+                    confidence = EXACT_DUPLICATE_CONFIDENCE
+                seen_ids.add(trans_id)
+            elif existing_fingerprints is not None:
+                fingerprint = transaction_fingerprint(trans)
+                if fingerprint is not None:
+                    if fingerprint in seen_fingerprints or fingerprint in existing_prints:
+                        confidence = fingerprint_confidence(fingerprint)
+                    seen_fingerprints.add(fingerprint)
+
+            trans['duplicate_confidence'] = confidence
+            trans['is_duplicate'] = confidence is not None and confidence >= DUPLICATE_THRESHOLD
+            yield trans
 
 # =============================================================================
 # IMPORT SUMMARY
@@ -366,41 +895,102 @@ def generate_import_summary(transactions):
     """
     Generate summary statistics for parsed transactions.
 
+    Single pass through ImportSummary.
+
     Args:
         transactions: List of parsed transactions
 
     Returns:
         dict with summary statistics
     """
-    total = len(transactions)
-    duplicates = sum(1 for t in transactions if t.get('is_duplicate', False))
-    new_transactions = total - duplicates
+    summary = ImportSummary()
+    for trans in transactions:
+        summary.add(trans)
+    return summary.to_dict()
+
+class _RunningSum:
+    """
+    Compensated (Neumaier) running sum: the algorithm built-in sum() uses
+    for floats on Python 3.12+, so a total built one value at a time
+    equals sum() over the whole list (plain += drifts, e.g. ten 0.1 fees
+    add up to 0.9999999999999999 instead of 1.0).
+    """
+
+    __slots__ = ('total', 'compensation')
+
+    def __init__(self):
+        self.total = 0
+        self.compensation = 0.0
 
-    total_income = sum(t['amount'] for t in transactions if t.get('type') == 'income')
-    total_expense = sum(t['amount'] for t in transactions if t.get('type') == 'expense')
-    total_fees = sum(t.get('fees', 0) for t in transactions)
-    total_tax = sum(t.get('tax', 0) for t in transactions)
+    def add(self, value):
+        total = self.total + value
+        if abs(self.total) >= abs(value):
+            self.compensation += (self.total - total) + value
+        else:
+            self.compensation += (value - total) + self.total
+        self.total = total
 
-    # Get final balance (from last transaction)
-    final_balance = transactions[-1].get('balance_after', 0) if transactions else 0
+    def value(self):
+        # Like sum(): an infinite or overflowed total is not turned into NaN
+        if self.compensation and math.isfinite(self.compensation):
+            return self.total + self.compensation
+        return self.total
 
-    # Category breakdown
-    categories = {}
+def summarize_stream(transactions, summary):
+    """Streaming stage: feed each transaction into an ImportSummary as it passes."""
     for trans in transactions:
-        cat = trans.get('suggested_category', 'Other')
-        if cat not in categories:
-            categories[cat] = {'count': 0, 'amount': 0}
-        categories[cat]['count'] += 1
-        categories[cat]['amount'] += trans['amount']
+        summary.add(trans)
+        yield trans
 
-    return {
-        'total': total,
-        'new_transactions': new_transactions,
-        'duplicates': duplicates,
-        'total_income': total_income,
-        'total_expense': total_expense,
-        'total_fees': total_fees,
-        'total_tax': total_tax,
-        'final_balance': final_balance,
-        'categories': categories
-    }
+class ImportSummary:
+    """
+    Running import summary, updated one transaction at a time.
+
+    Totals use compensated sums, so the dict matches one built with sum()
+    over the full list, without keeping the transactions in memory.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.duplicates = 0
+        self.total_income = _RunningSum()
+        self.total_expense = _RunningSum()
+        self.total_fees = _RunningSum()
+        self.total_tax = _RunningSum()
+        self.final_balance = 0
+        self.categories = {}
+
+    def add(self, trans):
+        self.total += 1
+        if trans.get('is_duplicate', False):
+            self.duplicates += 1
+
+        if trans.get('type') == 'income':
+            self.total_income.add(trans['amount'])
+        elif trans.get('type') == 'expense':
+            self.total_expense.add(trans['amount'])
+        self.total_fees.add(trans.get('fees', 0))
+        self.total_tax.add(trans.get('tax', 0))
+
+        # Final balance comes from the last transaction
+        self.final_balance = trans.get('balance_after', 0)
+
+        # Category breakdown
+        cat = trans.get('suggested_category', 'Other')
+        if cat not in self.categories:
+            self.categories[cat] = {'count': 0, 'amount': 0}
+        self.categories[cat]['count'] += 1
+        self.categories[cat]['amount'] += trans['amount']
+
+    def to_dict(self):
+        return {
+            'total': self.total,
+            'new_transactions': self.total - self.duplicates,
+            'duplicates': self.duplicates,
+            'total_income': self.total_income.value(),
+            'total_expense': self.total_expense.value(),
+            'total_fees': self.total_fees.value(),
+            'total_tax': self.total_tax.value(),
+            'final_balance': self.final_balance,
+            'categories': self.categories
+        }
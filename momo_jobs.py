@@ -0,0 +1,125 @@
+"""
+MoMo Import Background Jobs
+===========================
+Local job queue used to run statement parsing off the request thread.
+No external broker is required; the worker pool backend is pluggable.
+"""
+
+import logging
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# =============================================================================
+# BACKENDS
+# =============================================================================
+
+class InlineBackend:
+    """Run jobs synchronously in the calling thread (useful for tests/debugging)."""
+
+    def __init__(self, max_workers=None, worker_init=None):
+        pass
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+class ThreadPoolBackend:
+    """Run jobs on a pool of threads inside the web worker process."""
+
+    def __init__(self, max_workers=None, worker_init=None):
+        self.max_workers = max_workers
+        self._executor = None
+
+    def submit(self, fn, *args, **kwargs):
+        # Created lazily so a preloaded parent process never owns the threads
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix='momo-import'
+            )
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+class ProcessPoolBackend:
+    """
+    Run jobs in separate processes.
+
+    `fn` must be picklable (a module-level function). `worker_init` runs once
+    in every worker process, e.g. to drop database connections inherited on fork.
+    """
+
+    def __init__(self, max_workers=None, worker_init=None):
+        self.max_workers = max_workers
+        self.worker_init = worker_init
+        self._executor = None
+
+    def submit(self, fn, *args, **kwargs):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                initializer=self.worker_init
+            )
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def shutdown(self, wait=True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+
+BACKENDS = {
+    'inline': InlineBackend,
+    'thread': ThreadPoolBackend,
+    'process': ProcessPoolBackend,
+}
+
+# =============================================================================
+# JOB QUEUE
+# =============================================================================
+
+class JobQueue:
+    """
+    Submit background jobs to a worker pool.
+
+    Args:
+        backend: Backend name ('inline', 'thread', 'process') or a backend
+                 instance exposing submit()/shutdown()
+        max_workers: Pool size (None lets the executor decide)
+        worker_init: Optional initializer for process workers
+    """
+
+    def __init__(self, backend='thread', max_workers=None, worker_init=None):
+        if isinstance(backend, str):
+            if backend not in BACKENDS:
+                raise ValueError(f"Unknown job backend: {backend}")
+            backend = BACKENDS[backend](max_workers=max_workers, worker_init=worker_init)
+        self.backend = backend
+
+    def enqueue(self, fn, *args, **kwargs):
+        """Schedule fn(*args, **kwargs) and return a Future."""
+        future = self.backend.submit(fn, *args, **kwargs)
+        future.add_done_callback(self._log_failure)
+        return future
+
+    def shutdown(self, wait=True):
+        self.backend.shutdown(wait=wait)
+
+    @staticmethod
+    def _log_failure(future):
+        error = future.exception()
+        if error is not None:
+            logger.error("Background job failed: %s", error, exc_info=error)
@@ -0,0 +1,148 @@
+"""
+MoMo Transaction Search
+=======================
+Substring search over counterparty, payment type and reference that can
+use an index:
+
+- PostgreSQL: pg_trgm GIN indexes serve the ILIKE '%term%' filters,
+  ranked by trigram word similarity.
+- SQLite: an FTS5 table (trigram tokenizer) kept in sync with
+  mo_mo_transaction by triggers, ranked by bm25.
+
+Other databases, and SQLite files created before the FTS table existed,
+fall back to plain ILIKE.
+"""
+
+import weakref
+from sqlalchemy import DDL, event, func, inspect, or_, select, table, column, text, Integer
+
+SEARCH_COLUMNS = ('counterparty', 'payment_type', 'reference')
+FTS_TABLE = 'mo_mo_transaction_fts'
+
+# Trigram matching needs at least 3 characters to use the index
+MIN_INDEXED_TERM = 3
+
+TRGM_INDEXES = [f'ix_momo_transaction_{name}_trgm' for name in SEARCH_COLUMNS]
+
+POSTGRESQL_DDL = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+] + [
+    f'CREATE INDEX IF NOT EXISTS {index} ON mo_mo_transaction USING gin ({name} gin_trgm_ops)'
+    for index, name in zip(TRGM_INDEXES, SEARCH_COLUMNS)
+]
+
+SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        counterparty, payment_type, reference,
+        content='mo_mo_transaction', content_rowid='id', tokenize='trigram'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS mo_mo_transaction_fts_insert AFTER INSERT ON mo_mo_transaction BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, counterparty, payment_type, reference)
+        VALUES (new.id, new.counterparty, new.payment_type, new.reference);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS mo_mo_transaction_fts_delete AFTER DELETE ON mo_mo_transaction BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, counterparty, payment_type, reference)
+        VALUES ('delete', old.id, old.counterparty, old.payment_type, old.reference);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS mo_mo_transaction_fts_update AFTER UPDATE ON mo_mo_transaction BEGIN
+        INSERT INTO {FTS_TABLE} ({FTS_TABLE}, rowid, counterparty, payment_type, reference)
+        VALUES ('delete', old.id, old.counterparty, old.payment_type, old.reference);
+        INSERT INTO {FTS_TABLE} (rowid, counterparty, payment_type, reference)
+        VALUES (new.id, new.counterparty, new.payment_type, new.reference);
+    END""",
+    # Index rows that existed before the FTS table was created
+    f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+fts = table(FTS_TABLE, column('rowid', Integer), column('rank'))
+
+# Engine -> whether the FTS table exists
+_fts_available = weakref.WeakKeyDictionary()
+
+# =============================================================================
+# SCHEMA
+# =============================================================================
+
+def install_search_index(momo_table):
+    """
+    Create the search index whenever `momo_table` is created with
+    metadata.create_all() (existing databases get it from migration
+    e4b81d6f2a93).
+    """
+    for statement in POSTGRESQL_DDL:
+        event.listen(momo_table, 'after_create', DDL(statement).execute_if(dialect='postgresql'))
+    for statement in SQLITE_DDL:
+        event.listen(momo_table, 'after_create', DDL(statement).execute_if(dialect='sqlite'))
+
+def is_search_index(name, type_):
+    """
+    Whether a reflected table or index is part of the search index. It is
+    created by raw DDL rather than the models, so Alembic's autogenerate
+    must skip it (migrations/env.py include_object) instead of dropping it.
+    """
+    if type_ == 'table':
+        # The FTS5 table and its shadow tables (_data, _idx, _config, _docsize)
+        return name == FTS_TABLE or name.startswith(FTS_TABLE + '_')
+    if type_ == 'index':
+        return name in TRGM_INDEXES
+    return False
+
+def _has_fts(session):
+    bind = session.get_bind()
+    if bind not in _fts_available:
+        _fts_available[bind] = inspect(bind).has_table(FTS_TABLE)
+    return _fts_available[bind]
+
+# =============================================================================
+# SEARCH
+# =============================================================================
+
+def search_transactions(query, model, term, order='date'):
+    """
+    Filter a MoMo transaction query to rows matching `term`.
+
+    Args:
+        query: Query over `model` (already filtered by user etc.)
+        model: The MoMoTransaction model
+        term: Search text; matched as a case-insensitive substring
+        order: 'date' leaves ordering to the caller (e.g. keyset
+            pagination); 'relevance' orders best matches first
+
+    Returns:
+        Filtered (and possibly ordered) query
+    """
+    term = (term or '').strip()
+    if not term:
+        return query
+
+    dialect = query.session.get_bind().dialect.name
+    if dialect == 'sqlite' and len(term) >= MIN_INDEXED_TERM and _has_fts(query.session):
+        return _search_fts(query, model, term, order)
+
+    columns = [getattr(model, name) for name in SEARCH_COLUMNS]
+    query = query.filter(or_(*[col.ilike(f'%{_escape_like(term)}%', escape='\\') for col in columns]))
+
+    if order == 'relevance':
+        if dialect == 'postgresql':
+            score = func.greatest(*[func.coalesce(func.word_similarity(term, col), 0) for col in columns])
+            query = query.order_by(score.desc(), model.date.desc())
+        else:
+            query = query.order_by(model.date.desc())
+    return query
+
+def _search_fts(query, model, term, order):
+    """SQLite: match through the FTS5 trigram index."""
+    # A quoted FTS5 string is matched as a substring by the trigram tokenizer
+    match = '"' + term.replace('"', '""') + '"'
+    matches = select(fts.c.rowid, fts.c.rank)\
+        .where(text(f'{FTS_TABLE} MATCH :match').bindparams(match=match))\
+        .subquery()
+
+    query = query.join(matches, model.id == matches.c.rowid)
+    if order == 'relevance':
+        # bm25: lower is better
+        query = query.order_by(matches.c.rank.asc(), model.date.desc())
+    return query
+
+def _escape_like(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
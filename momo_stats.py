@@ -0,0 +1,141 @@
+"""
+MoMo Statistics Query Layer
+===========================
+Aggregates for the MoMo dashboard and insights pages, computed in the
+database with GROUP BY / SUM and returned as plain tuples.
+
+All-time figures are read from the monthly rollup table; date-ranged
+figures are aggregated from the transactions themselves.
+"""
+
+from sqlalchemy import select, func, case, desc
+
+from models import MoMoMonthlyRollup, MoMoTransaction
+
+momo_transaction = MoMoTransaction.__table__
+momo_rollup = MoMoMonthlyRollup.__table__
+
+# =============================================================================
+# HELPERS
+# =============================================================================
+
+def _source(user_id, since):
+    """Pick the table and row filter for all-time (rollup) or ranged queries."""
+    if since is None:
+        return momo_rollup, [momo_rollup.c.user_id == user_id]
+    return momo_transaction, [
+        momo_transaction.c.user_id == user_id,
+        momo_transaction.c.date >= since,
+    ]
+
+def _sum_if(source, trans_type):
+    return func.coalesce(func.sum(case((source.c.type == trans_type, source.c.amount), else_=0)), 0)
+
+# =============================================================================
+# AGGREGATES
+# =============================================================================
+
+def summary_totals(session, user_id, since=None):
+    """
+    Income, expense, fee and tax totals plus the transaction count.
+
+    Args:
+        session: SQLAlchemy session
+        user_id: Owner of the transactions
+        since: Only count transactions on/after this datetime (None = all time)
+
+    Returns:
+        (total_income, total_expense, total_fees, total_tax, num_transactions)
+    """
+    source, filters = _source(user_id, since)
+    if since is None:
+        fees = func.sum(source.c.fees)
+        tax = func.sum(source.c.tax)
+        count = func.sum(source.c.count)
+    else:
+        fees = func.sum(func.coalesce(source.c.fees, 0))
+        tax = func.sum(func.coalesce(source.c.tax, 0))
+        count = func.count(source.c.id)
+
+    row = session.execute(
+        select(
+            _sum_if(source, 'income'),
+            _sum_if(source, 'expense'),
+            func.coalesce(fees, 0),
+            func.coalesce(tax, 0),
+            func.coalesce(count, 0),
+        ).where(*filters)
+    ).one()
+    return tuple(row)
+
+def expense_by_category(session, user_id, since=None):
+    """
+    Expense totals per category, largest first.
+
+    Returns:
+        List of (category, amount) tuples
+    """
+    source, filters = _source(user_id, since)
+    category = func.coalesce(source.c.category, 'Other')
+    amount = func.sum(source.c.amount)
+
+    rows = session.execute(
+        select(category, amount)
+        .where(*filters, source.c.type == 'expense')
+        .group_by(category)
+        .order_by(desc(amount))
+    ).all()
+    return [tuple(row) for row in rows]
+
+def monthly_totals(session, user_id):
+    """
+    Income and expense per month, newest first (transfers count as expense).
+
+    Returns:
+        List of (month, income, expense) tuples, month as 'YYYY-MM'
+    """
+    income = _sum_if(momo_rollup, 'income')
+    total = func.sum(momo_rollup.c.amount)
+
+    rows = session.execute(
+        select(momo_rollup.c.month, income, total - income)
+        .where(momo_rollup.c.user_id == user_id)
+        .group_by(momo_rollup.c.month)
+        .order_by(momo_rollup.c.month.desc())
+    ).all()
+    return [tuple(row) for row in rows]
+
+def top_counterparties(session, user_id, since=None, limit=5):
+    """
+    Counterparties the user paid the most.
+
+    Returns:
+        List of (counterparty, amount) tuples, largest first
+    """
+    filters = [
+        momo_transaction.c.user_id == user_id,
+        momo_transaction.c.type == 'expense',
+        momo_transaction.c.counterparty.isnot(None),
+        momo_transaction.c.counterparty != '',
+    ]
+    if since is not None:
+        filters.append(momo_transaction.c.date >= since)
+    amount = func.sum(momo_transaction.c.amount)
+
+    rows = session.execute(
+        select(momo_transaction.c.counterparty, amount)
+        .where(*filters)
+        .group_by(momo_transaction.c.counterparty)
+        .order_by(desc(amount))
+        .limit(limit)
+    ).all()
+    return [tuple(row) for row in rows]
+
+def recent_transactions(session, user_id, limit=10):
+    """Most recent MoMo transactions as rows with attribute access."""
+    return session.execute(
+        select(momo_transaction)
+        .where(momo_transaction.c.user_id == user_id)
+        .order_by(momo_transaction.c.date.desc())
+        .limit(limit)
+    ).all()
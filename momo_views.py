@@ -0,0 +1,654 @@
+"""
+MoMo Routes
+===========
+Statement upload, background parsing and the import preview, plus the
+MoMo dashboard, transaction list and AI insights.
+"""
+
+import json
+import os
+from datetime import datetime, timedelta
+
+from flask import Blueprint, current_app, render_template, request, redirect, url_for, flash, session, jsonify
+from flask_login import login_required, current_user
+from sqlalchemy import func, or_, select, literal
+from werkzeug.utils import secure_filename
+
+import momo_stats
+from core_views import TRANSACTIONS_PER_PAGE
+from extensions import db
+from models import (
+    Category, ImportLog, ImportStagingRow, MoMoTransaction,
+    add_import_to_rollup, get_category_matcher
+)
+from momo_bulk import bulk_insert, insert_from_select_skip_conflicts
+from momo_import import (
+    categorize_stream, dedup_stream, summarize_stream,
+    ImportSummary, allowed_file, MAX_FILE_SIZE, EXACT_DUPLICATE_CONFIDENCE
+)
+from momo_search import search_transactions
+from pagination import keyset_paginate
+from parse_cache import iter_statement_rows
+from report_views import request_insights
+from statement_storage import ACTIVE_STATUSES, statement_folder
+
+momo = Blueprint('momo', __name__)
+
+# Bump when the prompt changes so cached insights are regenerated
+MOMO_INSIGHTS_PROMPT_VERSION = 1
+
+MOMO_INSIGHTS_PROMPT = [
+    ("system", "You are a financial advisor analyzing MTN Mobile Money (MoMo) transaction data. Provide clear, actionable insights about spending patterns, fees, and recommendations for better mobile money management. Be specific and reference the actual numbers provided."),
+    ("user", """Analyze this MoMo transaction data from the last 3 months:
+
+Total Income: GHS {total_income:.2f}
+Total Expenses: GHS {total_expense:.2f}
+Total Fees Paid: GHS {total_fees:.2f}
+Total Tax Paid: GHS {total_tax:.2f}
+Net Flow: GHS {net_flow:.2f}
+Number of Transactions: {num_transactions}
+
+Expenses by Category:
+{category_breakdown}
+
+Top 5 Payment Recipients:
+{top_recipients}
+
+Please provide:
+1. Summary of MoMo usage patterns
+2. Analysis of fees and how to reduce them
+3. Top spending categories and recommendations
+4. Any concerning patterns or opportunities for savings
+5. Specific actionable tips for better MoMo management""")
+]
+
+# =============================================================================
+# MOMO PDF IMPORT ROUTES
+# =============================================================================
+
+STAGING_BATCH_SIZE = 500  # Staged rows written per INSERT/COPY
+IMPORT_BATCH_SIZE = 1000  # Staged rows copied into MoMoTransaction per INSERT...SELECT
+PREVIEW_PER_PAGE = 50
+
+# Staged rows that may be imported: only exact (transaction ID) duplicates
+# are blocked; fingerprint matches are unticked by default but can be kept
+NOT_EXACT_DUPLICATE = or_(
+    ImportStagingRow.duplicate_confidence.is_(None),
+    ImportStagingRow.duplicate_confidence < EXACT_DUPLICATE_CONFIDENCE
+)
+
+# App used by jobs in a 'process' backend worker (set by init_import_worker)
+_worker_app = None
+
+
+def init_import_worker(config_name):
+    """
+    Process pool initializer: build this worker's own app from `config_name`
+    and run its jobs in it. Only the name is passed, since an app can't be
+    pickled for spawn/forkserver workers; the new app also shares no
+    database connections with the parent.
+    """
+    from app import create_app  # app.py imports this module
+
+    global _worker_app
+    _worker_app = create_app(config_name)
+
+
+def enqueue_statement_import(import_log_id):
+    """Queue run_statement_import on the app's import job queue."""
+    app = current_app._get_current_object()
+    # Process workers can't be handed the app; they use the one init_import_worker built
+    job_app = None if app.config['IMPORT_JOB_BACKEND'] == 'process' else app
+    app.extensions['import_jobs'].enqueue(run_statement_import, import_log_id, job_app)
+
+
+def stored_transaction_ids(user_id):
+    """
+    Duplicate lookup for dedup_stream: given a batch of transaction IDs from
+    a statement, return the ones the user already has (one indexed IN query
+    per batch instead of loading the user's whole history).
+    """
+    def lookup(transaction_ids):
+        return db.session.execute(
+            select(MoMoTransaction.transaction_id).where(
+                MoMoTransaction.user_id == user_id,
+                MoMoTransaction.transaction_id.in_(transaction_ids)
+            )
+        ).scalars().all()
+    return lookup
+
+
+def stored_fingerprints(user_id):
+    """
+    Duplicate lookup for rows without a transaction_id: given a batch of
+    (date, amount, counterparty_phone, balance_after) fingerprints, return
+    the ones the user already has. Probes ix_momo_transaction_fingerprint
+    by date and compares the remaining columns from the index.
+    """
+    def lookup(fingerprints):
+        rows = db.session.execute(
+            select(
+                MoMoTransaction.date, MoMoTransaction.amount,
+                MoMoTransaction.counterparty_phone, MoMoTransaction.balance_after
+            ).where(
+                MoMoTransaction.user_id == user_id,
+                MoMoTransaction.date.in_({fingerprint[0] for fingerprint in fingerprints})
+            )
+        )
+        return {(date, amount, phone or None, balance or None) for date, amount, phone, balance in rows}
+    return lookup
+
+
+def run_statement_import(import_log_id, app=None):
+    """
+    Parse, categorize and dedup an uploaded statement.
+
+    Runs on the import job queue and moves ImportLog.status through
+    processing -> staged/failed. The preview payload is stored on the log;
+    the preview page's commit later sets completed.
+    """
+    with (app or _worker_app).app_context():
+        import_log = ImportLog.query.get(import_log_id)
+        if not import_log:
+            return
+
+        import_log.status = 'processing'
+        db.session.commit()
+
+        try:
+            # Compiled auto-categorization rules (cached per user)
+            matcher = get_category_matcher(import_log.user_id)
+
+            # Drop rows left over from an earlier attempt
+            ImportStagingRow.query.filter_by(import_log_id=import_log.id).delete()
+
+            # Parse -> categorize -> dedup -> summarize -> stage in a single pass
+            errors = []
+            summary = ImportSummary()
+            rows = iter_statement_rows(import_log.file_path, errors, import_log.file_hash,
+                                       current_app.extensions['parse_cache'],
+                                       workers=current_app.config['PARSE_WORKERS'])
+            rows = categorize_stream(rows, matcher=matcher)
+            rows = dedup_stream(rows, stored_transaction_ids(import_log.user_id),
+                                existing_fingerprints=stored_fingerprints(import_log.user_id))
+
+            batch = []
+            for position, t in enumerate(summarize_stream(rows, summary)):
+                batch.append({
+                    'import_log_id': import_log.id,
+                    'position': position,
+                    'type': t.type or 'expense',
+                    'amount': t.amount,
+                    'date': t.date,
+                    'payment_type': t.payment_type,
+                    'counterparty': t.counterparty,
+                    'counterparty_phone': t.counterparty_phone,
+                    'transaction_id': t.transaction_id,
+                    'fees': t.fees,
+                    'tax': t.tax,
+                    'balance_after': t.balance_after,
+                    'reference': t.reference,
+                    'suggested_category': t.suggested_category,
+                    'category': t.suggested_category,
+                    'is_duplicate': t.is_duplicate,
+                    'duplicate_confidence': t.duplicate_confidence,
+                    'selected': not t.is_duplicate
+                })
+                if len(batch) >= STAGING_BATCH_SIZE:
+                    bulk_insert(db.session.connection(), ImportStagingRow.__table__, batch)
+                    batch = []
+            if batch:
+                bulk_insert(db.session.connection(), ImportStagingRow.__table__, batch)
+
+            if errors and summary.total == 0:
+                db.session.rollback()
+                import_log.status = 'failed'
+                import_log.error_message = f'Failed to parse PDF: {errors[0]["error"]}'
+                db.session.commit()
+                return
+
+            summary = summary.to_dict()
+
+            # Store summary for preview; the rows themselves are staged
+            import_log.preview_data = json.dumps({
+                'summary': summary,
+                'errors': errors
+            })
+            import_log.total_transactions = summary['total']
+            import_log.status = 'staged'
+            db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            import_log.status = 'failed'
+            import_log.error_message = str(e)
+            db.session.commit()
+            raise
+
+
+def fail_stale_imports(user_id):
+    """
+    Mark the user's queued/processing imports as failed once they have not
+    changed for IMPORT_JOB_TIMEOUT_MINUTES: the job queue is in memory, so a
+    worker restart loses its jobs and their logs would otherwise never finish.
+
+    Returns:
+        Number of imports marked failed
+    """
+    now = datetime.utcnow()
+    cutoff = now - timedelta(minutes=current_app.config['IMPORT_JOB_TIMEOUT_MINUTES'])
+    stale = ImportLog.query.filter(
+        ImportLog.user_id == user_id,
+        ImportLog.status.in_(ACTIVE_STATUSES),
+        func.coalesce(ImportLog.updated_at, ImportLog.import_date) < cutoff
+    ).update({
+        'status': 'failed',
+        'error_message': 'The import was interrupted. Please upload the statement again.',
+        'updated_at': now
+    }, synchronize_session=False)
+    if stale:
+        db.session.commit()
+    return stale
+
+
+def commit_staged_rows(import_log, user_id):
+    """
+    Copy selected staged rows, except exact duplicates, into MoMoTransaction.
+
+    Runs one INSERT...SELECT per IMPORT_BATCH_SIZE positions and skips rows
+    whose transaction_id already exists (ON CONFLICT DO NOTHING).
+
+    Returns:
+        Number of rows inserted
+    """
+    columns = ['user_id', 'type', 'amount', 'date', 'payment_type', 'counterparty',
+               'counterparty_phone', 'transaction_id', 'fees', 'tax', 'balance_after',
+               'reference', 'category', 'import_log_id']
+
+    last_position = db.session.query(func.max(ImportStagingRow.position))\
+        .filter(ImportStagingRow.import_log_id == import_log.id).scalar()
+    if last_position is None:
+        return 0
+
+    inserted = 0
+    for start in range(0, last_position + 1, IMPORT_BATCH_SIZE):
+        rows = select(
+            literal(user_id), ImportStagingRow.type, ImportStagingRow.amount,
+            ImportStagingRow.date, ImportStagingRow.payment_type,
+            ImportStagingRow.counterparty, ImportStagingRow.counterparty_phone,
+            ImportStagingRow.transaction_id, ImportStagingRow.fees, ImportStagingRow.tax,
+            ImportStagingRow.balance_after, ImportStagingRow.reference,
+            func.coalesce(ImportStagingRow.category, ImportStagingRow.suggested_category, 'Other'),
+            ImportStagingRow.import_log_id
+        ).where(
+            ImportStagingRow.import_log_id == import_log.id,
+            ImportStagingRow.position >= start,
+            ImportStagingRow.position < start + IMPORT_BATCH_SIZE,
+            ImportStagingRow.selected.is_(True),
+            NOT_EXACT_DUPLICATE
+        ).order_by(ImportStagingRow.position)
+
+        inserted += insert_from_select_skip_conflicts(
+            db.session.connection(), MoMoTransaction.__table__, columns, rows,
+            conflict_columns=['transaction_id']
+        )
+    return inserted
+
+
+@momo.route('/import-statement', methods=['GET', 'POST'])
+@login_required
+def import_statement():
+    """Handle MoMo PDF statement upload."""
+    max_size_mb = MAX_FILE_SIZE // (1024 * 1024)
+
+    if request.method == 'POST':
+        # Stream the upload straight to the uploads folder, hashing it and
+        # checking type and size as it arrives
+        upload_path = statement_folder(current_app)
+        os.makedirs(upload_path, exist_ok=True)
+        request.stream_files_to(upload_path, MAX_FILE_SIZE)
+
+        # Check if file was uploaded
+        if 'file' not in request.files:
+            flash('No file uploaded', 'danger')
+            return redirect(request.url)
+
+        file = request.files['file']
+        upload = file.stream
+        file.close()  # Flush the saved file before a worker opens it
+
+        if file.filename == '':
+            upload.discard()
+            flash('No file selected', 'danger')
+            return redirect(request.url)
+
+        if not allowed_file(file.filename) or upload.error == 'bad_type':
+            upload.discard()
+            flash('Invalid file type. Only PDF files are allowed.', 'danger')
+            return redirect(request.url)
+
+        if upload.error == 'too_large':
+            flash(f'File too large. Maximum size is {max_size_mb}MB.', 'danger')
+            return redirect(request.url)
+
+        # Create import log entry and hand parsing to the background workers
+        import_log = ImportLog(
+            user_id=current_user.id,
+            filename=secure_filename(file.filename),
+            file_path=upload.path,
+            file_hash=upload.hexdigest,
+            status='queued'
+        )
+        db.session.add(import_log)
+        db.session.commit()
+
+        enqueue_statement_import(import_log.id)
+
+        session['import_log_id'] = import_log.id
+        return redirect(url_for('momo.import_preview'))
+
+    # GET request - show upload form
+    return render_template('import_statement.html', max_size_mb=max_size_mb)
+
+
+@momo.app_errorhandler(413)
+def request_too_large(error):
+    """Body over MAX_CONTENT_LENGTH: rejected before it is read."""
+    flash(f'File too large. Maximum size is {MAX_FILE_SIZE // (1024 * 1024)}MB.', 'danger')
+    return redirect(request.url), 303
+
+
+@momo.route('/import-status/<int:import_log_id>')
+@login_required
+def import_status(import_log_id):
+    """JSON status of a background statement import (polled by the preview page)."""
+    fail_stale_imports(current_user.id)
+    import_log = ImportLog.query.get_or_404(import_log_id)
+    if import_log.user_id != current_user.id:
+        return jsonify({'error': 'Access denied'}), 403
+
+    return jsonify({
+        'id': import_log.id,
+        'status': import_log.status,
+        'total_transactions': import_log.total_transactions,
+        'error': import_log.error_message
+    })
+
+
+@momo.route('/import-preview', methods=['GET', 'POST'])
+@login_required
+def import_preview():
+    """Show parsed transactions for review before import."""
+    import_log_id = session.get('import_log_id')
+    fail_stale_imports(current_user.id)
+    import_log = ImportLog.query.get(import_log_id) if import_log_id else None
+
+    if not import_log or import_log.user_id != current_user.id:
+        flash('No import data found. Please upload a file first.', 'warning')
+        return redirect(url_for('momo.import_statement'))
+
+    # Still parsing - show a page that polls the status endpoint
+    if import_log.status in ACTIVE_STATUSES:
+        return render_template('import_processing.html', import_log=import_log)
+
+    if import_log.status == 'failed' and not import_log.preview_data:
+        session.pop('import_log_id', None)
+        flash(import_log.error_message or 'Failed to parse PDF', 'danger')
+        return redirect(url_for('momo.import_statement'))
+
+    if not import_log.preview_data:
+        session.pop('import_log_id', None)
+        flash('No import data found. Please upload a file first.', 'warning')
+        return redirect(url_for('momo.import_statement'))
+
+    import_data = json.loads(import_log.preview_data)
+
+    staged_rows = ImportStagingRow.query.filter_by(import_log_id=import_log.id)
+
+    if request.method == 'POST':
+        # Save the selections/categories shown on this page
+        positions = [int(p) for p in request.form.getlist('positions')]
+        selected_positions = {int(p) for p in request.form.getlist('selected')}
+        categories_map = {}
+
+        # Get category assignments from form
+        for key, value in request.form.items():
+            if key.startswith('category_'):
+                idx = int(key.replace('category_', ''))
+                categories_map[idx] = value  # Store category name, not ID
+
+        if positions:
+            for row in staged_rows.filter(ImportStagingRow.position.in_(positions)):
+                row.selected = row.position in selected_positions
+                if row.position in categories_map:
+                    row.category = categories_map[row.position]
+            db.session.commit()
+
+        # Moving to another preview page
+        goto_page = request.form.get('goto_page', type=int)
+        if goto_page:
+            return redirect(url_for('momo.import_preview', page=goto_page))
+
+        # Copy selected rows, except exact duplicates, into MoMoTransaction
+        total_selected = staged_rows.filter(ImportStagingRow.selected.is_(True)).count()
+        to_import = staged_rows.filter(
+            ImportStagingRow.selected.is_(True),
+            NOT_EXACT_DUPLICATE
+        ).count()
+
+        try:
+            successful = commit_staged_rows(import_log, current_user.id)
+            add_import_to_rollup(import_log.id, current_user.id)
+
+            # Rows that hit the transaction_id unique index were skipped
+            skipped = to_import - successful
+
+            # Update import log and drop the staged rows, in the same
+            # transaction as the insert so a failure keeps the preview
+            import_log.total_transactions = total_selected
+            import_log.successful_imports = successful
+            import_log.failed_imports = 0
+            import_log.skipped_imports = skipped
+            import_log.status = 'completed'
+            import_log.preview_data = None
+            staged_rows.delete()
+
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            current_app.logger.exception('Committing import %s failed', import_log.id)
+            flash('The import could not be saved. Your selections are kept; please try again.', 'danger')
+            return redirect(url_for('momo.import_preview'))
+
+        # Clear session data
+        session.pop('import_log_id', None)
+
+        flash(f'Import complete! {successful} MoMo transactions imported, '
+              f'{skipped} skipped as already imported.', 'success')
+        return redirect(url_for('momo.momo_transactions'))
+
+    # GET request - show one page of staged rows
+    page = request.args.get('page', 1, type=int)
+    transactions = staged_rows.order_by(ImportStagingRow.position)\
+        .paginate(page=page, per_page=PREVIEW_PER_PAGE, error_out=False)
+
+    # Get user's categories
+    expense_categories = Category.query.filter_by(user_id=current_user.id, type='expense').all()
+    income_categories = Category.query.filter_by(user_id=current_user.id, type='income').all()
+
+    return render_template('import_preview.html',
+                          transactions=transactions,
+                          summary=import_data['summary'],
+                          errors=import_data.get('errors', []),
+                          expense_categories=expense_categories,
+                          income_categories=income_categories)
+
+
+@momo.route('/import-history')
+@login_required
+def import_history():
+    """Show history of PDF imports."""
+    fail_stale_imports(current_user.id)
+    imports = ImportLog.query.filter_by(user_id=current_user.id)\
+        .order_by(ImportLog.import_date.desc()).all()
+    return render_template('import_history.html', imports=imports)
+
+# =============================================================================
+# MOMO DASHBOARD, TRANSACTIONS & INSIGHTS
+# =============================================================================
+
+@momo.route('/momo/dashboard')
+@login_required
+def momo_dashboard():
+    """MoMo-specific dashboard with overview and charts."""
+    # All-time totals are aggregated from the monthly rollup in the database
+    total_income, total_expense, total_fees, total_tax, total_transactions = \
+        momo_stats.summary_totals(db.session, current_user.id)
+    net_flow = total_income - total_expense
+
+    # Category breakdown for expenses
+    expense_by_category = dict(momo_stats.expense_by_category(db.session, current_user.id))
+
+    # Monthly summary
+    monthly_data = {
+        month: {'income': income, 'expense': expense}
+        for month, income, expense in momo_stats.monthly_totals(db.session, current_user.id)
+    }
+
+    # Recent transactions (last 10)
+    recent_transactions = momo_stats.recent_transactions(db.session, current_user.id, limit=10)
+
+    # Get latest balance
+    latest_balance = recent_transactions[0].balance_after if recent_transactions else 0
+
+    return render_template('momo_dashboard.html',
+                          total_income=total_income,
+                          total_expense=total_expense,
+                          total_fees=total_fees,
+                          total_tax=total_tax,
+                          net_flow=net_flow,
+                          latest_balance=latest_balance,
+                          expense_by_category=expense_by_category,
+                          monthly_data=monthly_data,
+                          recent_transactions=recent_transactions,
+                          total_transactions=total_transactions)
+
+
+@momo.route('/momo/transactions')
+@login_required
+def momo_transactions():
+    """List all MoMo transactions."""
+    cursor = request.args.get('cursor')
+
+    # Filter options
+    trans_type = request.args.get('type', '')
+    category = request.args.get('category', '')
+    search = request.args.get('search', '')
+
+    query = MoMoTransaction.query.filter_by(user_id=current_user.id)
+
+    if trans_type:
+        query = query.filter(MoMoTransaction.type == trans_type)
+    if category:
+        query = query.filter(MoMoTransaction.category == category)
+    if search:
+        query = search_transactions(query, MoMoTransaction, search)
+
+    transactions = keyset_paginate(
+        query, MoMoTransaction.date, MoMoTransaction.id,
+        token=cursor, per_page=TRANSACTIONS_PER_PAGE, count='approximate'
+    )
+
+    # Get unique categories for filter dropdown
+    categories = db.session.query(MoMoTransaction.category)\
+        .filter(MoMoTransaction.user_id == current_user.id)\
+        .distinct().all()
+    categories = [c[0] for c in categories if c[0]]
+
+    return render_template('momo_transactions.html',
+                          transactions=transactions,
+                          categories=categories,
+                          current_type=trans_type,
+                          current_category=category,
+                          search=search)
+
+
+@momo.route('/momo/transactions/<int:transaction_id>/delete', methods=['POST'])
+@login_required
+def delete_momo_transaction(transaction_id):
+    """Delete a single MoMo transaction (the rollup is updated by remove_from_rollup)."""
+    transaction = MoMoTransaction.query.get_or_404(transaction_id)
+
+    # Check if transaction belongs to current user
+    if transaction.user_id != current_user.id:
+        flash('Access denied', 'danger')
+        return redirect(url_for('momo.momo_transactions'))
+
+    db.session.delete(transaction)
+    db.session.commit()
+    flash('MoMo transaction deleted successfully', 'success')
+    return redirect(url_for('momo.momo_transactions'))
+
+
+@momo.route('/momo/insights')
+@login_required
+def momo_insights():
+    """AI-powered insights for MoMo transactions."""
+    # Aggregate the last 3 months in the database
+    three_months_ago = datetime.now() - timedelta(days=90)
+
+    total_income, total_expense, total_fees, total_tax, num_transactions = \
+        momo_stats.summary_totals(db.session, current_user.id, since=three_months_ago)
+
+    if not num_transactions:
+        return render_template('momo_insights.html',
+                             insights=None,
+                             message="No MoMo transactions found. Import a statement to get started.")
+
+    # Category breakdown
+    expense_by_category = dict(
+        momo_stats.expense_by_category(db.session, current_user.id, since=three_months_ago)
+    )
+
+    # Top counterparties
+    top_counterparties = momo_stats.top_counterparties(
+        db.session, current_user.id, since=three_months_ago, limit=5
+    )
+
+    category_text = "\n".join([f"- {cat}: GHS {amt:.2f}" for cat, amt in expense_by_category.items()])
+    recipients_text = "\n".join([f"- {name}: GHS {amt:.2f}" for name, amt in top_counterparties])
+    prompt_variables = {
+        "total_income": total_income,
+        "total_expense": total_expense,
+        "total_fees": total_fees,
+        "total_tax": total_tax,
+        "net_flow": total_income - total_expense,
+        "num_transactions": num_transactions,
+        "category_breakdown": category_text or "No categorized expenses",
+        "top_recipients": recipients_text or "No recipient data"
+    }
+
+    # Generate insights using LLM (on a worker thread, outside the app context)
+    llms = current_app.extensions['insight_llms']
+
+    def generate():
+        chain = llms.chain('momo_insights', MOMO_INSIGHTS_PROMPT)
+        return chain.invoke(prompt_variables).content
+
+    try:
+        # Served from the cache while the numbers are unchanged, otherwise
+        # generated in the background while the page polls for it
+        insights, insights_key = request_insights(MOMO_INSIGHTS_PROMPT_VERSION, prompt_variables, generate)
+
+    except Exception as e:
+        insights, insights_key = f"Unable to generate AI insights: {str(e)}", None
+
+    return render_template('momo_insights.html',
+                          insights=insights,
+                          insights_key=insights_key,
+                          total_income=total_income,
+                          total_expense=total_expense,
+                          total_fees=total_fees,
+                          total_tax=total_tax,
+                          expense_by_category=expense_by_category,
+                          num_transactions=num_transactions)
@@ -0,0 +1,183 @@
+"""
+Keyset (Cursor) Pagination
+==========================
+Pages through a query ordered by (date, id) newest first, using the last
+row of the current page as the starting point for the next one instead
+of OFFSET. Cursors are handed to the browser as opaque URL-safe tokens.
+
+Also provides a cheap approximate row count: the planner estimate on
+PostgreSQL, a capped COUNT(*) elsewhere.
+"""
+
+import base64
+import json
+from datetime import date, datetime
+from sqlalchemy import tuple_, func, DateTime
+
+DEFAULT_COUNT_CAP = 1000
+
+# =============================================================================
+# CURSOR TOKENS
+# =============================================================================
+
+def encode_cursor(date_value, row_id, direction='next'):
+    """
+    Encode a (date, id) position as an opaque token.
+
+    Args:
+        date_value: Date/datetime of the boundary row
+        row_id: Primary key of the boundary row
+        direction: 'next' (older rows) or 'prev' (newer rows)
+
+    Returns:
+        URL-safe token string
+    """
+    payload = json.dumps({'d': date_value.isoformat(), 'i': row_id, 'r': direction},
+                         separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+def decode_cursor(token, date_column):
+    """
+    Decode a token created by encode_cursor.
+
+    Returns:
+        (date_value, row_id, direction), or None if the token is missing
+        or malformed (callers then show the first page)
+    """
+    if not token:
+        return None
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if isinstance(date_column.type, DateTime):
+            date_value = datetime.fromisoformat(payload['d'])
+        else:
+            date_value = date.fromisoformat(payload['d'])
+        direction = payload.get('r', 'next')
+        if direction not in ('next', 'prev'):
+            return None
+        return date_value, int(payload['i']), direction
+    except (ValueError, TypeError, KeyError):
+        return None
+
+# =============================================================================
+# KEYSET PAGE
+# =============================================================================
+
+class KeysetPage:
+    """One page of results with tokens for the neighbouring pages."""
+
+    def __init__(self, items, next_token=None, prev_token=None, total=None, total_precision='exact'):
+        self.items = items
+        self.next_token = next_token
+        self.prev_token = prev_token
+        self.total = total
+        self.total_precision = total_precision
+
+    @property
+    def total_label(self):
+        """Human readable total, e.g. '1,234', '~1,234' or '1,000+'."""
+        if self.total is None:
+            return None
+        if self.total_precision == 'estimate':
+            return f'~{self.total:,}'
+        if self.total_precision == 'at_least':
+            return f'{self.total:,}+'
+        return f'{self.total:,}'
+
+    @property
+    def has_next(self):
+        return self.next_token is not None
+
+    @property
+    def has_prev(self):
+        return self.prev_token is not None
+
+def keyset_paginate(query, date_column, id_column, token=None, per_page=20, count=None):
+    """
+    Fetch one page of `query` ordered by (date, id) descending.
+
+    Args:
+        query: Filtered SQLAlchemy Query (without ORDER BY / LIMIT)
+        date_column: Column holding the row date
+        id_column: Primary key column, used as the tie-breaker
+        token: Cursor token from the previous page (None = first page)
+        per_page: Rows per page
+        count: None for no count, 'approximate' or 'exact'
+
+    Returns:
+        KeysetPage
+    """
+    cursor = decode_cursor(token, date_column)
+    key = tuple_(date_column, id_column)
+
+    if cursor and cursor[2] == 'prev':
+        # Walk forwards in time from the boundary, then flip back to newest first
+        rows = query.filter(key > tuple_(cursor[0], cursor[1]))\
+            .order_by(date_column.asc(), id_column.asc())\
+            .limit(per_page + 1).all()
+        more_before = len(rows) > per_page
+        items = list(reversed(rows[:per_page]))
+        has_prev, has_next = more_before, True
+    else:
+        page_query = query
+        if cursor:
+            page_query = query.filter(key < tuple_(cursor[0], cursor[1]))
+        rows = page_query.order_by(date_column.desc(), id_column.desc())\
+            .limit(per_page + 1).all()
+        items = rows[:per_page]
+        has_prev, has_next = cursor is not None, len(rows) > per_page
+
+    next_token = prev_token = None
+    if items:
+        first, last = items[0], items[-1]
+        if has_next:
+            next_token = encode_cursor(getattr(last, date_column.key), getattr(last, id_column.key), 'next')
+        if has_prev:
+            prev_token = encode_cursor(getattr(first, date_column.key), getattr(first, id_column.key), 'prev')
+
+    total, precision = None, 'exact'
+    if count == 'exact':
+        total = query.order_by(None).count()
+    elif count == 'approximate':
+        total, precision = approximate_count(query)
+
+    return KeysetPage(items, next_token, prev_token, total, precision)
+
+# =============================================================================
+# APPROXIMATE COUNT
+# =============================================================================
+
+def approximate_count(query, cap=DEFAULT_COUNT_CAP):
+    """
+    Estimate the number of rows `query` returns without a full COUNT(*).
+
+    PostgreSQL: the planner's row estimate from EXPLAIN.
+    Other databases: COUNT(*) over at most `cap` + 1 rows.
+
+    Returns:
+        (count, precision) where precision is 'exact', 'estimate' (planner
+        guess) or 'at_least' (the cap was reached)
+    """
+    session = query.session
+    statement = query.order_by(None).statement
+
+    if session.get_bind().dialect.name == 'postgresql':
+        try:
+            compiled = statement.compile(dialect=session.get_bind().dialect)
+            # Savepoint so a failed EXPLAIN doesn't abort the request's transaction
+            with session.begin_nested():
+                plan = session.connection().exec_driver_sql(
+                    f'EXPLAIN (FORMAT JSON) {compiled}', compiled.params
+                ).scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows']), 'estimate'
+        except Exception:
+            pass
+
+    capped = statement.limit(cap + 1).subquery()
+    total = session.execute(func.count().select().select_from(capped)).scalar()
+    if total > cap:
+        return cap, 'at_least'
+    return total, 'exact'
@@ -0,0 +1,228 @@
+"""
+Parsed Statement Cache
+======================
+Caches the parser output for uploaded MoMo statements on disk, keyed by
+the SHA-256 of the PDF and the parser version, so re-uploading the same
+statement skips pdfplumber entirely.
+
+Each entry is a gzipped JSON-lines file:
+    line 1      header {"parser_version": ..., "created": ...}
+    rows        one JSON array per row, values in PARSED_FIELDS order
+    last line   {"errors": [...]}
+
+Entries are evicted by age and, oldest-used first, by total size.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from datetime import datetime
+
+from momo_import import MoMoRow, PARSED_FIELDS, PARSER_VERSION, iter_momo_pdf
+
+HASH_CHUNK_SIZE = 64 * 1024
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024  # 256MB
+DEFAULT_MAX_AGE = 30 * 24 * 3600  # 30 days
+
+_HASH_RE = re.compile(r'[0-9a-f]{64}')
+_ENTRY_SUFFIX = '.jsonl.gz'
+_DATE_INDEX = PARSED_FIELDS.index('date')
+
+# =============================================================================
+# HASHING
+# =============================================================================
+
+def hash_file(file_path, chunk_size=HASH_CHUNK_SIZE):
+    """SHA-256 hex digest of a file on disk."""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+# =============================================================================
+# CACHE
+# =============================================================================
+
+class ParseCache:
+    """
+    On-disk cache of parsed statements.
+
+    Args:
+        directory: Folder holding the cache files (created on demand)
+        max_bytes: Total size to trim the cache down to on eviction
+        max_age: Seconds since last use after which an entry is dropped
+        parser_version: Entries written by other versions are ignored and evicted
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, max_age=DEFAULT_MAX_AGE,
+                 parser_version=PARSER_VERSION):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self.parser_version = parser_version
+
+    def path_for(self, file_hash):
+        if not _HASH_RE.fullmatch(file_hash or ''):
+            raise ValueError(f"Invalid statement hash: {file_hash!r}")
+        return os.path.join(self.directory, f'{file_hash}.v{self.parser_version}{_ENTRY_SUFFIX}')
+
+    def __contains__(self, file_hash):
+        return os.path.exists(self.path_for(file_hash))
+
+    def iter_rows(self, file_hash, errors):
+        """
+        Stream a cached parse.
+
+        Returns:
+            Iterator of MoMoRow (errors are appended to `errors` once the
+            rows are exhausted), or None on a cache miss
+        """
+        path = self.path_for(file_hash)
+        try:
+            handle = gzip.open(path, 'rt', encoding='utf-8')
+        except FileNotFoundError:
+            return None
+        try:
+            header = json.loads(handle.readline())
+        except (OSError, EOFError, ValueError):
+            # Unreadable entry: treat as a miss (it is overwritten on store)
+            handle.close()
+            return None
+
+        if header.get('parser_version') != self.parser_version:
+            handle.close()
+            return None
+
+        # Mark as recently used for size-based eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return self._read(handle, errors)
+
+    def _read(self, handle, errors):
+        with handle:
+            for line in handle:
+                if line.startswith('['):
+                    values = json.loads(line)
+                    values[_DATE_INDEX] = datetime.fromisoformat(values[_DATE_INDEX])
+                    yield MoMoRow(*values)
+                else:
+                    errors.extend(json.loads(line)['errors'])
+
+    def store_stream(self, file_hash, rows, errors):
+        """
+        Pass `rows` through unchanged while writing them to the cache.
+
+        The entry is only published once the rows are exhausted and the
+        PDF was read successfully; an abandoned or failed parse leaves no
+        entry behind.
+        """
+        path = self.path_for(file_hash)
+        os.makedirs(self.directory, exist_ok=True)
+        # Unique per writer: the same statement can be parsed by two workers at once
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, prefix=os.path.basename(path) + '.', suffix='.tmp')
+        complete = False
+
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.open(raw, 'wt', encoding='utf-8') as out:
+                out.write(json.dumps({'parser_version': self.parser_version, 'created': time.time()}) + '\n')
+                for row in rows:
+                    # Serialize before yielding: later stages modify the row
+                    values = [getattr(row, name) for name in PARSED_FIELDS]
+                    values[_DATE_INDEX] = values[_DATE_INDEX].isoformat()
+                    out.write(json.dumps(values, separators=(',', ':')) + '\n')
+                    yield row
+                out.write(json.dumps({'errors': errors}, default=str) + '\n')
+
+            # A page 0 error means the PDF couldn't be opened; don't cache that
+            if not any(error.get('page') == 0 for error in errors):
+                os.replace(temp_path, path)
+                complete = True
+        finally:
+            if not complete and os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        if complete:
+            self.evict()
+
+    def evict(self, now=None):
+        """
+        Remove expired, stale-version and least recently used entries.
+
+        Returns:
+            (files removed, bytes reclaimed)
+        """
+        now = now if now is not None else time.time()
+        current_suffix = f'.v{self.parser_version}{_ENTRY_SUFFIX}'
+        removed = reclaimed = 0
+
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return 0, 0
+
+        entries = []
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+
+            expired = now - stat.st_mtime > self.max_age
+            stale = name.endswith(_ENTRY_SUFFIX) and not name.endswith(current_suffix)
+            abandoned_temp = name.endswith('.tmp') and now - stat.st_mtime > 3600
+
+            if expired or stale or abandoned_temp:
+                if _remove(path):
+                    removed += 1
+                    reclaimed += stat.st_size
+            elif name.endswith(current_suffix):
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        # Trim to max_bytes, least recently used first
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if _remove(path):
+                removed += 1
+                reclaimed += size
+            total -= size
+
+        return removed, reclaimed
+
+def _remove(path):
+    try:
+        os.remove(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+# =============================================================================
+# PIPELINE
+# =============================================================================
+
+def iter_statement_rows(file_path, errors, file_hash=None, cache=None, **parse_options):
+    """
+    Yield parsed rows for a statement, from the cache when possible.
+
+    Drop-in replacement for iter_momo_pdf(): on a miss the PDF is parsed
+    and the result written to the cache as it streams past.
+    """
+    if cache is None or not file_hash:
+        yield from iter_momo_pdf(file_path, errors, **parse_options)
+        return
+
+    cached = cache.iter_rows(file_hash, errors)
+    if cached is not None:
+        yield from cached
+        return
+
+    yield from cache.store_stream(file_hash, iter_momo_pdf(file_path, errors, **parse_options), errors)
@@ -0,0 +1,338 @@
+"""
+Report Routes
+=============
+Financial report with AI insights, the insight polling endpoint shared
+with the MoMo insights page, and the data export.
+"""
+
+import json
+import re
+from datetime import datetime, timedelta
+
+from flask import Blueprint, current_app, render_template, send_file, jsonify
+from flask_login import login_required, current_user
+from sqlalchemy import func
+
+from extensions import db
+from insight_cache import insight_cache_key
+from models import Account, Category, Transaction
+
+reports = Blueprint('reports', __name__)
+
+# Bump when the prompt changes so cached insights are regenerated
+FINANCIAL_INSIGHTS_PROMPT_VERSION = 1
+
+FINANCIAL_INSIGHTS_PROMPT = [
+    ("system", """You are a personal financial advisor. Analyze the user's financial data and provide 
+    helpful insights and actionable recommendations to improve their financial health. 
+    Focus on spending patterns, saving opportunities, and budget optimization.
+    Format your response in a clear, concise manner with section headings and bullet points. 
+    Include 3-5 specific recommendations based on the data provided."""),
+    ("user", "{financial_data}")
+]
+
+
+def request_insights(prompt_version, variables, generate):
+    """
+    Cached insight text, or start generating it in the background.
+
+    `generate` runs on a worker thread, so it must only use `variables`
+    (no database session or request state).
+
+    Returns:
+        (insights, insights_key): the text when it is available now,
+        otherwise None and the key to poll /insights/<key> with
+    """
+    insight_cache = current_app.extensions['insight_cache']
+    insight_jobs = current_app.extensions['insight_jobs']
+
+    model = current_app.extensions['insight_llms'].model_name
+    key = insight_cache_key(model, prompt_version, variables)
+    insights = insight_cache.lookup(db.engine, key)
+    if insights is not None:
+        return insights, None
+
+    if not insight_jobs.submit(db.engine, key, model, prompt_version, generate, current_user.id):
+        return "AI insights are busy right now. Please try again in a minute.", None
+
+    # Fast (or inline) generations are rendered straight away
+    result = insight_jobs.poll(db.engine, key, current_user.id)
+    if result['status'] == 'ready':
+        return result['insights'], None
+    if result['status'] == 'error':
+        return f"Unable to generate AI insights: {result['error']}", None
+    return None, key
+
+def get_financial_insights(user_id):
+    """
+    Generate financial insights using LLM.
+
+    Returns:
+        (insights, insights_key) as returned by request_insights()
+    """
+    # Get transaction data for the last 3 months
+    three_months_ago = datetime.now() - timedelta(days=90)
+    
+    # Get expense data
+    expenses = db.session.query(
+        Transaction.date, 
+        Category.name.label('category'),
+        Transaction.amount,
+        Transaction.description
+    ).join(Category, Transaction.category_id == Category.id) \
+    .filter(Transaction.user_id == user_id) \
+    .filter(Transaction.type == 'expense') \
+    .filter(Transaction.date >= three_months_ago) \
+    .order_by(Transaction.date.desc()) \
+    .all()
+    
+    # Get income data
+    incomes = db.session.query(
+        Transaction.date, 
+        Category.name.label('category'),
+        Transaction.amount,
+        Transaction.description
+    ).join(Category, Transaction.category_id == Category.id) \
+    .filter(Transaction.user_id == user_id) \
+    .filter(Transaction.type == 'income') \
+    .filter(Transaction.date >= three_months_ago) \
+    .order_by(Transaction.date.desc()) \
+    .all()
+    
+    # Get account balances
+    accounts = db.session.query(
+        Account.name,
+        Account.balance
+    ).filter(Account.user_id == user_id).all()
+    
+    # Convert to dataframes for easier analysis (pandas is only loaded here)
+    import pandas as pd
+
+    expenses_df = pd.DataFrame(expenses, columns=['date', 'category', 'amount', 'description'])
+    incomes_df = pd.DataFrame(incomes, columns=['date', 'category', 'amount', 'description'])
+    accounts_df = pd.DataFrame(accounts, columns=['name', 'balance'])
+    
+    # Get summary statistics
+    total_expenses = expenses_df['amount'].sum() if not expenses_df.empty else 0
+    total_income = incomes_df['amount'].sum() if not incomes_df.empty else 0
+    total_balance = accounts_df['balance'].sum() if not accounts_df.empty else 0
+    
+    # Group expenses by category
+    expense_by_category = {}
+    if not expenses_df.empty:
+        expense_by_category = expenses_df.groupby('category')['amount'].sum().to_dict()
+    
+    # Prepare the context for the LLM
+    financial_context = f"""
+    Financial Summary:
+    - Total Expenses (Last 3 Months): ${total_expenses:.2f}
+    - Total Income (Last 3 Months): ${total_income:.2f}
+    - Net Savings/Loss: ${(total_income - total_expenses):.2f}
+    - Current Total Balance: ${total_balance:.2f}
+    
+    Expense Breakdown by Category:
+    {', '.join([f"{category}: ${amount:.2f}" for category, amount in expense_by_category.items()])}
+    
+    Top Expense Categories:
+    {', '.join([f"{category}: ${amount:.2f}" for category, amount in sorted(expense_by_category.items(), key=lambda x: x[1], reverse=True)[:3]]) if expense_by_category else "No expense data available"}
+    """
+    
+    llms = current_app.extensions['insight_llms']
+
+    def generate():
+        # Generate insights
+        chain = llms.chain('financial_insights', FINANCIAL_INSIGHTS_PROMPT)
+        response = chain.invoke({"financial_data": financial_context})
+        
+        # Extract the content from the response
+        return response.content
+
+    try:
+        # Served from the cache while the financial context is unchanged
+        return request_insights(FINANCIAL_INSIGHTS_PROMPT_VERSION, financial_context, generate)
+    
+    except Exception as e:
+        # Return a fallback message if there's an error
+        return f"Unable to generate financial insights at this time. Error: {str(e)}", None
+
+# @reports.route('/report')
+# @login_required
+# def report():
+#     # Get summary data for reports
+#     # Monthly expenses by category
+#     monthly_expenses = db.session.query(
+#         func.strftime('%Y-%m', Transaction.date).label('month'),
+#         Category.name,
+#         func.sum(Transaction.amount)
+#     ).join(Category, Transaction.category_id == Category.id) \
+#     .filter(Transaction.user_id == current_user.id) \
+#     .filter(Transaction.type == 'expense') \
+#     .group_by('month', Category.name) \
+#     .order_by('month') \
+#     .all()
+    
+#     # Process data for charts
+#     report_data = {}
+#     for month, category, amount in monthly_expenses:
+#         if month not in report_data:
+#             report_data[month] = {}
+#         report_data[month][category] = float(amount)
+    
+#     # Get income vs expenses by month
+#     monthly_summary = db.session.query(
+#         func.strftime('%Y-%m', Transaction.date).label('month'),
+#         Transaction.type,
+#         func.sum(Transaction.amount)
+#     ).filter(Transaction.user_id == current_user.id) \
+#     .group_by('month', Transaction.type) \
+#     .order_by('month') \
+#     .all()
+    
+#     # Process income vs expense data
+#     income_vs_expense = {}
+#     for month, type_, amount in monthly_summary:
+#         if month not in income_vs_expense:
+#             income_vs_expense[month] = {'income': 0, 'expense': 0}
+#         income_vs_expense[month][type_] = float(amount)
+    
+#     return render_template('report.html', 
+#                           report_data=json.dumps(report_data),
+#                           income_vs_expense=json.dumps(income_vs_expense))
+
+@reports.route('/report')
+@login_required
+def report():
+    # Get summary data for reports
+    # Monthly expenses by category
+    monthly_expenses = db.session.query(
+        func.to_char(Transaction.date, 'YYYY-MM').label('month'),
+        Category.name,
+        func.sum(Transaction.amount)
+    ).join(Category, Transaction.category_id == Category.id) \
+    .filter(Transaction.user_id == current_user.id) \
+    .filter(Transaction.type == 'expense') \
+    .group_by(func.to_char(Transaction.date, 'YYYY-MM'), Category.name) \
+    .order_by('month') \
+    .all()
+    
+    # Process data for charts
+    report_data = {}
+    for month, category, amount in monthly_expenses:
+        if month not in report_data:
+            report_data[month] = {}
+        report_data[month][category] = float(amount)
+    
+    # Get income vs expenses by month
+    monthly_summary = db.session.query(
+        func.to_char(Transaction.date, 'YYYY-MM').label('month'),
+        Transaction.type,
+        func.sum(Transaction.amount)
+    ).filter(Transaction.user_id == current_user.id) \
+    .group_by(func.to_char(Transaction.date, 'YYYY-MM'), Transaction.type) \
+    .order_by('month') \
+    .all()
+    
+    # Process income vs expense data
+    income_vs_expense = {}
+    for month, type_, amount in monthly_summary:
+        if month not in income_vs_expense:
+            income_vs_expense[month] = {'income': 0, 'expense': 0}
+        income_vs_expense[month][type_] = float(amount)
+    
+    # LLM insights for users with transaction data; uncached ones are
+    # generated in the background and fetched by the page
+    financial_insights, insights_key = None, None
+    if monthly_expenses or monthly_summary:
+        financial_insights, insights_key = get_financial_insights(current_user.id)
+    
+    return render_template('report.html', 
+                          report_data=json.dumps(report_data),
+                          income_vs_expense=json.dumps(income_vs_expense),
+                          financial_insights=financial_insights,
+                          insights_key=insights_key)
+
+@reports.route('/insights/<key>')
+@login_required
+def insights_status(key):
+    """JSON status of a background insight generation (polled by the insight pages)."""
+    if not re.fullmatch(r'[0-9a-f]{64}', key):
+        return jsonify({'error': 'Invalid insights key'}), 404
+
+    return jsonify(current_app.extensions['insight_jobs'].poll(db.engine, key, current_user.id))
+
+# Registered after report(): GET /report shows the report, POST exports
+@reports.route('/report', methods=['GET', 'POST'])
+@login_required
+def export_data():
+    """Export all user data as a zip file containing CSV files."""
+    from io import StringIO
+    import csv
+    from zipfile import ZipFile
+    from io import BytesIO
+    
+    memory_file = BytesIO()
+    
+    with ZipFile(memory_file, 'w') as zf:
+        # Export accounts
+        accounts_file = StringIO()
+        accounts_writer = csv.writer(accounts_file)
+        accounts_writer.writerow(['ID', 'Name', 'Balance'])
+        
+        for account in current_user.accounts:
+            accounts_writer.writerow([account.id, account.name, account.balance])
+        
+        zf.writestr('accounts.csv', accounts_file.getvalue())
+        
+        # Export categories
+        categories_file = StringIO()
+        categories_writer = csv.writer(categories_file)
+        categories_writer.writerow(['ID', 'Name', 'Type'])
+        
+        for category in current_user.categories:
+            categories_writer.writerow([category.id, category.name, category.type])
+        
+        zf.writestr('categories.csv', categories_file.getvalue())
+        
+        # Export transactions
+        transactions_file = StringIO()
+        transactions_writer = csv.writer(transactions_file)
+        transactions_writer.writerow(['ID', 'Date', 'Type', 'Amount', 'Description', 'Account', 'Category'])
+        
+        for transaction in current_user.transactions:
+            transactions_writer.writerow([
+                transaction.id,
+                transaction.date.strftime('%Y-%m-%d'),
+                transaction.type,
+                transaction.amount,
+                transaction.description or '',
+                transaction.account.name,
+                transaction.category.name
+            ])
+        
+        zf.writestr('transactions.csv', transactions_file.getvalue())
+        
+        # Export user profile (without sensitive info)
+        profile_file = StringIO()
+        profile_writer = csv.writer(profile_file)
+        profile_writer.writerow(['Username', 'Email', 'Name', 'Date Registered'])
+        profile_writer.writerow([
+            current_user.username,
+            current_user.email,
+            current_user.name,
+            current_user.date_registered.strftime('%Y-%m-%d')
+        ])
+        
+        zf.writestr('profile.csv', profile_file.getvalue())
+    
+    # Reset file pointer
+    memory_file.seek(0)
+    
+    # Create a download name with the current date
+    download_name = f"financial_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.zip"
+    
+    return send_file(
+        memory_file,
+        download_name=download_name,
+        as_attachment=True,
+        mimetype='application/zip'
+    )
@@ -0,0 +1,195 @@
+"""
+Uploaded Statement Storage
+==========================
+Retention and compaction for the PDFs under uploads/statements, run from
+`flask compact-statements`:
+
+- Retention: PDFs of finished imports (committed or failed, preview
+  cleared) are deleted after `finished_days`; every other PDF, except
+  imports still queued/processing, after `max_age_days`. Files no
+  ImportLog points at are deleted once older than `orphan_grace`.
+- Deduplication: surviving uploads with the same SHA-256 are hardlinked
+  to a single copy, so the paths stored on ImportLog stay valid.
+
+ImportLog rows are updated in place (file_path cleared for deleted files,
+file_hash filled in when it had to be computed); the caller commits.
+"""
+
+import os
+import time
+from datetime import datetime, timedelta
+
+from parse_cache import hash_file
+
+ACTIVE_STATUSES = ('queued', 'processing')
+DEFAULT_FINISHED_DAYS = 7
+DEFAULT_MAX_AGE_DAYS = 90
+DEFAULT_ORPHAN_GRACE = 24 * 3600  # Uploads in flight have no ImportLog yet
+
+def statement_folder(app):
+    """Absolute path uploaded statements are saved under: <UPLOAD_FOLDER>/statements."""
+    return os.path.join(app.root_path, app.config['UPLOAD_FOLDER'], 'statements')
+
+class CompactionReport:
+    """What a compaction run did (or would do, in a dry run)."""
+
+    def __init__(self, dry_run=False):
+        self.dry_run = dry_run
+        self.deleted = []  # (path, reason)
+        self.linked = []  # (path, canonical path)
+        self.bytes_reclaimed = 0
+        self.errors = []  # (path, message)
+
+    def summary(self):
+        verb = 'Would reclaim' if self.dry_run else 'Reclaimed'
+        return (f"{verb} {_format_bytes(self.bytes_reclaimed)}: "
+                f"{len(self.deleted)} deleted, {len(self.linked)} deduplicated, "
+                f"{len(self.errors)} errors")
+
+def _format_bytes(size):
+    if size < 1024:
+        return f'{size} B'
+    for unit in ('KB', 'MB', 'GB'):
+        size /= 1024
+        if size < 1024 or unit == 'GB':
+            return f'{size:.1f} {unit}'
+
+class _LinkCounter:
+    """
+    Tracks remaining hard links per inode so bytes are only counted as
+    reclaimed when the last link goes (also works in dry runs, where
+    nothing is actually removed).
+    """
+
+    def __init__(self):
+        self._remaining = {}
+
+    def unlink(self, stat):
+        key = (stat.st_dev, stat.st_ino)
+        remaining = self._remaining.get(key, stat.st_nlink) - 1
+        self._remaining[key] = remaining
+        return stat.st_size if remaining <= 0 else 0
+
+    def link(self, stat):
+        key = (stat.st_dev, stat.st_ino)
+        self._remaining[key] = self._remaining.get(key, stat.st_nlink) + 1
+
+# =============================================================================
+# COMPACTION
+# =============================================================================
+
+def compact_statements(import_logs, upload_dir, root_dir, finished_days=DEFAULT_FINISHED_DAYS,
+                       max_age_days=DEFAULT_MAX_AGE_DAYS, orphan_grace=DEFAULT_ORPHAN_GRACE,
+                       dry_run=False, now=None):
+    """
+    Apply the retention policy to `upload_dir` and hardlink duplicates.
+
+    Args:
+        import_logs: ImportLog rows (every row with a file_path)
+        upload_dir: Folder holding the uploaded statements
+        root_dir: Directory relative file_paths are resolved against (the
+            app's root_path; older rows store uploads/statements/<name>)
+        finished_days: Keep PDFs of finished imports this many days
+        max_age_days: Keep any other PDF this many days
+        orphan_grace: Seconds before an unreferenced file is deleted
+        dry_run: Report only; touch neither the files nor the rows
+        now: Current UTC datetime, compared with ImportLog.import_date (for tests)
+
+    Returns:
+        CompactionReport
+    """
+    now = now or datetime.utcnow()
+    report = CompactionReport(dry_run)
+    links = _LinkCounter()
+    upload_dir = os.path.abspath(upload_dir)
+
+    def delete(path, stat, reason, import_log=None):
+        if not dry_run:
+            try:
+                os.remove(path)
+            except OSError as e:
+                report.errors.append((path, str(e)))
+                return
+            if import_log is not None:
+                import_log.file_path = None
+        report.deleted.append((path, reason))
+        report.bytes_reclaimed += links.unlink(stat)
+
+    # Retention for files ImportLog knows about
+    referenced = set()
+    kept = []
+    for import_log in sorted(import_logs, key=lambda log: (log.import_date or now, log.id)):
+        if not import_log.file_path:
+            continue
+        path = os.path.abspath(os.path.join(root_dir, import_log.file_path))
+        referenced.add(path)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            # Already gone: the row shouldn't keep pointing at it
+            if not dry_run:
+                import_log.file_path = None
+            continue
+
+        age = now - (import_log.import_date or now)
+        finished = import_log.status not in ACTIVE_STATUSES and not import_log.preview_data
+        if finished and age > timedelta(days=finished_days):
+            delete(path, stat, 'finished', import_log)
+        elif import_log.status not in ACTIVE_STATUSES and age > timedelta(days=max_age_days):
+            delete(path, stat, 'expired', import_log)
+        else:
+            kept.append((import_log, path, stat))
+
+    # Files nothing points at (e.g. requests that failed after upload)
+    cutoff = time.time() - orphan_grace
+    try:
+        names = sorted(os.listdir(upload_dir))
+    except FileNotFoundError:
+        names = []
+    for name in names:
+        path = os.path.join(upload_dir, name)
+        if path in referenced or not os.path.isfile(path):
+            continue
+        stat = os.stat(path)
+        if stat.st_mtime < cutoff:
+            delete(path, stat, 'orphaned')
+
+    _deduplicate(kept, report, links, dry_run)
+    return report
+
+def _deduplicate(kept, report, links, dry_run):
+    """Replace identical uploads with hard links to the oldest copy."""
+    canonical = {}
+    for import_log, path, stat in kept:
+        file_hash = import_log.file_hash
+        if not file_hash:
+            try:
+                file_hash = hash_file(path)
+            except OSError as e:
+                report.errors.append((path, str(e)))
+                continue
+            if not dry_run:
+                import_log.file_hash = file_hash
+
+        if file_hash not in canonical:
+            canonical[file_hash] = (path, stat)
+            continue
+
+        original, original_stat = canonical[file_hash]
+        if (stat.st_dev, stat.st_ino) == (original_stat.st_dev, original_stat.st_ino):
+            continue  # Already linked
+
+        if not dry_run:
+            temp_path = f'{path}.link'
+            try:
+                os.link(original, temp_path)
+                os.replace(temp_path, path)
+            except OSError as e:
+                # e.g. a different filesystem; leave this copy alone
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                report.errors.append((path, str(e)))
+                continue
+        report.linked.append((path, original))
+        report.bytes_reclaimed += links.unlink(stat)
+        links.link(original_stat)
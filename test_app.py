@@ -0,0 +1,258 @@
+"""
+Test suite for the application factory and blueprint routes
+Run with: python -m pytest test_app.py -v
+"""
+
+import io
+import os
+import pickle
+import re
+from datetime import date, datetime, timedelta
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import inspect
+
+import config
+import parse_cache
+from app import create_app
+from extensions import db
+import momo_views
+from models import Account, Category, Transaction, ImportLog, ImportStagingRow, MoMoMonthlyRollup, MoMoTransaction
+from momo_import import MoMoRow
+from momo_search import is_search_index
+
+USER = {'username': 'ama', 'name': 'Ama', 'email': 'ama@example.com',
+        'password': 'secret', 'confirm_password': 'secret'}
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Testing app with its schema created and its files under tmp_path"""
+    monkeypatch.setattr(config.TestingConfig, 'UPLOAD_FOLDER', str(tmp_path / 'uploads'))
+    monkeypatch.setattr(config.TestingConfig, 'PARSE_CACHE_FOLDER', str(tmp_path / 'parse_cache'))
+    app = create_app('testing')
+    with app.app_context():
+        db.create_all()
+    return app
+
+@pytest.fixture
+def client(app):
+    """Client logged in as a freshly registered user"""
+    client = app.test_client()
+    client.post('/register', data=USER)
+    client.post('/login', data={'username': USER['username'], 'password': USER['password']})
+    return client
+
+# =============================================================================
+# FACTORY TESTS
+# =============================================================================
+
+def test_create_app_does_not_touch_database(tmp_path, monkeypatch):
+    """Test the schema is only created by the init-db command"""
+    db_path = tmp_path / 'app.db'
+    monkeypatch.setattr(config.TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{db_path}')
+
+    app = create_app('testing')
+    assert not os.path.exists(db_path)
+
+    result = app.test_cli_runner().invoke(args=['init-db'])
+
+    assert result.exit_code == 0, result.output
+    with app.app_context():
+        assert {'user', 'mo_mo_transaction', 'insight_cache'} <= set(inspect(db.engine).get_table_names())
+
+def test_autogenerate_ignores_search_index(app):
+    """Test the FTS5 search tables are only hidden from autogenerate by the env.py filter"""
+    def include_object(object, name, type_, reflected, compare_to):
+        return not (reflected and compare_to is None and is_search_index(name, type_))
+
+    with app.app_context(), db.engine.connect() as connection:
+        unfiltered = compare_metadata(MigrationContext.configure(connection), db.metadata)
+        filtered = compare_metadata(
+            MigrationContext.configure(connection, opts={'include_object': include_object}), db.metadata
+        )
+
+    assert {diff[1].name for diff in unfiltered if diff[0] == 'remove_table'} >= {'mo_mo_transaction_fts'}
+    assert filtered == []
+
+def test_required_settings_checked(monkeypatch):
+    """Test a config without a secret key is rejected when the app is built"""
+    monkeypatch.setattr(config.DevelopmentConfig, 'SECRET_KEY', None)
+
+    with pytest.raises(ValueError, match='SECRET_KEY'):
+        create_app('development')
+
+def test_apps_have_separate_services():
+    """Test job queues and caches are per app, not module globals"""
+    first, second = create_app('testing'), create_app('testing')
+
+    for name in ('import_jobs', 'parse_cache', 'insight_cache', 'insight_jobs', 'insight_llms'):
+        assert first.extensions[name] is not second.extensions[name]
+    assert first.extensions['insight_llms'].provider == 'stub'
+
+def test_process_worker_builds_app_from_config_name(monkeypatch):
+    """Test the process backend's initializer pickles (spawn/forkserver) and builds its own app"""
+    monkeypatch.setattr(config.TestingConfig, 'IMPORT_JOB_BACKEND', 'process')
+    monkeypatch.setattr(momo_views, '_worker_app', None)
+    app = create_app('testing')
+
+    worker_init = pickle.loads(pickle.dumps(app.extensions['import_jobs'].backend.worker_init))
+    worker_init()
+
+    assert momo_views._worker_app is not None and momo_views._worker_app is not app
+    assert momo_views._worker_app.config['TESTING']
+
+# =============================================================================
+# ROUTE TESTS
+# =============================================================================
+
+def test_login_required_redirects_to_login(app):
+    """Test the login view points at the core blueprint"""
+    response = app.test_client().get('/momo/dashboard')
+
+    assert response.status_code == 302
+    assert response.headers['Location'].startswith('/login')
+
+@pytest.mark.parametrize('path', [
+    '/dashboard', '/transactions', '/add_transaction', '/accounts', '/add_account',
+    '/categories', '/add_category', '/profile', '/momo/dashboard', '/momo/transactions',
+    '/momo/insights', '/import-statement', '/import-history',
+])
+def test_pages_render(client, path):
+    """Test every blueprint page (and the nav links in its layout) renders"""
+    response = client.get(path)
+
+    assert response.status_code == 200, response.data[:500]
+
+def test_export_keeps_report_url(client):
+    """Test POST /report still exports while GET /report is the report page"""
+    response = client.post('/report')
+
+    assert response.status_code == 200
+    assert response.mimetype == 'application/zip'
+
+def statement_row(transaction_id='1001', minute=0):
+    return MoMoRow(date=datetime(2025, 1, 2, 10, minute), payment_type='MOMO USER', counterparty='KOFI',
+                   counterparty_phone='+233 1', amount=10.0, transaction_id=transaction_id, fees=0.0,
+                   tax=0.0, balance_after=90.0, reference='', type='expense', page=1, row=1)
+
+def upload_statement(client, monkeypatch, rows=None):
+    """Upload a statement whose parser yields `rows` (parsed inline in testing)"""
+    rows = rows or [statement_row()]
+    monkeypatch.setattr(parse_cache, 'iter_momo_pdf', lambda *args, **kwargs: iter(rows))
+
+    return client.post('/import-statement', content_type='multipart/form-data',
+                       data={'file': (io.BytesIO(b'%PDF-1.4\n' + b'x' * 100), 'st.pdf')})
+
+def test_upload_saved_to_upload_folder(app, client, tmp_path, monkeypatch):
+    """Test a statement upload lands in UPLOAD_FOLDER and is parsed in the background"""
+    response = upload_statement(client, monkeypatch)
+
+    assert response.status_code == 302
+    saved = os.listdir(tmp_path / 'uploads' / 'statements')
+    assert len(saved) == 1 and saved[0].endswith('_st.pdf')
+    with app.app_context():
+        import_log = ImportLog.query.one()
+        assert import_log.total_transactions == 1
+        assert import_log.status == 'staged'
+
+@pytest.mark.parametrize('minutes_ago,expected', [(1, 'queued'), (60, 'failed')])
+def test_stale_import_marked_failed(app, client, minutes_ago, expected):
+    """Test a queued import whose worker went away stops polling as failed"""
+    with app.app_context():
+        import_log = ImportLog(user_id=1, filename='st.pdf', status='queued',
+                               updated_at=datetime.utcnow() - timedelta(minutes=minutes_ago))
+        db.session.add(import_log)
+        db.session.commit()
+        import_log_id = import_log.id
+
+    data = client.get(f'/import-status/{import_log_id}').get_json()
+
+    assert data['status'] == expected
+    assert (data['error'] is not None) == (expected == 'failed')
+
+def test_failed_commit_keeps_preview(app, client, monkeypatch):
+    """Test staged rows survive a failed commit and are only dropped by a successful one"""
+    upload_statement(client, monkeypatch)
+    form = {'positions': ['0'], 'selected': ['0']}
+
+    def broken_commit(import_log, user_id):
+        raise RuntimeError('database went away')
+    with monkeypatch.context() as patch:
+        patch.setattr(momo_views, 'commit_staged_rows', broken_commit)
+        response = client.post('/import-preview', data=form)
+
+    assert response.headers['Location'].startswith('/import-preview')
+    with app.app_context():
+        assert ImportLog.query.one().status == 'staged'
+        assert ImportStagingRow.query.count() == 1
+
+    response = client.post('/import-preview', data=form)
+
+    assert response.headers['Location'].startswith('/momo/transactions')
+    with app.app_context():
+        import_log = ImportLog.query.one()
+        assert (import_log.status, import_log.successful_imports) == ('completed', 1)
+        assert ImportStagingRow.query.count() == 0
+        assert MoMoTransaction.query.count() == 1
+        rollup = MoMoMonthlyRollup.query.one()
+        assert (rollup.month, rollup.count, rollup.amount) == ('2025-01', 1, 10.0)
+
+def test_transaction_filters_apply_across_pages(app, client):
+    """Test type/account filters run in the keyset query and carry through the cursor links"""
+    with app.app_context():
+        account = Account(name='Wallet', balance=0, user_id=1)
+        category = Category(name='Misc', type='expense', user_id=1)
+        db.session.add_all([account, category])
+        db.session.flush()
+        db.session.add_all([
+            Transaction(type='income' if i % 3 == 0 else 'expense', amount=1, description=f'row-{i}',
+                        date=date(2025, 1, 1) + timedelta(days=i), user_id=1,
+                        account_id=account.id, category_id=category.id)
+            for i in range(60)
+        ])
+        db.session.commit()
+        account_id, category_id = account.id, category.id
+
+    seen = []
+    url = f'/transactions?filtered=1&type=income&account={account_id}&category=999'
+    response = client.get(url)
+    assert b'No transactions match these filters' in response.data
+
+    url = f'/transactions?filtered=1&type=income&account={account_id}&category={category_id}'
+    while url:
+        html = client.get(url).get_data(as_text=True)
+        seen += [int(i) for i in re.findall(r'row-(\d+)', html)]
+        older = re.search(r'href="([^"#]*cursor=[^"]*)">\s*Older', html)
+        url = older and older.group(1).replace('&amp;', '&')
+
+    assert seen == [i for i in reversed(range(60)) if i % 3 == 0]
+
+def test_only_exact_duplicates_blocked(app, client, monkeypatch):
+    """Test a likely (fingerprint) duplicate can be ticked and imported, an ID match cannot"""
+    with app.app_context():
+        db.session.add_all([
+            MoMoTransaction(user_id=1, type='expense', amount=10.0, date=datetime(2025, 1, 2, 10, 0),
+                            transaction_id='1001', counterparty_phone='+233 1', balance_after=90.0),
+            MoMoTransaction(user_id=1, type='expense', amount=10.0, date=datetime(2025, 1, 2, 10, 5),
+                            counterparty_phone='+233 1', balance_after=90.0),
+        ])
+        db.session.commit()
+    upload_statement(client, monkeypatch, [statement_row('1001'), statement_row(None, minute=5)])
+
+    with app.app_context():
+        exact, likely = ImportStagingRow.query.order_by(ImportStagingRow.position).all()
+        assert exact.is_exact_duplicate and exact.is_duplicate and not exact.selected
+        assert not likely.is_exact_duplicate and likely.is_duplicate and not likely.selected
+    html = client.get('/import-preview').get_data(as_text=True)
+    assert html.count('disabled>') == 1 and 'Likely duplicate' in html
+
+    client.post('/import-preview', data={'positions': ['0', '1'], 'selected': ['0', '1']})
+
+    with app.app_context():
+        assert MoMoTransaction.query.count() == 3
+        assert ImportLog.query.one().successful_imports == 1
@@ -0,0 +1,202 @@
+"""
+Test suite for the LLM insight cache
+Run with: python -m pytest test_insight_cache.py -v
+"""
+
+import threading
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, select, func
+from sqlalchemy.pool import StaticPool
+
+import insight_cache
+from insight_cache import InsightCache, InsightJobs, insight_cache_key
+from models import InsightCacheEntry
+from momo_jobs import JobQueue
+
+NOW = datetime(2026, 1, 1, 12, 0)
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def engine():
+    """In-memory database with the insight_cache table, shared with job threads"""
+    engine = create_engine('sqlite://', poolclass=StaticPool, connect_args={'check_same_thread': False})
+    InsightCacheEntry.__table__.create(engine)
+    return engine
+
+def entry_count(engine):
+    with engine.connect() as conn:
+        return conn.execute(select(func.count()).select_from(insight_cache.insight_cache)).scalar()
+
+class FakeLLM:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return f'insight #{self.calls}'
+
+# =============================================================================
+# KEY TESTS
+# =============================================================================
+
+def test_cache_key_depends_on_model_version_and_variables():
+    """Test every part of the request changes the key, dict order doesn't"""
+    base = insight_cache_key('gemini', 1, {'income': 10.0, 'expense': 5.0})
+
+    assert base == insight_cache_key('gemini', 1, {'expense': 5.0, 'income': 10.0})
+    assert len(base) == 64
+    assert base != insight_cache_key('gemini-pro', 1, {'income': 10.0, 'expense': 5.0})
+    assert base != insight_cache_key('gemini', 2, {'income': 10.0, 'expense': 5.0})
+    assert base != insight_cache_key('gemini', 1, {'income': 10.0, 'expense': 5.5})
+
+# =============================================================================
+# CACHE TESTS
+# =============================================================================
+
+def test_hit_skips_llm_and_counts(engine):
+    """Test a repeated request is served from the table"""
+    cache = InsightCache()
+    llm = FakeLLM()
+
+    first = cache.get_or_generate(engine, 'gemini', 1, {'total': 1}, llm)
+    second = cache.get_or_generate(engine, 'gemini', 1, {'total': 1}, llm)
+    third = cache.get_or_generate(engine, 'gemini', 1, {'total': 2}, llm)
+
+    assert first == ('insight #1', False)
+    assert second == ('insight #1', True)
+    assert third == ('insight #2', False)
+    assert llm.calls == 2
+    assert cache.stats() == {'hits': 1, 'misses': 2, 'hit_rate': 1 / 3}
+
+    with engine.connect() as conn:
+        hits = conn.execute(select(insight_cache.insight_cache.c.hit_count)
+                            .where(insight_cache.insight_cache.c.content == 'insight #1')).scalar()
+    assert hits == 1
+
+def test_failed_generation_not_cached(engine):
+    """Test an LLM error propagates and the next request retries"""
+    cache = InsightCache()
+
+    def failing():
+        raise RuntimeError('quota exceeded')
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_generate(engine, 'gemini', 1, 'context', failing)
+
+    assert entry_count(engine) == 0
+    assert cache.get_or_generate(engine, 'gemini', 1, 'context', FakeLLM()) == ('insight #1', False)
+
+def test_expired_entry_is_a_miss(engine):
+    """Test entries past their TTL are not served and get removed"""
+    cache = InsightCache(ttl=timedelta(hours=1))
+    key = insight_cache_key('gemini', 1, 'context')
+    cache.put(engine, key, 'gemini', 1, 'old insight', now=NOW)
+
+    assert cache.get(engine, key, now=NOW + timedelta(minutes=59)) == 'old insight'
+    assert cache.get(engine, key, now=NOW + timedelta(hours=2)) is None
+    assert entry_count(engine) == 0
+
+def test_put_replaces_existing_entry(engine):
+    """Test storing the same key again overwrites it"""
+    cache = InsightCache()
+    key = insight_cache_key('gemini', 1, 'context')
+    cache.put(engine, key, 'gemini', 1, 'first', now=NOW)
+    cache.put(engine, key, 'gemini', 1, 'second', now=NOW)
+
+    assert cache.get(engine, key, now=NOW) == 'second'
+    assert entry_count(engine) == 1
+
+def test_lru_eviction(engine):
+    """Test the least recently used entries go when the table is full"""
+    cache = InsightCache(max_entries=2)
+    keys = [insight_cache_key('gemini', 1, i) for i in range(3)]
+
+    cache.put(engine, keys[0], 'gemini', 1, 'zero', now=NOW)
+    cache.put(engine, keys[1], 'gemini', 1, 'one', now=NOW + timedelta(minutes=1))
+    # Reading key 0 makes key 1 the least recently used
+    cache.get(engine, keys[0], now=NOW + timedelta(minutes=2))
+    cache.put(engine, keys[2], 'gemini', 1, 'two', now=NOW + timedelta(minutes=3))
+
+    later = NOW + timedelta(minutes=4)
+    assert entry_count(engine) == 2
+    assert cache.get(engine, keys[1], now=later) is None
+    assert cache.get(engine, keys[0], now=later) == 'zero'
+    assert cache.get(engine, keys[2], now=later) == 'two'
+
+# =============================================================================
+# BACKGROUND GENERATION TESTS
+# =============================================================================
+
+class BlockingLLM(FakeLLM):
+    """FakeLLM that waits until released, to observe pending jobs."""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.release.wait(5)
+        return super().__call__()
+
+def test_inline_job_ready_and_cached(engine):
+    """Test a finished job is pollable and its text lands in the cache"""
+    cache = InsightCache()
+    jobs = InsightJobs(cache, JobQueue(backend='inline'))
+    key = insight_cache_key('stub', 1, 'context')
+
+    assert jobs.submit(engine, key, 'stub', 1, FakeLLM(), owner=1)
+
+    assert jobs.poll(engine, key, owner=1) == {'status': 'ready', 'insights': 'insight #1'}
+    assert cache.get(engine, key) == 'insight #1'
+    # Other users only see it through the cache
+    assert jobs.poll(engine, insight_cache_key('stub', 1, 'other'), owner=2) == {'status': 'missing'}
+
+def test_pending_job_deduplicated(engine):
+    """Test concurrent requests for one key share a single LLM call"""
+    queue = JobQueue(backend='thread', max_workers=1)
+    jobs = InsightJobs(InsightCache(), queue)
+    key = insight_cache_key('stub', 1, 'context')
+    llm = BlockingLLM()
+
+    assert jobs.submit(engine, key, 'stub', 1, llm, owner=1)
+    assert jobs.submit(engine, key, 'stub', 1, llm, owner=2)
+    assert jobs.poll(engine, key, owner=2) == {'status': 'pending'}
+
+    llm.release.set()
+    queue.shutdown()
+    assert jobs.poll(engine, key, owner=2) == {'status': 'ready', 'insights': 'insight #1'}
+    assert llm.calls == 1
+
+def test_backlog_limit_and_timeout(engine):
+    """Test submit() refuses past max_pending and stuck jobs report an error"""
+    queue = JobQueue(backend='thread', max_workers=1)
+    jobs = InsightJobs(InsightCache(), queue, max_pending=1, timeout=0)
+    llm = BlockingLLM()
+    first, second = insight_cache_key('stub', 1, 'a'), insight_cache_key('stub', 1, 'b')
+
+    assert jobs.submit(engine, first, 'stub', 1, llm, owner=1)
+    assert not jobs.submit(engine, second, 'stub', 1, llm, owner=1)
+    assert jobs.poll(engine, first, owner=1)['status'] == 'error'
+
+    llm.release.set()
+    queue.shutdown()
+
+def test_failed_job_reported_and_retried(engine):
+    """Test an LLM error is reported once and a new submit tries again"""
+    cache = InsightCache()
+    jobs = InsightJobs(cache, JobQueue(backend='inline'))
+    key = insight_cache_key('stub', 1, 'context')
+
+    def failing():
+        raise TimeoutError('deadline exceeded')
+
+    jobs.submit(engine, key, 'stub', 1, failing, owner=1)
+    assert jobs.poll(engine, key, owner=1) == {'status': 'error', 'error': 'deadline exceeded'}
+    assert entry_count(engine) == 0
+
+    jobs.submit(engine, key, 'stub', 1, FakeLLM(), owner=1)
+    assert jobs.poll(engine, key, owner=1)['status'] == 'ready'
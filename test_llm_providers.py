@@ -0,0 +1,82 @@
+"""
+Test suite for the insight LLM provider registry
+Run with: python -m pytest test_llm_providers.py -v
+"""
+
+import gc
+import threading
+import weakref
+import pytest
+import llm_providers
+from llm_providers import LLMRegistry, STUB_RESPONSE
+
+PROMPT = [("system", "You are a test."), ("user", "{question}")]
+
+# =============================================================================
+# REGISTRY TESTS
+# =============================================================================
+
+def test_stub_chain_built_once():
+    """Test the client and chain are created lazily and then reused"""
+    registry = LLMRegistry('stub')
+    assert registry._llm is None
+
+    chain = registry.chain('test', PROMPT)
+
+    assert registry.chain('test', PROMPT) is chain
+    assert registry.llm() is registry.llm()
+    assert chain.invoke({'question': 'why?'}).content == STUB_RESPONSE
+    assert registry.model_name == 'stub'
+
+def test_reset_rebuilds():
+    """Test reset() drops the cached client and chains"""
+    registry = LLMRegistry('stub')
+    llm, chain = registry.llm(), registry.chain('test', PROMPT)
+
+    registry.reset()
+
+    assert registry.llm() is not llm
+    assert registry.chain('test', PROMPT) is not chain
+
+def test_fork_hook_resets_live_registries_only():
+    """Test the single at-fork hook resets live registries and holds no dropped ones"""
+    kept, dropped = LLMRegistry('stub'), LLMRegistry('stub')
+    kept.llm()
+    dropped_ref = weakref.ref(dropped)
+
+    del dropped
+    gc.collect()
+    llm_providers._reset_after_fork()
+
+    assert dropped_ref() is None
+    assert kept._llm is None
+
+def test_fork_hook_ignores_held_lock():
+    """Test the at-fork reset doesn't wait on a lock held when the parent forked"""
+    registry = LLMRegistry('stub')
+    registry.llm()
+    registry._lock.acquire()
+
+    child = threading.Thread(target=llm_providers._reset_after_fork, daemon=True)
+    child.start()
+    child.join(timeout=5)
+
+    assert not child.is_alive()
+    assert registry._llm is None and not registry._lock.locked()
+
+def test_groq_client_configuration(monkeypatch):
+    """Test provider-specific model, key and timeout arguments"""
+    monkeypatch.setenv('GROQ_API_KEY', 'gsk-test')
+    registry = LLMRegistry('groq', timeout=7)
+
+    llm = registry.llm()
+
+    assert registry.model_name == 'llama3-70b-8192'
+    assert llm.model_name == 'llama3-70b-8192'
+    assert llm.groq_api_key.get_secret_value() == 'gsk-test'
+    assert llm.request_timeout == 7 and llm.max_retries == 1
+
+def test_unknown_provider():
+    """Test an unsupported backend name is rejected up front"""
+    with pytest.raises(ValueError):
+        LLMRegistry('openai')
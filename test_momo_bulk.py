@@ -0,0 +1,109 @@
+"""
+Test suite for MoMo bulk write helpers
+Run with: python -m pytest test_momo_bulk.py -v
+"""
+
+import pytest
+from sqlalchemy import (
+    create_engine, MetaData, Table, Column, Integer, Float, String, UniqueConstraint, select, func
+)
+from momo_bulk import bulk_insert, insert_from_select_skip_conflicts, upsert_from_select_add
+
+@pytest.fixture
+def tables():
+    engine = create_engine('sqlite://')
+    metadata = MetaData()
+    staging = Table('staging', metadata,
+                    Column('id', Integer, primary_key=True),
+                    Column('transaction_id', String(50)),
+                    Column('reference', String(50)))
+    target = Table('target', metadata,
+                   Column('id', Integer, primary_key=True),
+                   Column('transaction_id', String(50), unique=True),
+                   Column('reference', String(50)))
+    metadata.create_all(engine)
+    with engine.begin() as connection:
+        yield connection, staging, target
+
+# =============================================================================
+# BULK INSERT TESTS
+# =============================================================================
+
+def test_bulk_insert_writes_all_rows(tables):
+    """Test executemany path writes every row"""
+    connection, staging, _ = tables
+    rows = [{'transaction_id': str(i), 'reference': ''} for i in range(10)]
+
+    assert bulk_insert(connection, staging, rows) == 10
+    assert connection.execute(select(func.count()).select_from(staging)).scalar() == 10
+
+def test_bulk_insert_empty(tables):
+    """Test empty input is a no-op"""
+    connection, staging, _ = tables
+    assert bulk_insert(connection, staging, []) == 0
+
+# =============================================================================
+# INSERT ... SELECT TESTS
+# =============================================================================
+
+def test_insert_from_select_skips_conflicts(tables):
+    """Test existing and repeated transaction IDs are skipped and counted"""
+    connection, staging, target = tables
+    connection.execute(target.insert(), [{'transaction_id': '1', 'reference': 'old'}])
+    bulk_insert(connection, staging, [
+        {'transaction_id': '1', 'reference': 'dup of existing'},
+        {'transaction_id': '2', 'reference': 'new'},
+        {'transaction_id': '2', 'reference': 'dup within statement'},
+        {'transaction_id': None, 'reference': 'no id'},
+    ])
+
+    inserted = insert_from_select_skip_conflicts(
+        connection, target, ['transaction_id', 'reference'],
+        select(staging.c.transaction_id, staging.c.reference).where(staging.c.id > 0),
+        conflict_columns=['transaction_id']
+    )
+
+    assert inserted == 2
+    references = connection.execute(select(target.c.reference).order_by(target.c.id)).scalars().all()
+    assert references == ['old', 'new', 'no id']
+
+# =============================================================================
+# UPSERT TESTS
+# =============================================================================
+
+@pytest.mark.parametrize('dialect', ['sqlite', 'other'])
+def test_upsert_from_select_adds_to_existing_rows(monkeypatch, dialect):
+    """Test repeated upserts add onto existing keys and insert new ones (ON CONFLICT and fallback)"""
+    engine = create_engine('sqlite://')
+    metadata = MetaData()
+    deltas = Table('deltas', metadata,
+                   Column('id', Integer, primary_key=True),
+                   Column('month', String(7)),
+                   Column('count', Integer),
+                   Column('amount', Float))
+    totals = Table('totals', metadata,
+                   Column('id', Integer, primary_key=True),
+                   Column('month', String(7)),
+                   Column('count', Integer),
+                   Column('amount', Float),
+                   UniqueConstraint('month'))
+    metadata.create_all(engine)
+
+    with engine.begin() as connection:
+        monkeypatch.setattr(connection.dialect, 'name', dialect)
+        connection.execute(totals.insert(), [{'month': '2024-01', 'count': 1, 'amount': 5.0}])
+        bulk_insert(connection, deltas, [
+            {'month': '2024-01', 'count': 1, 'amount': 10.0},
+            {'month': '2024-01', 'count': 1, 'amount': 2.5},
+            {'month': '2024-02', 'count': 1, 'amount': 7.0},
+        ])
+        grouped = select(deltas.c.month, func.sum(deltas.c.count), func.sum(deltas.c.amount))\
+            .where(deltas.c.id > 0).group_by(deltas.c.month)
+
+        for _ in range(2):
+            upsert_from_select_add(connection, totals, ['month', 'count', 'amount'], grouped,
+                                   conflict_columns=['month'])
+
+        rows = connection.execute(select(totals.c.month, totals.c.count, totals.c.amount)
+                                  .order_by(totals.c.month)).all()
+    assert [tuple(row) for row in rows] == [('2024-01', 5, 30.0), ('2024-02', 2, 14.0)]
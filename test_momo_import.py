@@ -4,9 +4,14 @@ Run with: python -m pytest test_momo_import.py -v
 """
 
 import pytest
+import pdfplumber
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import momo_import
 from momo_import import (
     parse_momo_date,
+    ParseContext,
+    DATE_FORMATS,
     parse_amount,
     parse_fee_or_tax,
     extract_counterparty,
@@ -15,7 +20,20 @@ from momo_import import (
     categorize_transactions,
     find_duplicates,
     generate_import_summary,
-    parse_table_row
+    parse_table_row,
+    parse_momo_pdf,
+    iter_momo_pdf,
+    categorize_stream,
+    dedup_stream,
+    transaction_fingerprint,
+    summarize_stream,
+    ImportSummary,
+    MoMoRow,
+    ROW_FIELDS,
+    CategoryMatcher,
+    CategoryMatcherCache,
+    parse_keywords,
+    DEFAULT_CATEGORY_RULES
 )
 
 # =============================================================================
@@ -43,6 +61,38 @@ def test_parse_momo_date_invalid():
     result = parse_momo_date("invalid date")
     assert result is None
 
+def strptime_reference(date_str):
+    """The original parse: strptime with each format in order"""
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(date_str.strip(), fmt)
+        except ValueError:
+            continue
+    return None
+
+DATE_SAMPLES = [
+    "20 Nov 2025 18:18", "1 jan 2024 0:5", "05 MAY 2024 07:09", "  3 Feb 2023 23:59 ",
+    "31 Feb 2024 10:00", "20 Nov 2025 24:00", "20 Nov 2025 18:60", "20 Nov 25 18:18",
+    "20 Nov 2025 18:18:00", "20  Nov\t2025   18:18", "20 Sept 2025 18:18", "１ Nov 2025 18:18",
+    "15 December 2025 09:30", "15/12/2025 09:30", "2025-12-15 09:30:00", "20 Nov 2025",
+    "", "invalid date", "00 Nov 2025 10:00", "20 Nov 0000 10:00",
+]
+
+@pytest.mark.parametrize('date_str', DATE_SAMPLES)
+def test_parse_momo_date_matches_strptime(date_str):
+    """Test the fast path and format memo give the strptime result"""
+    expected = strptime_reference(date_str)
+    assert parse_momo_date(date_str) == expected
+    assert ParseContext().parse_date(date_str) == expected
+
+def test_parse_context_remembers_format():
+    """Test the context switches to the statement's format and stays correct"""
+    context = ParseContext()
+    assert context.parse_date("15/12/2025 09:30") == datetime(2025, 12, 15, 9, 30)
+    assert context.date_format == "%d/%m/%Y %H:%M"
+    for date_str in DATE_SAMPLES:
+        assert context.parse_date(date_str) == strptime_reference(date_str)
+
 # =============================================================================
 # AMOUNT PARSING TESTS
 # =============================================================================
@@ -65,6 +115,19 @@ def test_parse_amount_with_currency():
     assert amount == 32.46
     assert is_expense is False
 
+@pytest.mark.parametrize('amount_str', [
+    "GHS 1,234.50", "-\u00a025.00", "+ 50\u3000", "gh 5", "S-1", "1e3", "--5", "GHS", 12.5,
+])
+def test_parse_amount_matches_regex_cleaning(amount_str):
+    """Test fast amount cleaning matches the old re.sub(r'[GHS\\s,]', '')"""
+    import re
+    cleaned = re.sub(r'[GHS\s,]', '', str(amount_str))
+    try:
+        expected = (float(cleaned.lstrip('+-')), cleaned.startswith('-'))
+    except ValueError:
+        expected = (0.0, False)
+    assert parse_amount(amount_str) == expected
+
 def test_parse_amount_empty():
     """Test parsing empty amount"""
     amount, is_expense = parse_amount("")
@@ -175,6 +238,115 @@ def test_auto_categorize_default():
     result = auto_categorize(trans)
     assert result == 'Other'
 
+class FakeCategory:
+    def __init__(self, name, keywords):
+        self.name = name
+        self.keywords = keywords
+
+def loop_categorize(trans, user_categories):
+    """Reference implementation: check every category's keywords in turn"""
+    text = ' '.join(str(trans.get(f, '')) for f in ('payment_type', 'reference', 'counterparty')).lower()
+    for category in user_categories:
+        for keyword in category.keywords:
+            if keyword.lower() in text:
+                return category.name
+    for name, keywords in DEFAULT_CATEGORY_RULES.items():
+        for keyword in keywords:
+            if keyword in text:
+                return name
+    return 'Other'
+
+def test_user_categories_take_priority():
+    """Test user keywords win over default rules"""
+    trans = {'payment_type': 'MOMO USER', 'reference': 'Uber ride', 'counterparty': 'UBER GH'}
+    categories = [FakeCategory('Work Travel', ['Uber'])]
+    assert auto_categorize(trans, categories) == 'Work Travel'
+
+def test_category_matcher_priority_not_position():
+    """Test the earlier category wins even when a later keyword appears first"""
+    matcher = CategoryMatcher([('A', ['ride']), ('B', ['uber'])])
+    assert matcher.match('uber ride') == 'A'
+    assert matcher.match('uber') == 'B'
+    assert matcher.match('taxi') is None
+
+    # An empty keyword matches anything, like '' in text
+    matcher = CategoryMatcher([('A', ['ride']), ('B', [''])])
+    assert matcher.match('uber ride') == 'A'
+    assert matcher.match('taxi') == 'B'
+
+def test_category_matcher_overlapping_keywords():
+    """Test keywords that are suffixes/prefixes of each other"""
+    matcher = CategoryMatcher([('Food', ['jumia food']), ('Shopping', ['jumia', 'mia f'])])
+    assert matcher.match('paid jumia food') == 'Food'
+    assert matcher.match('paid jumia fo') == 'Shopping'
+
+    matcher = CategoryMatcher([('Short', ['he']), ('Long', ['she', 'hers'])])
+    assert matcher.match('ushers') == 'Short'
+
+def test_category_matcher_ignores_non_list_keywords():
+    """Test categories without a keyword list are skipped"""
+    categories = [FakeCategory('Empty', None), FakeCategory('Text', 'uber'), FakeCategory('Cab', ['uber'])]
+    matcher = CategoryMatcher.from_categories(categories)
+    assert matcher.names[0] == 'Cab'
+
+def test_category_matcher_matches_loop():
+    """Test the compiled matcher gives the same answers as the keyword loop"""
+    import random
+    rng = random.Random(7)
+    alphabet = 'abcde '
+    categories = [
+        FakeCategory(f'Cat {i}', [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 4)))
+                                  for _ in range(rng.randint(1, 4))])
+        for i in range(30)
+    ]
+    for _ in range(500):
+        trans = {
+            'payment_type': ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 8))),
+            'reference': rng.choice([None, 'Uber', 'pizza', 'ABC']),
+            'counterparty': ''.join(rng.choice(alphabet.upper()) for _ in range(rng.randint(0, 8))),
+        }
+        if rng.random() < 0.3:
+            del trans['reference']
+        expected = loop_categorize(trans, categories)
+        assert categorize_transactions([trans], categories)[0]['suggested_category'] == expected
+
+def test_parse_keywords():
+    """Test keyword field parsing drops blanks and repeats"""
+    assert parse_keywords(' Shoprite, melcom,, SHOPRITE , max mart ') == ['Shoprite', 'melcom', 'max mart']
+    assert parse_keywords(None) == []
+
+def test_matcher_cache_hits_until_version_changes():
+    """Test cached matchers are reused until the rules version changes"""
+    cache = CategoryMatcherCache()
+    loads = []
+    def load():
+        loads.append(1)
+        return [FakeCategory('Groceries', ['shoprite'])]
+
+    first = cache.get(1, 0, load)
+    assert cache.get(1, 0, load) is first
+    assert len(loads) == 1 and cache.hits == 1 and cache.misses == 1
+
+    second = cache.get(1, 1, load)
+    assert second is not first and len(loads) == 2
+    assert second.match('shoprite accra') == 'Groceries'
+
+def test_matcher_cache_invalidate_and_evict():
+    """Test invalidation and least-recently-used eviction"""
+    cache = CategoryMatcherCache(maxsize=2)
+    cache.get(1, 0, list)
+    cache.get(2, 0, list)
+    cache.get(1, 0, list)
+    cache.get(3, 0, list)  # evicts user 2
+    assert len(cache) == 2
+    misses = cache.misses
+    cache.get(1, 0, list)
+    assert cache.misses == misses
+
+    cache.invalidate(1)
+    cache.get(1, 0, list)
+    assert cache.misses == misses + 1
+
 # =============================================================================
 # DUPLICATE DETECTION TESTS
 # =============================================================================
@@ -194,6 +366,77 @@ def test_find_duplicates():
     assert result[1]['is_duplicate'] is False
     assert result[2]['is_duplicate'] is True
 
+def test_find_duplicates_within_statement():
+    """Test a transaction ID repeated in the same statement is flagged"""
+    transactions = [
+        {'transaction_id': '123', 'amount': 10},
+        {'transaction_id': None, 'amount': 5},
+        {'transaction_id': '123', 'amount': 10},
+        {'transaction_id': None, 'amount': 5},
+    ]
+
+    result = find_duplicates(transactions, set())
+
+    assert [t['is_duplicate'] for t in result] == [False, False, True, False]
+
+def test_dedup_stream_batched_lookup():
+    """Test the lookup only sees the statement's IDs, once per batch"""
+    stored = {'3', '7', '999'}
+    calls = []
+
+    def lookup(ids):
+        calls.append(list(ids))
+        return [i for i in ids if i in stored]
+
+    transactions = [{'transaction_id': str(i % 8)} for i in range(10)] + [{'transaction_id': ''}]
+    result = list(dedup_stream(transactions, lookup, batch_size=4))
+
+    # The last batch only repeats IDs already seen, so it needs no query
+    assert calls == [['0', '1', '2', '3'], ['4', '5', '6', '7']]
+    assert [t['is_duplicate'] for t in result] == [
+        False, False, False, True, False, False, False, True, True, True, False
+    ]
+
+def id_less_row(minute, balance=100.0, phone='+233 1'):
+    return {'transaction_id': None, 'date': datetime(2025, 11, 20, 18, minute), 'amount': 25.0,
+            'counterparty_phone': phone, 'balance_after': balance}
+
+def test_fingerprint_duplicates_scored():
+    """Test rows without an ID match on date/amount/phone/balance with a confidence"""
+    full, no_phone, no_balance, blank_balance, new = (
+        id_less_row(1), id_less_row(2, phone=''), id_less_row(3, balance=None),
+        id_less_row(5, balance=0.0), id_less_row(4)
+    )
+    stored = {transaction_fingerprint(t) for t in (full, no_phone, no_balance, blank_balance)}
+    transactions = [dict(t) for t in (full, no_phone, no_balance, blank_balance, new)]
+    transactions.append({'transaction_id': '555', 'date': full['date'], 'amount': 25.0})
+
+    result = find_duplicates(transactions, {'555'}, existing_fingerprints=stored)
+
+    # A blank balance (parsed as 0.0) is no evidence, so that match stays "possible"
+    assert [t['duplicate_confidence'] for t in result] == [0.99, 0.9, 0.69, 0.69, None, 1.0]
+    assert [t['is_duplicate'] for t in result] == [True, True, False, False, False, True]
+
+def test_fingerprints_are_opt_in():
+    """Test ID-less rows stay new when no fingerprints are given"""
+    result = find_duplicates([id_less_row(1), id_less_row(1)], set())
+    assert [t['is_duplicate'] for t in result] == [False, False]
+    assert result[1]['duplicate_confidence'] is None
+
+def test_fingerprint_lookup_batched_and_within_statement():
+    """Test the fingerprint lookup sees only ID-less rows, and repeats are flagged"""
+    calls = []
+
+    def lookup(fingerprints):
+        calls.append(sorted(fingerprints, key=lambda fp: fp[0]))
+        return [fp for fp in fingerprints if fp[0].minute == 2]
+
+    transactions = [id_less_row(1), id_less_row(2), {'transaction_id': '9', 'date': None}, id_less_row(1)]
+    result = list(dedup_stream(transactions, lambda ids: [], batch_size=10, existing_fingerprints=lookup))
+
+    assert [[fp[0].minute for fp in call] for call in calls] == [[1, 2]]
+    assert [t['is_duplicate'] for t in result] == [False, True, False, True]
+
 # =============================================================================
 # SUMMARY GENERATION TESTS
 # =============================================================================
@@ -279,6 +522,225 @@ def test_parse_table_row_short():
     result = parse_table_row(row, 1, 1)
     assert result is None
 
+# =============================================================================
+# PARSED ROW RECORD TESTS
+# =============================================================================
+
+def make_row(**overrides):
+    data = {
+        'date': datetime(2025, 11, 20, 18, 18), 'payment_type': 'CASH OUT', 'counterparty': 'JAMES',
+        'counterparty_phone': '+233 54 86 74 41 0', 'amount': 25.0, 'transaction_id': '69366086327',
+        'fees': 0.5, 'tax': 0.0, 'balance_after': 32.46, 'reference': 'NationalId--', 'type': 'expense',
+        'page': 1, 'row': 1,
+    }
+    data.update(overrides)
+    return MoMoRow(**data)
+
+def as_dict(row):
+    """The old dict form of a row: only the fields that are filled in"""
+    return {name: row[name] for name in ROW_FIELDS if name in row}
+
+def test_momo_row_is_compact():
+    """Test rows have no per-instance __dict__"""
+    assert not hasattr(make_row(), '__dict__')
+
+def test_momo_row_mapping_access():
+    """Test dict-style access used by the pipeline stages"""
+    row = make_row()
+    assert row['amount'] == 25.0
+    assert row.get('is_duplicate', False) is False
+    assert 'is_duplicate' not in row
+    with pytest.raises(KeyError):
+        row['suggested_category']
+    with pytest.raises(KeyError):
+        row['unknown'] = 1
+
+    row['is_duplicate'] = True
+    assert row.get('is_duplicate', False) is True and 'is_duplicate' in row
+
+def test_momo_row_pickles_unset_fields():
+    """Test unfilled fields survive the trip through a worker process"""
+    import pickle
+    row = pickle.loads(pickle.dumps(make_row()))
+    assert row.get('suggested_category', 'Other') == 'Other'
+    assert row == make_row()
+
+def test_pipeline_accepts_rows_and_dicts():
+    """Test categorize/dedup/summary give the same result for records and dicts"""
+    rows = [make_row(reference='Uber ride'), make_row(transaction_id='X1', type='income')]
+    dicts = [as_dict(row) for row in rows]
+
+    for transactions in (rows, dicts):
+        categorize_transactions(transactions)
+        find_duplicates(transactions, {'X1'})
+
+    assert [as_dict(row) for row in rows] == dicts
+    assert generate_import_summary(rows) == generate_import_summary(dicts)
+
+# =============================================================================
+# PARALLEL PDF PARSING TESTS
+# =============================================================================
+
+class FakePage:
+    def __init__(self, tables, fail=False):
+        self.tables = tables
+        self.fail = fail
+
+    def extract_tables(self):
+        if self.fail:
+            raise ValueError("corrupt page")
+        return self.tables
+
+class FakePDF:
+    def __init__(self, pages):
+        self.pages = pages
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+def make_fake_pdf(num_pages, fail_page=None):
+    pages = []
+    for p in range(num_pages):
+        rows = [["Date", "Payment Type", "To/From", "Amount", "Transaction ID"]]
+        for r in range(3):
+            rows.append([
+                f"{(p % 28) + 1} Nov 2025 {r:02d}:15",
+                "CASH OUT",
+                f"+233 54 {p:02d} {r:02d}, SHOP {p}",
+                f"-{p + r + 1}.00",
+                f"{p}{r}",
+                "GHS 0.50",
+                "GHS 0.00",
+                "GHS 32.46",
+            ])
+        pages.append(FakePage([rows], fail=(p + 1 == fail_page)))
+    return FakePDF(pages)
+
+@pytest.fixture
+def fake_pdf(monkeypatch):
+    """Serve a fake PDF and run the 'process' pool on threads"""
+    state = {}
+    monkeypatch.setattr(pdfplumber, 'open', lambda path: state['pdf'])
+    state['pools'] = []
+
+    def thread_pool(max_workers, mp_context):
+        state['pools'].append(mp_context.get_start_method())
+        return ThreadPoolExecutor(max_workers)
+
+    monkeypatch.setattr(momo_import, 'ProcessPoolExecutor', thread_pool)
+    return state
+
+def test_parse_momo_pdf_parallel_matches_serial(fake_pdf):
+    """Test parallel extraction merges rows in page/row order"""
+    fake_pdf['pdf'] = make_fake_pdf(25)
+
+    serial = parse_momo_pdf('statement.pdf', workers=1)
+    parallel = parse_momo_pdf('statement.pdf', workers=4, parallel_threshold=10)
+
+    assert serial['total_parsed'] == 75
+    assert parallel == serial
+    assert fake_pdf['pools'] == ['spawn']
+
+def test_parse_momo_pdf_parallel_stops_at_bad_page(fake_pdf):
+    """Test an unreadable page aborts both paths at the same point"""
+    fake_pdf['pdf'] = make_fake_pdf(25, fail_page=12)
+
+    serial = parse_momo_pdf('statement.pdf', workers=1)
+    parallel = parse_momo_pdf('statement.pdf', workers=4, parallel_threshold=10)
+
+    assert serial['total_parsed'] == 33
+    assert serial['errors'][0]['page'] == 0
+    assert parallel == serial
+
+def test_parse_momo_pdf_small_file_is_serial(fake_pdf, monkeypatch):
+    """Test statements below the threshold never start a pool"""
+    fake_pdf['pdf'] = make_fake_pdf(3)
+
+    def no_pool(*args, **kwargs):
+        raise AssertionError("pool should not be used")
+
+    monkeypatch.setattr(momo_import, 'ProcessPoolExecutor', no_pool)
+    result = parse_momo_pdf('statement.pdf', workers=4, parallel_threshold=10)
+    assert result['total_parsed'] == 9
+
+# =============================================================================
+# STREAMING PIPELINE TESTS
+# =============================================================================
+
+def test_iter_momo_pdf_is_lazy(fake_pdf):
+    """Test rows are yielded before later pages are extracted"""
+    fake_pdf['pdf'] = make_fake_pdf(4, fail_page=2)
+
+    errors = []
+    rows = iter_momo_pdf('statement.pdf', errors, workers=1)
+    first = next(rows)
+
+    assert first['page'] == 1
+    assert errors == []
+    assert len(list(rows)) == 2
+    assert errors[0]['page'] == 0
+
+def test_streaming_pipeline_matches_list_functions(fake_pdf):
+    """Test categorize -> dedup -> summary stream equals the list wrappers"""
+    fake_pdf['pdf'] = make_fake_pdf(5)
+    existing_ids = {'00', '31'}
+
+    result = parse_momo_pdf('statement.pdf', workers=1)
+    transactions = categorize_transactions(result['transactions'])
+    transactions = find_duplicates(transactions, existing_ids)
+    expected = generate_import_summary(transactions)
+
+    summary = ImportSummary()
+    rows = iter_momo_pdf('statement.pdf', workers=1)
+    rows = categorize_stream(rows)
+    rows = dedup_stream(rows, existing_ids)
+    streamed = list(summarize_stream(rows, summary))
+
+    assert streamed == transactions
+    assert summary.to_dict() == expected
+    assert expected['duplicates'] == 2
+
+def test_import_summary_empty():
+    """Test empty summary matches the list function"""
+    assert ImportSummary().to_dict() == generate_import_summary([])
+
+@pytest.mark.parametrize('values', [
+    [0.1] * 10,
+    [1e16, 1.0, -1e16],
+    [1e100, 1.0, -1e100, 1e-3, 0.3],
+    [0, 0, 0],
+    [0.1, float('inf'), 0.2],
+])
+def test_import_summary_totals_match_builtin_sum(values):
+    """Test running totals equal the original sum() over the list, rounding included"""
+    transactions = [{'type': 'income', 'amount': v, 'fees': v, 'tax': 0} for v in values]
+
+    summary = generate_import_summary(transactions)
+
+    assert repr(summary['total_income']) == repr(sum(values))
+    assert repr(summary['total_fees']) == repr(sum(values))
+    assert repr(summary['total_tax']) == repr(sum(t['tax'] for t in transactions))
+    assert summary['total_expense'] == 0
+
+def test_import_summary_totals_match_builtin_sum_randomized():
+    """Test compensated totals on mixed magnitudes match sum() bit for bit"""
+    import random
+    rng = random.Random(3)
+    transactions = [{'type': rng.choice(['income', 'expense']),
+                     'amount': rng.uniform(-1, 1) * rng.choice([1e-3, 1, 1e6, 1e16]),
+                     'fees': rng.choice([0.1, 0.2, 0.3, 0]), 'tax': rng.random()}
+                    for _ in range(2000)]
+
+    summary = generate_import_summary(transactions)
+
+    assert repr(summary['total_income']) == repr(sum(t['amount'] for t in transactions if t['type'] == 'income'))
+    assert repr(summary['total_expense']) == repr(sum(t['amount'] for t in transactions if t['type'] == 'expense'))
+    assert repr(summary['total_fees']) == repr(sum(t['fees'] for t in transactions))
+    assert repr(summary['total_tax']) == repr(sum(t['tax'] for t in transactions))
+
 # =============================================================================
 # RUN TESTS
 # =============================================================================
@@ -0,0 +1,50 @@
+"""
+Test suite for the MoMo import background job queue
+Run with: python -m pytest test_momo_jobs.py -v
+"""
+
+import pytest
+from momo_jobs import JobQueue, InlineBackend, ThreadPoolBackend
+
+# =============================================================================
+# JOB QUEUE TESTS
+# =============================================================================
+
+def test_inline_backend_runs_immediately():
+    """Test inline backend runs the job before enqueue returns"""
+    calls = []
+    queue = JobQueue(backend='inline')
+    future = queue.enqueue(calls.append, 42)
+    assert calls == [42]
+    assert future.done()
+
+def test_inline_backend_captures_exception():
+    """Test job exceptions are stored on the future, not raised"""
+    def boom():
+        raise RuntimeError("parse failed")
+
+    queue = JobQueue(backend='inline')
+    future = queue.enqueue(boom)
+    assert isinstance(future.exception(), RuntimeError)
+
+def test_thread_backend_returns_result():
+    """Test thread backend runs jobs off the calling thread"""
+    queue = JobQueue(backend='thread', max_workers=2)
+    try:
+        future = queue.enqueue(lambda a, b: a + b, 2, 3)
+        assert future.result(timeout=5) == 5
+    finally:
+        queue.shutdown()
+
+def test_custom_backend_instance():
+    """Test a backend instance can be passed directly"""
+    backend = ThreadPoolBackend(max_workers=1)
+    queue = JobQueue(backend=backend)
+    assert queue.backend is backend
+    queue.shutdown()
+    assert isinstance(JobQueue(backend=InlineBackend()).backend, InlineBackend)
+
+def test_unknown_backend():
+    """Test unknown backend names are rejected"""
+    with pytest.raises(ValueError):
+        JobQueue(backend='celery')
@@ -0,0 +1,103 @@
+"""
+Test suite for MoMo transaction search
+Run with: python -m pytest test_momo_search.py -v
+"""
+
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, inspect
+from sqlalchemy.orm import declarative_base, Session
+
+import momo_search
+from momo_search import install_search_index, search_transactions, FTS_TABLE
+
+Base = declarative_base()
+
+class MoMoTransaction(Base):
+    __tablename__ = 'mo_mo_transaction'
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    date = Column(DateTime, nullable=False)
+    counterparty = Column(String(200))
+    payment_type = Column(String(100))
+    reference = Column(String(200))
+
+install_search_index(MoMoTransaction.__table__)
+
+ROWS = [
+    ('KOFI MENSAH', 'MOMO USER', 'rent for may'),
+    ('AMA SERWAA', 'CASH OUT', None),
+    ('UBER GHANA', 'MERCHANT PAYMENT', 'uber ride'),
+    ('ECG PREPAID', 'BILL PAYMENT', 'power 50% off'),
+    (None, 'TRANSFER', 'from kofi'),
+]
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def session():
+    """SQLite database created with metadata.create_all (FTS table included)"""
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        for i, (counterparty, payment_type, reference) in enumerate(ROWS, start=1):
+            session.add(MoMoTransaction(user_id=1, date=datetime(2024, 1, i), counterparty=counterparty,
+                                        payment_type=payment_type, reference=reference))
+        session.add(MoMoTransaction(user_id=2, date=datetime(2024, 1, 1), counterparty='KOFI'))
+        session.commit()
+        yield session
+
+def ids(session, term, order='date'):
+    query = session.query(MoMoTransaction).filter_by(user_id=1)
+    query = search_transactions(query, MoMoTransaction, term, order=order)
+    if order == 'date':
+        query = query.order_by(MoMoTransaction.id)
+    return [row.id for row in query.all()]
+
+def ilike_ids(session, term):
+    needle = term.lower()
+    return [row.id for row in session.query(MoMoTransaction).filter_by(user_id=1).order_by(MoMoTransaction.id)
+            if any(needle in (value or '').lower()
+                   for value in (row.counterparty, row.payment_type, row.reference))]
+
+# =============================================================================
+# SEARCH TESTS
+# =============================================================================
+
+def test_create_all_builds_fts_table(session):
+    """Test the FTS5 table is created with the transactions table"""
+    assert inspect(session.get_bind()).has_table(FTS_TABLE)
+
+@pytest.mark.parametrize('term', ['kofi', 'KOFI', 'ensa', 'payment', 'uber ride', '50%', 'zz', 'nothing here'])
+def test_search_matches_substring_semantics(session, term):
+    """Test FTS results match a case-insensitive substring scan"""
+    assert ids(session, term) == ilike_ids(session, term)
+
+def test_blank_term_returns_everything(session):
+    """Test empty search leaves the query unfiltered"""
+    assert ids(session, '  ') == [1, 2, 3, 4, 5]
+
+def test_relevance_order(session):
+    """Test relevance ordering returns every match"""
+    assert sorted(ids(session, 'kofi', order='relevance')) == [1, 5]
+
+def test_index_follows_updates_and_deletes(session):
+    """Test triggers keep the FTS table in sync"""
+    row = session.get(MoMoTransaction, 3)
+    row.reference = 'bolt trip'
+    session.commit()
+    assert ids(session, 'bolt') == [3]
+
+    session.delete(session.get(MoMoTransaction, 1))
+    session.commit()
+    assert ids(session, 'kofi') == [5]
+
+def test_fallback_without_fts_table(session):
+    """Test databases without the FTS table fall back to ILIKE"""
+    session.connection().exec_driver_sql(f'DROP TABLE {FTS_TABLE}')
+    for name in ('insert', 'update', 'delete'):
+        session.connection().exec_driver_sql(f'DROP TRIGGER mo_mo_transaction_fts_{name}')
+    momo_search._fts_available.pop(session.get_bind(), None)
+    assert ids(session, 'kofi') == [1, 5]
@@ -0,0 +1,91 @@
+"""
+Test suite for the MoMo statistics query layer
+Run with: python -m pytest test_momo_stats.py -v
+"""
+
+import pytest
+from datetime import datetime
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+import momo_stats
+from extensions import db
+from models import MoMoMonthlyRollup, MoMoTransaction
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def session():
+    """In-memory database with the MoMo transaction and rollup tables"""
+    engine = create_engine('sqlite://')
+    db.metadata.create_all(engine, tables=[MoMoTransaction.__table__, MoMoMonthlyRollup.__table__])
+
+    rows = [
+        {'user_id': 1, 'type': 'income', 'amount': 500.0, 'date': datetime(2024, 1, 5),
+         'counterparty': 'EMPLOYER', 'fees': None, 'tax': None, 'category': 'Income', 'balance_after': 500.0},
+        {'user_id': 1, 'type': 'expense', 'amount': 40.0, 'date': datetime(2024, 1, 10),
+         'counterparty': 'SHOP', 'fees': 0.5, 'tax': 0.2, 'category': 'Shopping', 'balance_after': 459.3},
+        {'user_id': 1, 'type': 'expense', 'amount': 60.0, 'date': datetime(2024, 2, 1),
+         'counterparty': 'KOFI', 'fees': 1.0, 'tax': 0.0, 'category': None, 'balance_after': 398.3},
+        {'user_id': 1, 'type': 'transfer', 'amount': 20.0, 'date': datetime(2024, 2, 3),
+         'counterparty': 'KOFI', 'fees': 0.0, 'tax': 0.0, 'category': 'Transfer', 'balance_after': 378.3},
+        {'user_id': 2, 'type': 'expense', 'amount': 999.0, 'date': datetime(2024, 2, 3),
+         'counterparty': 'OTHER', 'fees': 9.0, 'tax': 9.0, 'category': 'Shopping', 'balance_after': 0.0},
+    ]
+    rollups = [
+        {'user_id': 1, 'month': '2024-01', 'type': 'income', 'category': 'Income', 'count': 1,
+         'amount': 500.0, 'fees': 0.0, 'tax': 0.0},
+        {'user_id': 1, 'month': '2024-01', 'type': 'expense', 'category': 'Shopping', 'count': 1,
+         'amount': 40.0, 'fees': 0.5, 'tax': 0.2},
+        {'user_id': 1, 'month': '2024-02', 'type': 'expense', 'category': 'Other', 'count': 1,
+         'amount': 60.0, 'fees': 1.0, 'tax': 0.0},
+        {'user_id': 1, 'month': '2024-02', 'type': 'transfer', 'category': 'Transfer', 'count': 1,
+         'amount': 20.0, 'fees': 0.0, 'tax': 0.0},
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(MoMoTransaction.__table__), rows)
+        conn.execute(insert(MoMoMonthlyRollup.__table__), rollups)
+
+    with Session(engine) as session:
+        yield session
+
+# =============================================================================
+# AGGREGATE TESTS
+# =============================================================================
+
+def test_summary_totals_all_time(session):
+    """Test all-time totals come from the rollup"""
+    assert momo_stats.summary_totals(session, 1) == pytest.approx((500.0, 100.0, 1.5, 0.2, 4))
+
+def test_summary_totals_since(session):
+    """Test ranged totals treat missing fees/tax as zero"""
+    totals = momo_stats.summary_totals(session, 1, since=datetime(2024, 1, 6))
+    assert totals == pytest.approx((0, 100.0, 1.5, 0.2, 3))
+
+def test_summary_totals_empty(session):
+    """Test a user without transactions gets zeros"""
+    assert momo_stats.summary_totals(session, 3) == (0, 0, 0, 0, 0)
+    assert momo_stats.summary_totals(session, 3, since=datetime(2024, 1, 1)) == (0, 0, 0, 0, 0)
+
+def test_expense_by_category(session):
+    """Test expense breakdown is largest first with uncategorized as Other"""
+    assert momo_stats.expense_by_category(session, 1) == [('Other', 60.0), ('Shopping', 40.0)]
+    assert momo_stats.expense_by_category(session, 1, since=datetime(2024, 1, 1)) == \
+        [('Other', 60.0), ('Shopping', 40.0)]
+
+def test_monthly_totals(session):
+    """Test monthly totals are newest first and count transfers as expense"""
+    assert momo_stats.monthly_totals(session, 1) == [('2024-02', 0, 80.0), ('2024-01', 500.0, 40.0)]
+
+def test_top_counterparties(session):
+    """Test top counterparties only include the user's expenses"""
+    assert momo_stats.top_counterparties(session, 1) == [('KOFI', 60.0), ('SHOP', 40.0)]
+    assert momo_stats.top_counterparties(session, 1, limit=1) == [('KOFI', 60.0)]
+
+def test_recent_transactions(session):
+    """Test recent transactions are newest first and limited"""
+    recent = momo_stats.recent_transactions(session, 1, limit=2)
+    assert [row.counterparty for row in recent] == ['KOFI', 'KOFI']
+    assert recent[0].balance_after == 378.3
@@ -0,0 +1,96 @@
+"""
+Test suite for keyset pagination
+Run with: python -m pytest test_pagination.py -v
+"""
+
+import pytest
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, Column, Integer, DateTime
+from sqlalchemy.orm import declarative_base, Session
+
+from pagination import keyset_paginate, encode_cursor, decode_cursor, approximate_count
+
+Base = declarative_base()
+
+class Row(Base):
+    __tablename__ = 'row'
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    date = Column(DateTime, nullable=False)
+
+# =============================================================================
+# FIXTURES
+# =============================================================================
+
+@pytest.fixture
+def session():
+    """55 rows for user 1 with several rows sharing each timestamp"""
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(engine)
+    start = datetime(2024, 1, 1, 8, 0)
+    with Session(engine) as session:
+        session.add_all(Row(user_id=1, date=start + timedelta(hours=i // 3)) for i in range(55))
+        session.add(Row(user_id=2, date=start))
+        session.commit()
+        yield session
+
+def expected_order(session):
+    rows = session.query(Row).filter_by(user_id=1).all()
+    return [r.id for r in sorted(rows, key=lambda r: (r.date, r.id), reverse=True)]
+
+def walk(session, token=None):
+    return keyset_paginate(session.query(Row).filter_by(user_id=1), Row.date, Row.id,
+                           token=token, per_page=10)
+
+# =============================================================================
+# CURSOR TESTS
+# =============================================================================
+
+def test_cursor_round_trip():
+    """Test tokens decode back to the same position"""
+    token = encode_cursor(datetime(2024, 5, 1, 12, 30), 42, 'prev')
+    assert decode_cursor(token, Row.date) == (datetime(2024, 5, 1, 12, 30), 42, 'prev')
+
+@pytest.mark.parametrize('token', ['', 'not-base64!!', 'e30', encode_cursor(datetime.now(), 1, 'sideways')])
+def test_bad_cursor_is_ignored(token):
+    """Test malformed tokens fall back to the first page"""
+    assert decode_cursor(token, Row.date) is None
+
+# =============================================================================
+# PAGINATION TESTS
+# =============================================================================
+
+def test_forward_pages_cover_all_rows(session):
+    """Test following next tokens visits every row once in order"""
+    seen, page = [], walk(session)
+    assert not page.has_prev
+    while True:
+        seen.extend(r.id for r in page.items)
+        if not page.has_next:
+            break
+        page = walk(session, page.next_token)
+        assert page.has_prev
+    assert seen == expected_order(session)
+
+def test_prev_token_returns_previous_page(session):
+    """Test going back returns the same rows as the page before"""
+    first = walk(session)
+    second = walk(session, first.next_token)
+    third = walk(session, second.next_token)
+
+    back = walk(session, third.prev_token)
+    assert [r.id for r in back.items] == [r.id for r in second.items]
+    back = walk(session, back.prev_token)
+    assert [r.id for r in back.items] == [r.id for r in first.items]
+    assert not back.has_prev and back.has_next
+
+def test_approximate_count(session):
+    """Test the capped count is exact below the cap and a lower bound above it"""
+    query = session.query(Row).filter_by(user_id=1)
+    assert approximate_count(query) == (55, 'exact')
+    assert approximate_count(query, cap=20) == (20, 'at_least')
+
+    page = keyset_paginate(query, Row.date, Row.id, per_page=10, count='approximate')
+    assert page.total_label == '55'
+    page = keyset_paginate(query, Row.date, Row.id, token=page.next_token, per_page=10, count='exact')
+    assert page.total == 55
@@ -0,0 +1,181 @@
+"""
+Test suite for the parsed statement cache
+Run with: python -m pytest test_parse_cache.py -v
+"""
+
+import hashlib
+import os
+import pytest
+from datetime import datetime
+import parse_cache
+from parse_cache import ParseCache, hash_file, iter_statement_rows
+from momo_import import MoMoRow
+
+FILE_HASH = 'ab' * 32
+
+def make_row(row_num, **overrides):
+    data = {
+        'date': datetime(2025, 11, 20, 18, row_num % 60), 'payment_type': 'CASH OUT', 'counterparty': 'JAMES',
+        'counterparty_phone': '+233 54 86 74 41 0', 'amount': 25.0 + row_num, 'transaction_id': f'6936608{row_num:04d}',
+        'fees': 0.5, 'tax': None, 'balance_after': 32.46, 'reference': '', 'type': 'expense',
+        'page': 1, 'row': row_num,
+    }
+    data.update(overrides)
+    return MoMoRow(**data)
+
+@pytest.fixture
+def fake_parser(monkeypatch):
+    """Replace the PDF parser with a counted generator of fixed rows."""
+    calls = []
+
+    def fake_iter_momo_pdf(file_path, errors, **options):
+        calls.append(file_path)
+        for i in range(1, 4):
+            yield make_row(i)
+        errors.append({'page': 2, 'row': 5, 'error': 'Could not parse date'})
+
+    monkeypatch.setattr(parse_cache, 'iter_momo_pdf', fake_iter_momo_pdf)
+    return calls
+
+# =============================================================================
+# HASHING TESTS
+# =============================================================================
+
+def test_hash_file_matches_hashlib(tmp_path):
+    """Test files are hashed correctly across chunk boundaries"""
+    data = os.urandom(200_000)
+    target = tmp_path / 'statement.pdf'
+    target.write_bytes(data)
+
+    assert hash_file(str(target), chunk_size=4096) == hashlib.sha256(data).hexdigest()
+
+def test_invalid_hash_rejected(tmp_path):
+    """Test hashes are validated before being used as file names"""
+    cache = ParseCache(str(tmp_path))
+    with pytest.raises(ValueError):
+        cache.path_for('../../etc/passwd')
+    with pytest.raises(ValueError):
+        cache.path_for(None)
+
+# =============================================================================
+# CACHE TESTS
+# =============================================================================
+
+def test_repeat_parse_served_from_cache(tmp_path, fake_parser):
+    """Test a second parse of the same hash skips the parser"""
+    cache = ParseCache(str(tmp_path / 'cache'))
+
+    first_errors = []
+    first = list(iter_statement_rows('a.pdf', first_errors, FILE_HASH, cache))
+    assert FILE_HASH in cache
+
+    second_errors = []
+    second = list(iter_statement_rows('a.pdf', second_errors, FILE_HASH, cache))
+
+    assert fake_parser == ['a.pdf']
+    assert second == first
+    assert second_errors == first_errors
+    assert isinstance(second[0]['date'], datetime)
+
+def test_cached_rows_are_independent_of_later_stages(tmp_path, fake_parser):
+    """Test categorization after parsing doesn't leak into the cache"""
+    cache = ParseCache(str(tmp_path))
+    for row in iter_statement_rows('a.pdf', [], FILE_HASH, cache):
+        row['suggested_category'] = 'Food'
+        row['amount'] = 0
+
+    cached = list(cache.iter_rows(FILE_HASH, []))
+    assert [row.amount for row in cached] == [26.0, 27.0, 28.0]
+    assert 'suggested_category' not in cached[0]
+
+def test_abandoned_parse_not_cached(tmp_path, fake_parser):
+    """Test closing the stream early leaves no entry or temp file"""
+    cache = ParseCache(str(tmp_path))
+    rows = iter_statement_rows('a.pdf', [], FILE_HASH, cache)
+    next(rows)
+    rows.close()
+
+    assert FILE_HASH not in cache
+    assert os.listdir(tmp_path) == []
+
+def test_concurrent_parses_of_same_statement(tmp_path):
+    """Test two in-process writers for one hash don't share a temp file"""
+    cache = ParseCache(str(tmp_path))
+    rows = [make_row(i) for i in range(1, 200)]
+    first = cache.store_stream(FILE_HASH, iter(rows), [])
+    second = cache.store_stream(FILE_HASH, iter(rows), [])
+
+    for _ in zip(first, second):
+        pass
+    for stream in (first, second):
+        assert list(stream) == []
+
+    assert list(cache.iter_rows(FILE_HASH, [])) == rows
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
+
+def test_unreadable_pdf_not_cached(tmp_path, monkeypatch):
+    """Test a PDF that fails to open is parsed again next time"""
+    def broken_parser(file_path, errors, **options):
+        errors.append({'page': 0, 'row': 0, 'error': 'Failed to read PDF'})
+        return iter(())
+
+    monkeypatch.setattr(parse_cache, 'iter_momo_pdf', broken_parser)
+    cache = ParseCache(str(tmp_path))
+
+    assert list(iter_statement_rows('a.pdf', [], FILE_HASH, cache)) == []
+    assert FILE_HASH not in cache
+
+def test_parser_version_change_misses(tmp_path, fake_parser):
+    """Test entries written by another parser version aren't used"""
+    list(iter_statement_rows('a.pdf', [], FILE_HASH, ParseCache(str(tmp_path), parser_version=1)))
+
+    newer = ParseCache(str(tmp_path), parser_version=2)
+    assert newer.iter_rows(FILE_HASH, []) is None
+
+    list(iter_statement_rows('a.pdf', [], FILE_HASH, newer))
+    assert len(fake_parser) == 2
+    # The old version's entry is evicted once the new one is stored
+    assert os.listdir(tmp_path) == [os.path.basename(newer.path_for(FILE_HASH))]
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    """Test a damaged cache file falls back to parsing"""
+    cache = ParseCache(str(tmp_path))
+    with open(cache.path_for(FILE_HASH), 'wb') as f:
+        f.write(b'not gzip')
+    assert cache.iter_rows(FILE_HASH, []) is None
+
+# =============================================================================
+# EVICTION TESTS
+# =============================================================================
+
+def test_evict_by_age(tmp_path, fake_parser):
+    """Test entries unused for longer than max_age are removed"""
+    cache = ParseCache(str(tmp_path), max_age=3600)
+    list(iter_statement_rows('a.pdf', [], FILE_HASH, cache))
+
+    assert cache.evict(now=datetime.now().timestamp() + 60) == (0, 0)
+    removed, reclaimed = cache.evict(now=datetime.now().timestamp() + 7200)
+    assert removed == 1 and reclaimed > 0
+    assert FILE_HASH not in cache
+
+def test_evict_by_size_least_recently_used(tmp_path, fake_parser):
+    """Test the cache is trimmed to max_bytes, oldest use first"""
+    cache = ParseCache(str(tmp_path), max_bytes=10**9)
+    hashes = [f'{i:064x}' for i in range(3)]
+    now = datetime.now().timestamp()
+    for age, file_hash in enumerate(hashes):
+        list(iter_statement_rows('a.pdf', [], file_hash, cache))
+        stamp = now - 1000 - age * 100
+        os.utime(cache.path_for(file_hash), (stamp, stamp))
+
+    # Reading an entry marks it as recently used
+    list(cache.iter_rows(hashes[2], []))
+
+    # Room for exactly the two entries expected to survive (entry sizes
+    # differ by a few bytes: the gzipped header holds a float timestamp)
+    cache.max_bytes = sum(os.path.getsize(cache.path_for(h)) for h in (hashes[0], hashes[2]))
+    removed, _ = cache.evict()
+
+    assert removed == 1
+    assert hashes[1] not in cache
+    assert hashes[0] in cache and hashes[2] in cache
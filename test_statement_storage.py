@@ -0,0 +1,157 @@
+"""
+Test suite for uploaded statement retention and compaction
+Run with: python -m pytest test_statement_storage.py -v
+"""
+
+import hashlib
+import os
+import time
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from statement_storage import compact_statements
+
+NOW = datetime(2026, 6, 1, 12, 0)
+
+def make_upload(directory, name, content, days_old, status='completed', preview_data=None,
+                with_hash=True, log_id=None):
+    """Write an upload and return an ImportLog-like record for it."""
+    path = os.path.join(directory, name)
+    with open(path, 'wb') as f:
+        f.write(content)
+    return SimpleNamespace(
+        id=log_id or len(os.listdir(directory)),
+        file_path=path,
+        file_hash=hashlib.sha256(content).hexdigest() if with_hash else None,
+        status=status,
+        preview_data=preview_data,
+        import_date=NOW - timedelta(days=days_old),
+    )
+
+# =============================================================================
+# RETENTION TESTS
+# =============================================================================
+
+def test_retention_policy(tmp_path):
+    """Test which uploads are deleted and that ImportLog is updated"""
+    d = str(tmp_path)
+    old_done = make_upload(d, 'old_done.pdf', b'%PDF-1', days_old=10)
+    new_done = make_upload(d, 'new_done.pdf', b'%PDF-2', days_old=1)
+    in_preview = make_upload(d, 'preview.pdf', b'%PDF-3', days_old=10, preview_data='{}')
+    stale_preview = make_upload(d, 'stale.pdf', b'%PDF-4', days_old=100, preview_data='{}')
+    running = make_upload(d, 'running.pdf', b'%PDF-5', days_old=100, status='processing')
+
+    report = compact_statements([old_done, new_done, in_preview, stale_preview, running], d, d,
+                                finished_days=7, max_age_days=90, now=NOW)
+
+    assert sorted((os.path.basename(p), reason) for p, reason in report.deleted) == [
+        ('old_done.pdf', 'finished'), ('stale.pdf', 'expired')
+    ]
+    assert report.bytes_reclaimed == 12
+    assert old_done.file_path is None and stale_preview.file_path is None
+    assert sorted(os.listdir(d)) == ['new_done.pdf', 'preview.pdf', 'running.pdf']
+    assert new_done.file_path and in_preview.file_path and running.file_path
+
+def test_dry_run_changes_nothing(tmp_path):
+    """Test a dry run reports the same work without doing it"""
+    d = str(tmp_path)
+    logs = [
+        make_upload(d, 'a.pdf', b'%PDF-same', days_old=10),
+        make_upload(d, 'b.pdf', b'%PDF-same', days_old=2, with_hash=False),
+        make_upload(d, 'c.pdf', b'%PDF-same', days_old=1),
+    ]
+
+    dry = compact_statements(logs, d, d, dry_run=True, now=NOW)
+
+    assert len(dry.deleted) == 1 and len(dry.linked) == 1
+    assert dry.bytes_reclaimed == 18
+    assert 'Would reclaim' in dry.summary()
+    assert sorted(os.listdir(d)) == ['a.pdf', 'b.pdf', 'c.pdf']
+    assert logs[0].file_path is not None and logs[1].file_hash is None
+
+    real = compact_statements(logs, d, d, now=NOW)
+    assert (real.deleted, real.linked, real.bytes_reclaimed) == (dry.deleted, dry.linked, dry.bytes_reclaimed)
+
+def test_orphaned_uploads(tmp_path):
+    """Test unreferenced files are removed after the grace period"""
+    d = str(tmp_path)
+    for name, age in (('old_orphan.pdf', 7200), ('fresh_orphan.pdf', 60)):
+        path = tmp_path / name
+        path.write_bytes(b'%PDF-orphan')
+        stamp = time.time() - age
+        os.utime(path, (stamp, stamp))
+
+    report = compact_statements([], d, d, orphan_grace=3600, now=NOW)
+
+    assert [(os.path.basename(p), r) for p, r in report.deleted] == [('old_orphan.pdf', 'orphaned')]
+    assert os.listdir(d) == ['fresh_orphan.pdf']
+
+def test_missing_file_clears_path(tmp_path):
+    """Test rows pointing at files that no longer exist are cleaned up"""
+    log = make_upload(str(tmp_path), 'gone.pdf', b'%PDF-x', days_old=1)
+    os.remove(log.file_path)
+
+    report = compact_statements([log], str(tmp_path), str(tmp_path), now=NOW)
+
+    assert log.file_path is None
+    assert report.deleted == [] and report.bytes_reclaimed == 0
+
+def test_relative_paths_resolved_against_root(tmp_path, monkeypatch):
+    """Test legacy relative file_paths don't depend on the working directory"""
+    root = tmp_path / 'app'
+    upload_dir = root / 'uploads' / 'statements'
+    upload_dir.mkdir(parents=True)
+    log = make_upload(str(upload_dir), 'legacy.pdf', b'%PDF-legacy', days_old=1, preview_data='{}')
+    log.file_path = os.path.join('uploads', 'statements', 'legacy.pdf')
+    stamp = time.time() - 7200
+    os.utime(upload_dir / 'legacy.pdf', (stamp, stamp))
+    monkeypatch.chdir(tmp_path)
+
+    report = compact_statements([log], str(upload_dir), str(root), orphan_grace=3600, now=NOW)
+
+    assert report.deleted == []
+    assert log.file_path == os.path.join('uploads', 'statements', 'legacy.pdf')
+    assert os.listdir(upload_dir) == ['legacy.pdf']
+
+# =============================================================================
+# DEDUPLICATION TESTS
+# =============================================================================
+
+def test_identical_uploads_hardlinked(tmp_path):
+    """Test duplicates share one inode and their paths stay readable"""
+    d = str(tmp_path)
+    content = b'%PDF-' + b'x' * 1000
+    first = make_upload(d, 'first.pdf', content, days_old=3)
+    second = make_upload(d, 'second.pdf', content, days_old=2, with_hash=False)
+    third = make_upload(d, 'third.pdf', content, days_old=1)
+    other = make_upload(d, 'other.pdf', b'%PDF-other', days_old=1)
+
+    report = compact_statements([third, other, second, first], d, d, now=NOW)
+
+    assert sorted(os.path.basename(p) for p, _ in report.linked) == ['second.pdf', 'third.pdf']
+    assert all(os.path.basename(original) == 'first.pdf' for _, original in report.linked)
+    assert report.bytes_reclaimed == 2 * len(content)
+    assert second.file_hash == hashlib.sha256(content).hexdigest()
+    assert os.path.samefile(first.file_path, third.file_path)
+    assert os.stat(first.file_path).st_nlink == 3
+    with open(second.file_path, 'rb') as f:
+        assert f.read() == content
+
+    # Nothing left to do on a second run
+    again = compact_statements([first, second, third, other], d, d, now=NOW)
+    assert again.linked == [] and again.bytes_reclaimed == 0
+
+def test_deleting_linked_copy_reclaims_nothing_until_last(tmp_path):
+    """Test bytes are only counted once the last link is removed"""
+    d = str(tmp_path)
+    content = b'%PDF-' + b'y' * 500
+    keep = make_upload(d, 'keep.pdf', content, days_old=1)
+    drop = make_upload(d, 'drop.pdf', content, days_old=1)
+    compact_statements([keep, drop], d, d, now=NOW)
+
+    drop.import_date = NOW - timedelta(days=30)
+    report = compact_statements([keep, drop], d, d, now=NOW)
+    assert len(report.deleted) == 1 and report.bytes_reclaimed == 0
+
+    keep.import_date = NOW - timedelta(days=30)
+    report = compact_statements([keep], d, d, now=NOW)
+    assert report.bytes_reclaimed == len(content)
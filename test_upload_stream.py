@@ -0,0 +1,114 @@
+"""
+Test suite for streaming statement uploads
+Run with: python -m pytest test_upload_stream.py -v
+"""
+
+import hashlib
+import io
+import os
+import pytest
+from flask import Flask, request, jsonify
+from upload_stream import StatementUpload, StreamingUploadRequest
+
+PDF = b'%PDF-1.4\n' + b'0123456789' * 1000
+
+def write_chunks(upload, data, chunk_size):
+    for start in range(0, len(data), chunk_size):
+        upload.write(data[start:start + chunk_size])
+
+# =============================================================================
+# WRITER TESTS
+# =============================================================================
+
+@pytest.mark.parametrize('chunk_size', [1, 3, 4096])
+def test_accepted_upload_saved_and_hashed(tmp_path, chunk_size):
+    """Test a PDF is written to its final path and hashed, whatever the chunking"""
+    upload = StatementUpload(str(tmp_path), 'my statement.pdf', max_size=len(PDF))
+    write_chunks(upload, PDF, chunk_size)
+    upload.seek(0)
+
+    assert upload.error is None
+    assert upload.read() == PDF
+    assert upload.hexdigest == hashlib.sha256(PDF).hexdigest()
+    assert os.path.basename(upload.path).endswith('_my_statement.pdf')
+    upload.close()
+    with open(upload.path, 'rb') as f:
+        assert f.read() == PDF
+
+def test_wrong_magic_writes_nothing(tmp_path):
+    """Test non-PDF content is rejected before a file is created"""
+    upload = StatementUpload(str(tmp_path), 'fake.pdf', max_size=10**6)
+    write_chunks(upload, b'PK\x03\x04' + b'x' * 5000, 2)
+
+    assert upload.error == 'bad_type'
+    assert os.listdir(tmp_path) == []
+    assert upload.read() == b''
+
+def test_short_or_empty_upload_rejected(tmp_path):
+    """Test files too short to hold the magic bytes are rejected"""
+    short = StatementUpload(str(tmp_path), 'a.pdf', max_size=10**6)
+    short.write(b'%PD')
+    empty = StatementUpload(str(tmp_path), 'b.pdf', max_size=10**6)
+
+    assert short.error == 'bad_type'
+    assert empty.error == 'bad_type'
+    assert os.listdir(tmp_path) == []
+
+def test_size_limit_aborts_and_removes_file(tmp_path):
+    """Test crossing the limit stops writing and deletes the partial file"""
+    upload = StatementUpload(str(tmp_path), 'big.pdf', max_size=5000)
+    upload.write(PDF[:4000])
+    assert os.path.exists(upload.path)
+
+    upload.write(PDF[4000:8000])
+    upload.write(PDF[8000:])
+
+    assert upload.error == 'too_large'
+    assert os.listdir(tmp_path) == []
+
+# =============================================================================
+# REQUEST TESTS
+# =============================================================================
+
+@pytest.fixture
+def client(tmp_path):
+    app = Flask(__name__)
+    app.request_class = StreamingUploadRequest
+
+    @app.route('/upload', methods=['POST'])
+    def upload():
+        if request.args.get('stream'):
+            request.stream_files_to(str(tmp_path), max_size=len(PDF))
+        stream = request.files['file'].stream
+        return jsonify({
+            'streamed': isinstance(stream, StatementUpload),
+            'error': getattr(stream, 'error', None),
+            'hash': getattr(stream, 'hexdigest', None),
+        })
+
+    return app.test_client()
+
+def test_request_streams_when_opted_in(client, tmp_path):
+    """Test the multipart file part is written into the upload folder"""
+    response = client.post('/upload?stream=1', data={'file': (io.BytesIO(PDF), 'st.pdf')},
+                           content_type='multipart/form-data')
+
+    assert response.json == {'streamed': True, 'error': None, 'hash': hashlib.sha256(PDF).hexdigest()}
+    saved = os.listdir(tmp_path)
+    assert len(saved) == 1 and saved[0].endswith('_st.pdf')
+
+def test_request_default_file_handling(client, tmp_path):
+    """Test views that don't opt in keep Werkzeug's temporary files"""
+    response = client.post('/upload', data={'file': (io.BytesIO(PDF), 'st.pdf')},
+                           content_type='multipart/form-data')
+
+    assert response.json['streamed'] is False
+    assert os.listdir(tmp_path) == []
+
+def test_request_rejects_oversized_part(client, tmp_path):
+    """Test an over-limit upload is reported and nothing is kept"""
+    response = client.post('/upload?stream=1', data={'file': (io.BytesIO(PDF + b'x'), 'st.pdf')},
+                           content_type='multipart/form-data')
+
+    assert response.json['error'] == 'too_large'
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,168 @@
+"""
+Streaming Statement Uploads
+===========================
+Writes uploaded files straight to their final path while the multipart
+body is being parsed, instead of letting Werkzeug spool them to a
+temporary file first. In the same pass the writer:
+
+- checks the magic bytes before anything is written (%PDF for statements)
+- hashes the content (SHA-256, used as the parse cache key)
+- stops writing and removes the file as soon as the size limit is crossed
+
+Rejected uploads are reported through `StatementUpload.error` so the view
+can show a normal flash message.
+"""
+
+import hashlib
+import io
+import os
+import uuid
+
+from flask import Request
+from werkzeug.utils import secure_filename
+
+PDF_MAGIC = b'%PDF-'
+
+# =============================================================================
+# UPLOAD WRITER
+# =============================================================================
+
+class StatementUpload(io.RawIOBase):
+    """
+    Writable/readable file object Werkzeug streams one file part into.
+
+    Args:
+        directory: Folder the upload is saved in
+        filename: Client file name (sanitized and prefixed with a UUID)
+        max_size: Largest accepted upload in bytes
+        magic: Required leading bytes (None to accept anything)
+
+    Attributes:
+        path: Final location of the upload
+        size: Bytes received so far
+        error: None, 'too_large' or 'bad_type'
+    """
+
+    def __init__(self, directory, filename, max_size, magic=PDF_MAGIC):
+        super().__init__()
+        self.path = os.path.join(directory, f"{uuid.uuid4()}_{secure_filename(filename or '')}")
+        self.max_size = max_size
+        self.magic = magic or b''
+        self.size = 0
+        self._error = None
+        self._checked = not self.magic
+        self._digest = hashlib.sha256()
+        self._head = b''
+        self._file = None
+
+    @property
+    def error(self):
+        # Anything that ended before the magic bytes could be checked is rejected
+        if self._error is None and not self._checked:
+            return 'bad_type'
+        return self._error
+
+    @property
+    def hexdigest(self):
+        """SHA-256 of the upload (only meaningful if it was accepted)."""
+        return self._digest.hexdigest()
+
+    def readable(self):
+        return True
+
+    def writable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def write(self, data):
+        length = len(data)
+        if self._error:
+            return length
+
+        self.size += length
+        if self.size > self.max_size:
+            self._reject('too_large')
+            return length
+
+        # Hold back the first bytes until the magic check can be made
+        if not self._checked:
+            self._head += data
+            if len(self._head) < len(self.magic):
+                return length
+            if not self._head.startswith(self.magic):
+                self._reject('bad_type')
+                return length
+            self._checked = True
+            data, self._head = self._head, b''
+
+        self._digest.update(data)
+        self._open().write(data)
+        return length
+
+    def _open(self):
+        if self._file is None:
+            self._file = open(self.path, 'w+b')
+        return self._file
+
+    def _reject(self, reason):
+        self._error = reason
+        self.discard()
+
+    def discard(self):
+        """Delete whatever has been written."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    # Reads go to the saved file; a rejected or empty upload reads as empty
+    def readinto(self, buffer):
+        if self._file is None:
+            return 0
+        return self._file.readinto(buffer)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if self._file is None:
+            return 0
+        return self._file.seek(offset, whence)
+
+    def tell(self):
+        if self._file is None:
+            return 0
+        return self._file.tell()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        super().close()
+
+# =============================================================================
+# REQUEST CLASS
+# =============================================================================
+
+class StreamingUploadRequest(Request):
+    """
+    Flask request whose file parts can be streamed to disk.
+
+    A view opts in by calling stream_files_to() before it touches
+    request.files; other requests keep Werkzeug's default behaviour.
+    """
+
+    _upload_target = None
+
+    def stream_files_to(self, directory, max_size, magic=PDF_MAGIC):
+        """Stream file parts of this request into `directory`."""
+        self._upload_target = (directory, max_size, magic)
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        if self._upload_target is None:
+            return super()._get_file_stream(total_content_length, content_type, filename, content_length)
+
+        directory, max_size, magic = self._upload_target
+        return StatementUpload(directory, filename, max_size, magic)